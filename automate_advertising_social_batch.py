@@ -65,6 +65,11 @@ openai_client = None
 if OPENAI_AVAILABLE and OPENAI_API_KEY:
     openai_client = OpenAI(api_key=OPENAI_API_KEY)
 
+# One Gemini client per run (built only when image generation is possible)
+genai_client = None
+if GENAI_AVAILABLE and GOOGLE_API_KEY:
+    genai_client = genai.Client(api_key=GOOGLE_API_KEY)
+
 PLATFORM_LIMITS = {
     "twitter": 280,
     "threads": 500
@@ -152,22 +157,20 @@ def get_multiline_input(prompt_text: str) -> str:
 
     return "\n".join(lines).strip()
 
-def extract_json(text: str) -> Dict:
-    """Extract JSON from AI response"""
-    if "```json" in text:
-        text = text.split("```json")[1].split("```")[0].strip()
-    elif "```" in text:
-        text = text.split("```")[1].split("```")[0].strip()
+_JSON_DECODER = json.JSONDecoder()
 
+def extract_json(text: str) -> Dict:
+    """Extract JSON from AI response (tolerates code fences/preamble); {} if there is none"""
+    # raw_decode parses from the first brace in one pass and stops at the
+    # object's end, so fences and trailing prose need no extra scans
     start = text.find("{")
-    end = text.rfind("}") + 1
-    if start != -1 and end > start:
-        text = text[start:end]
-
+    if start == -1:
+        return {}
     try:
-        return json.loads(text)
-    except:
+        obj, _ = _JSON_DECODER.raw_decode(text, start)
+    except json.JSONDecodeError:
         return {}
+    return obj
 
 # ==================== SESSION MANAGEMENT ====================
 
@@ -804,7 +807,7 @@ def generate_image(topic: str, post_text: str, platform: str) -> Optional[str]:
         return None
 
     try:
-        client = genai.Client(api_key=GOOGLE_API_KEY)
+        client = genai_client
 
         # Professional B2B image prompts - data viz, charts, clean designs
         prompt = f"""Create a professional B2B marketing visual for this topic:
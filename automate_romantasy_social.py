@@ -3,8 +3,11 @@
 # Automated social media posting for romantasy writing advice
 
 import os
+import atexit
 import sys
 import json
+import base64
+import asyncio
 import argparse
 import smtplib
 from datetime import datetime, timezone
@@ -15,6 +18,7 @@ from email.mime.image import MIMEImage
 from pathlib import Path
 
 import requests
+from requests.adapters import HTTPAdapter
 import anthropic
 
 try:
@@ -23,6 +27,8 @@ try:
 except Exception:
     pass
 
+import social_prompts as SP
+
 try:
     from google import genai
     from google.genai import types
@@ -54,6 +60,23 @@ if not GOOGLE_API_KEY:
 
 anthropic_client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
 
+# One Gemini client per run (built only when image generation is possible)
+genai_client = None
+if GENAI_AVAILABLE and GOOGLE_API_KEY:
+    genai_client = genai.Client(api_key=GOOGLE_API_KEY)
+
+_JSON_DECODER = json.JSONDecoder()
+
+# Pooled HTTP session: keeps TLS connections to the platform APIs alive between calls
+HTTP = requests.Session()
+HTTP.mount("https://", HTTPAdapter(pool_connections=8, pool_maxsize=16))
+atexit.register(HTTP.close)
+
+# Shared Plot Brew brief, sent as a cached system prefix on every Claude call
+PLOT_BREW_SYSTEM_BLOCKS = [
+    {"type": "text", "text": SP.PLOT_BREW_SYSTEM, "cache_control": {"type": "ephemeral"}}
+]
+
 # Platform character limits
 PLATFORM_LIMITS = {
     "twitter": 280,
@@ -62,11 +85,19 @@ PLATFORM_LIMITS = {
     "instagram": 2200
 }
 
+def log_cache_usage(response) -> None:
+    """Show prompt-cache reads/writes so cache hits can be verified"""
+    usage = getattr(response, "usage", None)
+    cache_read = getattr(usage, "cache_read_input_tokens", 0) or 0
+    cache_written = getattr(usage, "cache_creation_input_tokens", 0) or 0
+    if cache_read or cache_written:
+        print(f"   (prompt cache: {cache_read} tokens read, {cache_written} written)")
+
 def generate_writing_advice_topic() -> str:
     """
     Generate a writing advice topic for romantasy writers using Claude
     """
-    prompt = """You are a content strategist for "Plot Brew," a writing advice platform for romantasy authors.
+    prompt = """You are acting as Plot Brew's content strategist.
 
 Generate ONE specific, actionable writing advice topic that would be valuable for romantasy writers.
 
@@ -75,13 +106,7 @@ Generate ONE specific, actionable writing advice topic that would be valuable fo
 - Actionable and practical
 - Addresses craft, structure, or reader expectations
 - Can be explained in a social media post
-
-**Good Topics:**
-- "How to Write Sexual Tension Without Explicit Scenes"
-- "The 3-Act Structure for Dual-Plot Romantasy"
-- "Why Your Magic System Needs Relationship Stakes"
-- "Writing Morally Grey Love Interests Readers Will Root For"
-- "How to Balance World-Building Without Info-Dumping"
+- Match the specificity of the GOOD TOPICS in your brief without repeating them
 
 Return ONLY the topic as a single sentence (no quotation marks, no preamble).
 """
@@ -90,8 +115,10 @@ Return ONLY the topic as a single sentence (no quotation marks, no preamble).
         response = anthropic_client.messages.create(
             model="claude-sonnet-4-5",
             max_tokens=200,
+            system=PLOT_BREW_SYSTEM_BLOCKS,
             messages=[{"role": "user", "content": prompt}]
         )
+        log_cache_usage(response)
         topic = response.content[0].text.strip()
         # Remove quotes if present
         topic = topic.strip('"').strip("'")
@@ -104,17 +131,10 @@ def generate_social_posts(topic: str) -> Dict[str, str]:
     """
     Generate platform-specific posts for Twitter, Threads, Pinterest, and Instagram
     """
-    prompt = f"""You are creating social media posts for "Plot Brew," a romantasy writing advice platform.
+    prompt = f"""Create Plot Brew social media posts in your usual voice.
 
 **TOPIC:** {topic}
 
-**YOUR VOICE:**
-- Personal and vulnerable (share writing journey)
-- Celebratory of romantasy (treat it with intellectual respect)
-- Community-focused ("we" language, not "you")
-- Geeky enthusiasm about tropes and craft
-- Relatable struggles of writing life
-
 ---
 
 **GENERATE POSTS FOR 4 PLATFORMS:**
@@ -164,24 +184,15 @@ Return ONLY this JSON format:
         response = anthropic_client.messages.create(
             model="claude-sonnet-4-5",
             max_tokens=2500,
+            system=PLOT_BREW_SYSTEM_BLOCKS,
             messages=[{"role": "user", "content": prompt}]
         )
+        log_cache_usage(response)
 
         result_text = response.content[0].text.strip()
 
-        # Extract JSON
-        if "```json" in result_text:
-            result_text = result_text.split("```json")[1].split("```")[0].strip()
-        elif "```" in result_text:
-            result_text = result_text.split("```")[1].split("```")[0].strip()
-
-        # Find JSON in response
-        start = result_text.find("{")
-        end = result_text.rfind("}") + 1
-        if start != -1 and end > start:
-            result_text = result_text[start:end]
-
-        posts = json.loads(result_text)
+        # Parse the JSON object from the first brace (fences/trailing prose are ignored)
+        posts, _ = _JSON_DECODER.raw_decode(result_text, max(result_text.find("{"), 0))
         return posts
 
     except Exception as e:
@@ -203,18 +214,7 @@ def generate_image_prompt(topic: str, platform: str) -> str:
 
 **PLATFORM:** {platform}
 
-**BRAND: "Plot Brew"**
-- Visual Style: Warm, magical, whimsical yet sophisticated
-- Color Palette: Warm jewel tones (burgundy, forest green, gold) OR twilight colors (purple, rose gold, midnight blue)
-- Typography: Mix of elegant serif for headlines and clean sans-serif for body text
-- Visual Elements: Subtle fantasy elements (starbursts, constellations, book spines, quill pens, botanical illustrations)
-- Mood: Warm, inviting, creative, slightly magical
-- Branding: Include "PLOT BREW" text in elegant font
-
-**PLATFORM SPECS:**
-- Twitter/Threads: 16:9 landscape
-- Pinterest: 2:3 vertical (Pinterest optimized)
-- Instagram: 1:1 square
+Follow the Plot Brew visual identity and aspect ratios from your brief.
 
 **TEXT TO INCLUDE:**
 - Main headline: "{topic}"
@@ -236,8 +236,10 @@ Return ONLY the image generation prompt (start with "Create a...").
         response = anthropic_client.messages.create(
             model="claude-sonnet-4-5",
             max_tokens=800,
+            system=PLOT_BREW_SYSTEM_BLOCKS,
             messages=[{"role": "user", "content": prompt}]
         )
+        log_cache_usage(response)
 
         image_prompt = response.content[0].text.strip()
         return image_prompt
@@ -246,6 +248,19 @@ Return ONLY the image generation prompt (start with "Create a...").
         print(f"ERROR generating image prompt: {e}")
         return f"Create a warm, magical social media graphic for romantasy writers about {topic}. Use purple and gold colors with subtle fantasy elements."
 
+# Gemini image mime type -> file extension
+IMAGE_EXTENSIONS = {"image/png": ".png", "image/jpeg": ".jpg", "image/webp": ".webp"}
+
+def save_inline_image(inline_data, filename_stem: str) -> str:
+    """Write Gemini's encoded image bytes straight to disk (no PIL decode/re-encode)"""
+    data = inline_data.data
+    if isinstance(data, str):
+        data = base64.b64decode(data)
+    filename = filename_stem + IMAGE_EXTENSIONS.get(inline_data.mime_type, ".png")
+    with open(filename, 'wb') as f:
+        f.write(data)
+    return filename
+
 def generate_image(image_prompt: str, platform: str) -> Optional[str]:
     """
     Generate an image using Gemini
@@ -267,7 +282,7 @@ def generate_image(image_prompt: str, platform: str) -> Optional[str]:
     aspect_ratio = aspect_ratios.get(platform, "1:1")
 
     try:
-        client = genai.Client(api_key=GOOGLE_API_KEY)
+        client = genai_client
 
         response = client.models.generate_content(
             model="gemini-2.5-flash-image",
@@ -282,12 +297,11 @@ def generate_image(image_prompt: str, platform: str) -> Optional[str]:
 
         # Save image
         timestamp = datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')
-        image_filename = f"romantasy_{platform}_{timestamp}.png"
+        image_stem = f"romantasy_{platform}_{timestamp}"
 
         for part in response.parts:
             if part.inline_data is not None:
-                image = part.as_image()
-                image.save(image_filename)
+                image_filename = save_inline_image(part.inline_data, image_stem)
                 print(f"  ✓ Image saved: {image_filename}")
                 return image_filename
 
@@ -332,7 +346,7 @@ def format_image_for_platform(image_path: str, platform: str) -> Optional[str]:
             files = {'body': f}
             headers = {'apikey': APILAYER_API_KEY}
 
-            response = requests.post(
+            response = HTTP.post(
                 f"https://api.apilayer.com/social_media_assets_generator/upload/{endpoint}",
                 headers=headers,
                 files=files,
@@ -341,7 +355,7 @@ def format_image_for_platform(image_path: str, platform: str) -> Optional[str]:
 
             if response.status_code == 200:
                 # Save formatted image
-                formatted_filename = image_path.replace('.png', f'_formatted_{platform}.png')
+                formatted_filename = f"{os.path.splitext(image_path)[0]}_formatted_{platform}.png"
                 with open(formatted_filename, 'wb') as out:
                     out.write(response.content)
                 print(f"  ✓ Image formatted: {formatted_filename}")
@@ -440,9 +454,7 @@ To post:
         # Attach image if available
         if image_path and os.path.exists(image_path):
             with open(image_path, 'rb') as f:
-                img_data = f.read()
-                image = MIMEImage(img_data, name=os.path.basename(image_path))
-                msg.attach(image)
+                msg.attach(MIMEImage(f.read(), name=os.path.basename(image_path)))
 
         # Send email
         with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as server:
@@ -457,6 +469,47 @@ To post:
         print(f"  ✗ Email failed: {e}")
         return False
 
+def publish_post(platform: str, post_text: str, image_path: Optional[str] = None) -> bool:
+    """Email Instagram posts; save the other platforms for manual posting"""
+    if platform == "instagram":
+        return email_instagram_post(post_text, image_path)
+    # TODO: Integrate platform-specific APIs for auto-posting
+    return save_post_for_manual_publishing(platform, post_text, image_path)
+
+async def run_platform_pipeline(topic: str, platform: str, post_text: str,
+                                make_image: bool, publish: bool) -> Dict[str, Optional[str]]:
+    """One platform end to end: image prompt -> image -> formatting -> publish"""
+    image_path = formatted_path = None
+    if make_image:
+        print(f"Generating {platform} image...")
+        image_prompt = await asyncio.to_thread(generate_image_prompt, topic, platform)
+        image_path = await asyncio.to_thread(generate_image, image_prompt, platform)
+        if image_path:
+            print(f"Formatting {platform} image...")
+            formatted_path = await asyncio.to_thread(format_image_for_platform, image_path, platform)
+
+    if publish:
+        await asyncio.to_thread(publish_post, platform, post_text, formatted_path or image_path)
+
+    return {"image": image_path, "formatted": formatted_path}
+
+async def run_all_pipelines(topic: str, posts: Dict[str, str], platforms: List[str],
+                            make_images: bool, publish: bool) -> Dict[str, Dict[str, Optional[str]]]:
+    """Run every platform's pipeline concurrently, so a ready platform publishes
+    while slower image generations are still in flight"""
+    results = await asyncio.gather(
+        *[run_platform_pipeline(topic, platform, posts.get(platform, ""), make_images, publish)
+          for platform in platforms],
+        return_exceptions=True
+    )
+    outcomes = {}
+    for platform, result in zip(platforms, results):
+        if isinstance(result, Exception):
+            print(f"✗ {platform} pipeline failed: {result}")
+        else:
+            outcomes[platform] = result
+    return outcomes
+
 def main():
     parser = argparse.ArgumentParser(
         description="Automate social media posting for romantasy writing advice",
@@ -562,57 +615,31 @@ Examples:
         print(f"Characters: {len(posts.get(platform, ''))}/{PLATFORM_LIMITS[platform]}")
         print()
 
-    # Step 3: Generate images
+    # Steps 3-5: Per-platform image generation, formatting and publishing.
+    # Platforms run concurrently, so each publishes as soon as its own image
+    # is ready instead of waiting for every image to finish.
     images = {}
-    if not args.no_images:
-        print("="*80)
-        print("GENERATING IMAGES")
-        print("="*80 + "\n")
-
-        for platform in args.platforms:
-            print(f"Generating {platform} image...")
-            image_prompt = generate_image_prompt(topic, platform)
-            image_path = generate_image(image_prompt, platform)
-
-            if image_path:
-                images[platform] = image_path
-            print()
-
-    # Step 4: Format images and prepare for posting
     formatted_images = {}
-    if not args.no_images and images:
+    if not args.no_images or not args.dry_run:
         print("="*80)
-        print("FORMATTING IMAGES FOR PLATFORMS")
+        if args.dry_run:
+            print("GENERATING IMAGES")
+        elif args.no_images:
+            print("PREPARING POSTS FOR PUBLISHING")
+        else:
+            print("GENERATING IMAGES AND PREPARING POSTS")
         print("="*80 + "\n")
 
-        for platform in args.platforms:
-            image_path = images.get(platform)
-            if image_path:
-                print(f"Formatting {platform} image...")
-                formatted_path = format_image_for_platform(image_path, platform)
-                if formatted_path:
-                    formatted_images[platform] = formatted_path
-                print()
-
-    # Step 5: Save posts for publishing
-    if not args.dry_run:
-        print("="*80)
-        print("PREPARING POSTS FOR PUBLISHING")
-        print("="*80 + "\n")
-
-        for platform in args.platforms:
-            post_text = posts.get(platform, "")
-            image_path = formatted_images.get(platform) or images.get(platform)
-
-            if platform == "instagram":
-                # Email Instagram post
-                email_instagram_post(post_text, image_path)
-            else:
-                # Save other platforms for manual posting
-                # TODO: Integrate platform-specific APIs for auto-posting
-                save_post_for_manual_publishing(platform, post_text, image_path)
-
-            print()
+        outcomes = asyncio.run(run_all_pipelines(
+            topic, posts, args.platforms,
+            make_images=not args.no_images, publish=not args.dry_run
+        ))
+        for platform, outcome in outcomes.items():
+            if outcome["image"]:
+                images[platform] = outcome["image"]
+            if outcome["formatted"]:
+                formatted_images[platform] = outcome["formatted"]
+        print()
 
     # Step 6: Save report
     timestamp = datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')
@@ -5,14 +5,23 @@
 import os
 import sys
 import json
+import atexit
+import base64
+import time
+import random
+import argparse
 import smtplib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, List, Optional, Tuple, Callable
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.mime.image import MIMEImage
+from pathlib import Path
 
 import requests
+from requests.adapters import HTTPAdapter
 import anthropic
 
 try:
@@ -43,6 +52,13 @@ except ImportError:
     TWEEPY_AVAILABLE = False
     print("INFO: tweepy not installed. Twitter auto-posting unavailable.")
 
+# Optional: faster JSON serialization for sessions and reports
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # --- Configuration ---
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
@@ -72,10 +88,21 @@ if not ANTHROPIC_API_KEY:
     sys.exit(1)
 
 anthropic_client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
+
+# Pooled HTTP session: one DNS lookup + TLS handshake per host for the whole run
+HTTP = requests.Session()
+HTTP.mount("https://", HTTPAdapter(pool_connections=8, pool_maxsize=16))
+atexit.register(HTTP.close)
+
 openai_client = None
 if OPENAI_AVAILABLE and OPENAI_API_KEY:
     openai_client = OpenAI(api_key=OPENAI_API_KEY)
 
+# One Gemini client per run (built only when image generation is possible)
+genai_client = None
+if GENAI_AVAILABLE and GOOGLE_API_KEY:
+    genai_client = genai.Client(api_key=GOOGLE_API_KEY)
+
 PLATFORM_LIMITS = {
     "twitter": 280,
     "threads": 500,
@@ -83,10 +110,167 @@ PLATFORM_LIMITS = {
     "instagram": 2200
 }
 
+DIVIDER = "─"*60
+ACTIONS = [
+    "Select variation 1",
+    "Select variation 2",
+    "Select variation 3",
+    "Give feedback and regenerate all",
+    "Give feedback targeting one variation",
+    "Skip this platform"
+]
+
 # Session management
 SESSION_DIR = "social_sessions"
 PERFORMANCE_DB = "post_performance.json"
 
+# Batch prefetch (--prefetch): how long to wait on the batch before drafting live
+PREFETCH_MAX_WAIT = 120
+
+# Claude concurrency (adapted at runtime from rate-limit headers)
+CLAUDE_MAX_CONCURRENCY = int(os.getenv("CLAUDE_MAX_CONCURRENCY", "4"))
+CLAUDE_MAX_ATTEMPTS = 4
+
+# ==================== RATE LIMITING ====================
+
+class RateAwareLimiter:
+    """Adaptive concurrency limit for Claude calls.
+
+    Throttles preemptively from the anthropic-ratelimit-* response headers
+    and falls back to AIMD: halve the limit on a 429, add one back after a
+    streak of successful calls.
+    """
+
+    def __init__(self, max_concurrency: int, increase_after: int = 5):
+        self.max_concurrency = max(1, max_concurrency)
+        self.limit = self.max_concurrency
+        self.increase_after = increase_after
+        self.in_flight = 0
+        self.success_streak = 0
+        self.pause_until = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        with self._cond:
+            while self.in_flight >= self.limit:
+                self._cond.wait()
+            self.in_flight += 1
+            wait = self.pause_until - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+
+    def release(self, headers=None, rate_limited: bool = False):
+        headers = headers or {}
+        with self._cond:
+            self.in_flight -= 1
+            if rate_limited:
+                self.limit = max(1, self.limit // 2)
+                self.success_streak = 0
+                retry_after = _parse_retry_after(headers.get("retry-after"))
+                self._pause_for(retry_after if retry_after is not None else 2.0)
+            else:
+                self.success_streak += 1
+                if self.success_streak >= self.increase_after and self.limit < self.max_concurrency:
+                    self.limit += 1
+                    self.success_streak = 0
+                self._apply_headers(headers)
+            self._cond.notify_all()
+
+    def _apply_headers(self, headers):
+        for kind in ("requests", "tokens"):
+            remaining = headers.get(f"anthropic-ratelimit-{kind}-remaining")
+            if remaining is None or not remaining.isdigit():
+                continue
+            if int(remaining) == 0:
+                reset_at = _parse_reset(headers.get(f"anthropic-ratelimit-{kind}-reset"))
+                self._pause_for(reset_at if reset_at is not None else 1.0)
+            elif kind == "requests":
+                # Never keep more calls in flight than the window has left
+                self.limit = max(1, min(self.limit, int(remaining)))
+
+    def _pause_for(self, seconds: float):
+        self.pause_until = max(self.pause_until, time.monotonic() + seconds)
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+def _parse_reset(value: Optional[str]) -> Optional[float]:
+    """Seconds until an RFC 3339 reset timestamp"""
+    if not value:
+        return None
+    try:
+        reset_at = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return max(0.0, (reset_at - datetime.now(timezone.utc)).total_seconds())
+
+claude_limiter = RateAwareLimiter(CLAUDE_MAX_CONCURRENCY)
+# Retries are handled here so 429s feed the limiter instead of the SDK's own backoff;
+# overloads (5xx/529), timeouts and connection errors get jittered backoff below
+_limited_anthropic = anthropic_client.with_options(max_retries=0)
+
+def _transient_error(e: Exception) -> bool:
+    """Errors the SDK would have retried: connection/timeout failures and 5xx (incl. 529 overloaded)"""
+    if isinstance(e, anthropic.APIConnectionError):
+        return True
+    return isinstance(e, anthropic.APIStatusError) and e.status_code >= 500
+
+def _backoff(attempt: int) -> None:
+    time.sleep(random.uniform(0, min(30.0, 2.0 ** (attempt + 1))))
+
+def create_message(**kwargs):
+    """anthropic messages.create() behind the rate-aware limiter"""
+    for attempt in range(CLAUDE_MAX_ATTEMPTS):
+        claude_limiter.acquire()
+        try:
+            raw = _limited_anthropic.messages.with_raw_response.create(**kwargs)
+        except anthropic.RateLimitError as e:
+            claude_limiter.release(e.response.headers, rate_limited=True)
+            if attempt == CLAUDE_MAX_ATTEMPTS - 1:
+                raise
+            continue
+        except Exception as e:
+            claude_limiter.release()
+            if not _transient_error(e) or attempt == CLAUDE_MAX_ATTEMPTS - 1:
+                raise
+            print(f"   ⏳ Claude error ({type(e).__name__}), retrying...")
+            _backoff(attempt)
+            continue
+        claude_limiter.release(raw.headers)
+        return raw.parse()
+
+def stream_message(on_text: Callable[[str], None], **kwargs):
+    """Streaming create_message(): on_text receives each text delta as it arrives"""
+    for attempt in range(CLAUDE_MAX_ATTEMPTS):
+        claude_limiter.acquire()
+        delivered = False
+        try:
+            with _limited_anthropic.messages.stream(**kwargs) as stream:
+                headers = stream.response.headers
+                for text in stream.text_stream:
+                    delivered = True
+                    on_text(text)
+                message = stream.get_final_message()
+        except anthropic.RateLimitError as e:
+            # Raised before any text is delivered, so retrying can't duplicate output
+            claude_limiter.release(e.response.headers, rate_limited=True)
+            if attempt == CLAUDE_MAX_ATTEMPTS - 1:
+                raise
+            continue
+        except Exception as e:
+            claude_limiter.release()
+            # Once text has reached on_text a retry would repeat it, so only retry before that
+            if delivered or not _transient_error(e) or attempt == CLAUDE_MAX_ATTEMPTS - 1:
+                raise
+            print(f"   ⏳ Claude error ({type(e).__name__}), retrying...")
+            _backoff(attempt)
+            continue
+        claude_limiter.release(headers)
+        return message
+
 # ==================== HELPER FUNCTIONS ====================
 
 def prompt_user(message: str, options: List[str]) -> str:
@@ -149,91 +333,151 @@ def get_multiline_input(prompt_text: str) -> str:
 
     return "\n".join(lines).strip()
 
+def print_variation(number: int, var: Dict, limit: int):
+    """Print one A/B variation block"""
+    print(f"\nVARIATION {number} - {var.get('style', 'unknown').upper()}")
+    post = var.get('post', '')
+    print(post)
+    print(f"Characters: {len(post)}/{limit}")
+    print(DIVIDER)
+
+def write_json_file(filename: str, data: Any) -> None:
+    """Write data as indented UTF-8 JSON (uses orjson when installed)"""
+    if ORJSON_AVAILABLE:
+        payload = orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    else:
+        payload = json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+    Path(filename).write_bytes(payload)
+
 # ==================== FEATURE 1: HASHTAG GENERATION ====================
 
-def generate_hashtags(topic: str, platform: str, count: int = 10) -> Dict[str, List[str]]:
-    """Generate strategic hashtags for a topic and platform"""
+HASHTAG_GUIDELINES = {
+    "twitter": "Mix of trending + niche. Keep them short and specific.",
+    "threads": "Use sparingly (3-5). Focus on community tags.",
+    "pinterest": "Highly searchable keywords. 10-15 hashtags OK.",
+    "instagram": "Mix of popular + niche. 15-30 hashtags recommended."
+}
 
-    platform_guidelines = {
-        "twitter": "Mix of trending + niche. Keep them short and specific.",
-        "threads": "Use sparingly (3-5). Focus on community tags.",
-        "pinterest": "Highly searchable keywords. 10-15 hashtags OK.",
-        "instagram": "Mix of popular + niche. 15-30 hashtags recommended."
-    }
+def generate_hashtags_multi(topic: str, platforms: List[str], count: int = 10) -> Dict[str, List[str]]:
+    """Generate recommended hashtags for several platforms in one call"""
+    guidelines = "\n".join(
+        f"- {platform}: {HASHTAG_GUIDELINES.get(platform, 'General hashtags')}"
+        for platform in platforms
+    )
+    json_shape = ",\n".join(f'  "{platform}": ["#tag", "#tag", ...]' for platform in platforms)
 
     prompt = f"""You are a social media strategist for "Plot Brew," a romantasy writing advice platform.
 
 **TOPIC:** {topic}
-**PLATFORM:** {platform}
-
-Generate strategic hashtags for this platform.
 
-**Platform Guidelines:** {platform_guidelines.get(platform, "General hashtags")}
+Give hashtags for this topic tailored per platform.
 
-**Hashtag Strategy:**
-- Mix of HIGH-TRAFFIC tags (competitive but discoverable)
-- NICHE tags (lower traffic, highly targeted romantasy audience)
-- COMMUNITY tags (BookTok, Bookstagram, writing communities)
-- GENRE tags (romantasy, fantasy romance, etc.)
+**Platform Guidelines:**
+{guidelines}
 
-**For Romantasy Content:**
+**Hashtag Strategy (per platform):**
+- Mix HIGH-TRAFFIC, NICHE, COMMUNITY (BookTok, Bookstagram, writing communities) and GENRE tags
 - Writing craft tags (#WritingTips, #AmWriting, #WritingCommunity)
 - Genre tags (#Romantasy, #FantasyRomance, #BookTok)
 - Niche craft tags (#CharacterDevelopment, #WorldBuilding, #WritingMagicSystems)
-- Reader community tags (#BookstagramCommunity, #RomanceReaders)
+
+For each platform, list your top picks in priority order (up to {count}, fewer where the guidelines say so).
 
 Return ONLY this JSON format:
 
 {{
-  "high_traffic": ["#tag1", "#tag2", ...],
-  "niche": ["#tag3", "#tag4", ...],
-  "community": ["#tag5", "#tag6", ...],
-  "recommended": ["#tag", "#tag", ...] // Your top {count} picks in priority order
+{json_shape}
 }}
 """
 
-    response = anthropic_client.messages.create(
+    response = create_message(
         model="claude-sonnet-4-5",
-        max_tokens=800,
+        max_tokens=1200,
         messages=[{"role": "user", "content": prompt}]
     )
 
-    return extract_json(response.content[0].text)
+    result = extract_json(response.content[0].text)
+    return {
+        platform: [tag for tag in result.get(platform, []) if isinstance(tag, str)]
+        for platform in platforms
+    }
 
 # ==================== FEATURE 2: SESSION SAVE/RESUME ====================
 
-def save_session(session_data: Dict, phase: str) -> str:
-    """Save current session to resume later"""
-    if not os.path.exists(SESSION_DIR):
-        os.makedirs(SESSION_DIR)
+# Sessions are append-only JSONL logs: the first line is a snapshot of the
+# selected topics, later lines are phase markers or single-field deltas.
+# Older session_*.json files (one full blob per save) still load.
 
-    timestamp = datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')
-    filename = f"{SESSION_DIR}/session_{timestamp}.json"
+def append_session_delta(log_file: str, delta: Dict) -> None:
+    """Append one checkpoint line to a session log"""
+    delta = {**delta, 'saved_at': datetime.now(timezone.utc).isoformat()}
+    if ORJSON_AVAILABLE:
+        line = orjson.dumps(delta, option=orjson.OPT_NON_STR_KEYS)
+    else:
+        line = json.dumps(delta, ensure_ascii=False).encode('utf-8')
 
-    session_data['current_phase'] = phase
-    session_data['saved_at'] = datetime.now(timezone.utc).isoformat()
+    with open(log_file, 'ab') as f:
+        f.write(line + b"\n")
 
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(session_data, f, indent=2, ensure_ascii=False)
+def save_session(session_data: Dict, phase: str, log_file: Optional[str] = None) -> str:
+    """Checkpoint the session to resume later
 
-    return filename
+    Without log_file a new log is started with a snapshot of session_data;
+    with one, only a phase marker is appended (field changes are logged as
+    they happen). Returns the log path.
+    """
+    if log_file is None:
+        if not os.path.exists(SESSION_DIR):
+            os.makedirs(SESSION_DIR)
 
-def load_latest_session() -> Optional[Dict]:
-    """Load most recent saved session"""
-    if not os.path.exists(SESSION_DIR):
-        return None
+        timestamp = datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')
+        log_file = f"{SESSION_DIR}/session_{timestamp}.jsonl"
+        append_session_delta(log_file, {'selected_topics': session_data.get('selected_topics', [])})
 
-    sessions = [f for f in os.listdir(SESSION_DIR) if f.startswith('session_') and f.endswith('.json')]
-    if not sessions:
-        return None
+    append_session_delta(log_file, {'phase': phase})
+    return log_file
 
-    # Get most recent
-    sessions.sort(reverse=True)
-    latest = sessions[0]
+def replay_session_log(log_file: str) -> Dict:
+    """Fold a session log's lines left-to-right into the session state"""
+    state = {'selected_topics': [], 'current_phase': 'brainstorm', 'saved_at': ''}
 
-    with open(os.path.join(SESSION_DIR, latest), 'r', encoding='utf-8') as f:
+    with open(log_file, 'rb') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                delta = json.loads(line)
+            except ValueError:
+                continue  # Torn final line from an interrupted write
+
+            if 'selected_topics' in delta:
+                state['selected_topics'] = delta['selected_topics']
+            if 'phase' in delta:
+                state['current_phase'] = delta['phase']
+            if 'field' in delta and 0 <= delta.get('topic_idx', -1) < len(state['selected_topics']):
+                topic = state['selected_topics'][delta['topic_idx']]
+                if delta.get('key') is not None:
+                    if not isinstance(topic.get(delta['field']), dict):
+                        topic[delta['field']] = {}
+                    topic[delta['field']][delta['key']] = delta['value']
+                else:
+                    topic[delta['field']] = delta['value']
+            state['saved_at'] = delta.get('saved_at', state['saved_at'])
+
+    return state
+
+def read_session_file(filepath: str) -> Dict:
+    """Load a session from a JSONL log or a legacy JSON snapshot"""
+    if filepath.endswith('.jsonl'):
+        return replay_session_log(filepath)
+    with open(filepath, 'r', encoding='utf-8') as f:
         return json.load(f)
 
+def load_latest_session() -> Optional[Dict]:
+    """Load most recent saved session"""
+    sessions = list_saved_sessions()
+    return sessions[0][1] if sessions else None
+
 def list_saved_sessions() -> List[Tuple[str, Dict]]:
     """List all saved sessions with metadata"""
     if not os.path.exists(SESSION_DIR):
@@ -241,21 +485,39 @@ def list_saved_sessions() -> List[Tuple[str, Dict]]:
 
     sessions = []
     for filename in os.listdir(SESSION_DIR):
-        if filename.startswith('session_') and filename.endswith('.json'):
-            filepath = os.path.join(SESSION_DIR, filename)
-            with open(filepath, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                sessions.append((filename, data))
+        if filename.startswith('session_') and filename.endswith(('.json', '.jsonl')):
+            data = read_session_file(os.path.join(SESSION_DIR, filename))
+            sessions.append((filename, data))
 
     sessions.sort(key=lambda x: x[1].get('saved_at', ''), reverse=True)
     return sessions
 
 # ==================== FEATURE 3: A/B TESTING ====================
 
-def draft_post_variations(topic: str, platform: str, research: Optional[str] = None, count: int = 3) -> List[str]:
-    """Generate multiple post variations for A/B testing"""
+# A/B variation styles: key -> (label, approach)
+VARIATION_STYLES = {
+    "educational": ("Educational/How-To", "Lead with practical tips, step-by-step approach"),
+    "personal": ("Personal Story/Vulnerable", "Start with your own struggle or journey, then share the lesson"),
+    "provocative": ("Provocative/Hot Take", "Bold statement or controversial angle (but supportive), challenge assumptions")
+}
+
+def build_variations_prompt(topic: str, platform: str, research: Optional[str] = None, count: int = 3,
+                            styles: Optional[List[str]] = None, feedback: Optional[str] = None) -> str:
+    """Build the A/B variation prompt (shared by live drafting and batch prefetch)"""
+    styles = styles or list(VARIATION_STYLES)[:count]
+    count = len(styles)
 
     research_context = f"\n\n**RESEARCH CONTEXT:**\n{research}" if research else ""
+    feedback_context = f"\n\n**USER FEEDBACK ON PREVIOUS DRAFTS:**\n{feedback}" if feedback else ""
+
+    style_briefs = "\n\n".join(
+        f"{n}. **Variation {n} - {VARIATION_STYLES[style][0]}**\n   {VARIATION_STYLES[style][1]}"
+        for n, style in enumerate(styles, 1)
+    )
+    json_entries = ",\n".join(
+        f'    {{\n      "style": "{style}",\n      "post": "Your post text here"\n    }}'
+        for style in styles
+    )
 
     platform_specs = {
         "twitter": "280 chars max - Hook + craft insight + question",
@@ -267,7 +529,7 @@ def draft_post_variations(topic: str, platform: str, research: Optional[str] = N
     prompt = f"""You are creating {count} different variations of a social media post for "Plot Brew."
 
 **TOPIC:** {topic}{research_context}
-**PLATFORM:** {platform} - {platform_specs.get(platform, "")}
+**PLATFORM:** {platform} - {platform_specs.get(platform, "")}{feedback_context}
 
 **YOUR VOICE:**
 - Personal and vulnerable (share writing journey)
@@ -278,44 +540,135 @@ def draft_post_variations(topic: str, platform: str, research: Optional[str] = N
 
 **CREATE {count} VARIATIONS with different approaches:**
 
-1. **Variation 1 - Educational/How-To**
-   Lead with practical tips, step-by-step approach
-
-2. **Variation 2 - Personal Story/Vulnerable**
-   Start with your own struggle or journey, then share the lesson
-
-3. **Variation 3 - Provocative/Hot Take**
-   Bold statement or controversial angle (but supportive), challenge assumptions
+{style_briefs}
 
 Return ONLY this JSON format:
 
 {{
   "variations": [
-    {{
-      "style": "educational",
-      "post": "Your post text here"
-    }},
-    {{
-      "style": "personal",
-      "post": "Your post text here"
-    }},
-    {{
-      "style": "provocative",
-      "post": "Your post text here"
-    }}
+{json_entries}
   ]
 }}
 """
 
-    response = anthropic_client.messages.create(
-        model="claude-sonnet-4-5",
-        max_tokens=2000,
-        messages=[{"role": "user", "content": prompt}]
-    )
+    return prompt
+
+def draft_post_variations(topic: str, platform: str, research: Optional[str] = None, count: int = 3,
+                          on_variation: Optional[Callable[[int, Dict], None]] = None,
+                          styles: Optional[List[str]] = None, feedback: Optional[str] = None) -> List[str]:
+    """Generate multiple post variations for A/B testing
+
+    styles limits generation to specific VARIATION_STYLES keys (e.g. to redo
+    one rejected variation). With on_variation, the response is streamed and
+    each variation is passed to the callback (numbered from 1) as soon as its
+    JSON object is complete.
+    """
+    prompt = build_variations_prompt(topic, platform, research, count, styles, feedback)
+    request = {
+        "model": "claude-sonnet-4-5",
+        "max_tokens": 2000,
+        "messages": [{"role": "user", "content": prompt}]
+    }
+
+    if on_variation is None:
+        response = create_message(**request)
+    else:
+        parser = VariationStreamParser()
+        streamed = []
+
+        def handle_text(text: str):
+            for var in parser.feed(text):
+                streamed.append(var)
+                on_variation(len(streamed), var)
+
+        response = stream_message(handle_text, **request)
 
     result = extract_json(response.content[0].text)
     return result.get('variations', [])
 
+class VariationStreamParser:
+    """Pulls complete {"style", "post"} objects out of a streamed variations JSON"""
+
+    def __init__(self):
+        self.buffer = ""
+        self.pos = None
+        self._decoder = json.JSONDecoder()
+
+    def feed(self, text: str) -> List[Dict]:
+        self.buffer += text
+        if self.pos is None:
+            array_start = self.buffer.find('[')
+            if array_start == -1:
+                return []
+            self.pos = array_start + 1
+
+        completed = []
+        while True:
+            start = self.buffer.find('{', self.pos)
+            if start == -1:
+                break
+            try:
+                obj, end = self._decoder.raw_decode(self.buffer, start)
+            except json.JSONDecodeError:
+                break  # Object still streaming in
+            self.pos = end
+            if isinstance(obj, dict) and 'post' in obj:
+                completed.append(obj)
+        return completed
+
+def variations_batch_id(topic_index: int, platform: str) -> str:
+    """custom_id for a (topic, platform) request in the prefetch batch"""
+    return f"topic{topic_index}_{platform}"
+
+def submit_variations_batch(selected_topics: List[Dict], skip_first: bool = True) -> Optional[str]:
+    """Submit first-pass variation prompts for every (topic, platform) as one Message Batch
+
+    Topic 1 is drafted live while the batch runs, so it is skipped by default.
+    """
+    batch_requests = []
+    for t_idx, topic_data in enumerate(selected_topics):
+        if skip_first and t_idx == 0:
+            continue
+        for platform in topic_data['platforms']:
+            prompt = build_variations_prompt(topic_data['topic'], platform, topic_data.get('research'), 3)
+            batch_requests.append({
+                "custom_id": variations_batch_id(t_idx, platform),
+                "params": {
+                    "model": "claude-sonnet-4-5",
+                    "max_tokens": 2000,
+                    "messages": [{"role": "user", "content": prompt}]
+                }
+            })
+
+    if not batch_requests:
+        return None
+
+    batch = anthropic_client.messages.batches.create(requests=batch_requests)
+    return batch.id
+
+def collect_variations_batch(batch_id: str, max_wait: float = PREFETCH_MAX_WAIT) -> Optional[Dict[str, List[Dict]]]:
+    """Poll the batch with exponential backoff; None if it hasn't ended within max_wait"""
+    deadline = time.monotonic() + max_wait
+    delay = 2.0
+
+    while True:
+        batch = anthropic_client.messages.batches.retrieve(batch_id)
+        if batch.processing_status == "ended":
+            break
+        if time.monotonic() + delay > deadline:
+            return None
+        time.sleep(delay)
+        delay = min(delay * 2, 30.0)
+
+    results = {}
+    for entry in anthropic_client.messages.batches.results(batch_id):
+        if entry.result.type != "succeeded":
+            continue
+        variations = extract_json(entry.result.message.content[0].text).get('variations', [])
+        if variations:
+            results[entry.custom_id] = variations
+    return results
+
 def track_post_performance(topic: str, platform: str, variation_style: str, post_text: str):
     """Track which variations get selected for future learning"""
     if not os.path.exists(PERFORMANCE_DB):
@@ -489,7 +842,7 @@ Return ONLY this JSON format:
 }}
 """
 
-    response = anthropic_client.messages.create(
+    response = create_message(
         model="claude-sonnet-4-5",
         max_tokens=2500,
         messages=[{"role": "user", "content": prompt}]
@@ -532,7 +885,7 @@ def repurpose_content(original_post: str, from_platform: str, to_platform: str,
 Return ONLY the repurposed content (no JSON, no preamble).
 """
 
-    response = anthropic_client.messages.create(
+    response = create_message(
         model="claude-sonnet-4-5",
         max_tokens=2500,
         messages=[{"role": "user", "content": prompt}]
@@ -624,7 +977,7 @@ Return ONLY this JSON format:
 }}
 """
 
-    response = anthropic_client.messages.create(
+    response = create_message(
         model="claude-sonnet-4-5",
         max_tokens=2500,
         messages=[{"role": "user", "content": prompt}]
@@ -665,7 +1018,7 @@ def optimize_emoji_placement(post: str, platform: str) -> str:
 Return ONLY the post with emojis added (no JSON, no explanation).
 """
 
-    response = anthropic_client.messages.create(
+    response = create_message(
         model="claude-sonnet-4-5",
         max_tokens=1000,
         messages=[{"role": "user", "content": prompt}]
@@ -709,7 +1062,7 @@ Return ONLY this JSON format:
 }}
 """
 
-    response = anthropic_client.messages.create(
+    response = create_message(
         model="claude-sonnet-4-5",
         max_tokens=800,
         messages=[{"role": "user", "content": prompt}]
@@ -746,7 +1099,7 @@ Return ONLY this JSON format:
 }}
 """
 
-    response = anthropic_client.messages.create(
+    response = create_message(
         model="claude-sonnet-4-5",
         max_tokens=1500,
         messages=[{"role": "user", "content": prompt}]
@@ -789,7 +1142,7 @@ Return ONLY this JSON format:
 }}
 """
 
-    response = anthropic_client.messages.create(
+    response = create_message(
         model="claude-sonnet-4-5",
         max_tokens=1500,
         messages=[{"role": "user", "content": prompt}]
@@ -800,6 +1153,27 @@ Return ONLY this JSON format:
 
 # ==================== PHASE 3: RESEARCH ====================
 
+def research_query(topic: str) -> str:
+    """Search query used for a topic's research"""
+    return f"romantasy writing {topic} discussions trends tips"
+
+def prefetch_research(topics: List[Dict]) -> Dict[int, Any]:
+    """Start web searches for every selected topic in the background
+
+    Returns futures keyed by topic index; PHASE 3 collects whichever ones the
+    user chooses to keep.
+    """
+    if not openai_client or not topics:
+        return {}
+
+    pool = ThreadPoolExecutor(max_workers=min(4, len(topics)))
+    futures = {
+        idx: pool.submit(run_web_search, research_query(topic_data['topic']))
+        for idx, topic_data in enumerate(topics)
+    }
+    pool.shutdown(wait=False)
+    return futures
+
 def run_web_search(query: str) -> str:
     """Run web search using GPT-4o-mini"""
     if not openai_client:
@@ -862,7 +1236,7 @@ Return ONLY this JSON format:
 }}
 """
 
-    response = anthropic_client.messages.create(
+    response = create_message(
         model="claude-sonnet-4-5",
         max_tokens=2500,
         messages=[{"role": "user", "content": prompt}]
@@ -885,7 +1259,7 @@ def revise_post(original_post: str, platform: str, feedback: str) -> str:
 Apply the feedback and return ONLY the revised post (no JSON, no preamble).
 """
 
-    response = anthropic_client.messages.create(
+    response = create_message(
         model="claude-sonnet-4-5",
         max_tokens=1000,
         messages=[{"role": "user", "content": prompt}]
@@ -920,7 +1294,7 @@ def generate_image_prompt(topic: str, platform: str, feedback: Optional[str] = N
 Return ONLY the image generation prompt (start with "Create a...").
 """
 
-    response = anthropic_client.messages.create(
+    response = create_message(
         model="claude-sonnet-4-5",
         max_tokens=800,
         messages=[{"role": "user", "content": prompt}]
@@ -928,6 +1302,19 @@ Return ONLY the image generation prompt (start with "Create a...").
 
     return response.content[0].text.strip()
 
+# Gemini image mime type -> file extension
+IMAGE_EXTENSIONS = {"image/png": ".png", "image/jpeg": ".jpg", "image/webp": ".webp"}
+
+def save_inline_image(inline_data, filename_stem: str) -> str:
+    """Write Gemini's encoded image bytes straight to disk (no PIL decode/re-encode)"""
+    data = inline_data.data
+    if isinstance(data, str):
+        data = base64.b64decode(data)
+    filename = filename_stem + IMAGE_EXTENSIONS.get(inline_data.mime_type, ".png")
+    with open(filename, 'wb') as f:
+        f.write(data)
+    return filename
+
 def generate_image(image_prompt: str, platform: str, topic_slug: str) -> Optional[str]:
     """Generate image using Gemini"""
     if not GENAI_AVAILABLE or not GOOGLE_API_KEY:
@@ -937,7 +1324,7 @@ def generate_image(image_prompt: str, platform: str, topic_slug: str) -> Optiona
     aspect_ratio = aspect_ratios.get(platform, "1:1")
 
     try:
-        client = genai.Client(api_key=GOOGLE_API_KEY)
+        client = genai_client
         response = client.models.generate_content(
             model="gemini-2.0-flash-exp",
             contents=[image_prompt],
@@ -948,13 +1335,11 @@ def generate_image(image_prompt: str, platform: str, topic_slug: str) -> Optiona
         )
 
         timestamp = datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')
-        image_filename = f"batch_{topic_slug}_{platform}_{timestamp}.png"
+        image_stem = f"batch_{topic_slug}_{platform}_{timestamp}"
 
         for part in response.parts:
             if part.inline_data is not None:
-                image = part.as_image()
-                image.save(image_filename)
-                return image_filename
+                return save_inline_image(part.inline_data, image_stem)
 
         return None
     except Exception as e:
@@ -1012,7 +1397,7 @@ def post_to_threads(text: str, image_path: Optional[str] = None) -> bool:
             "access_token": META_ACCESS_TOKEN
         }
 
-        response = requests.post(url, json=data, timeout=30)
+        response = HTTP.post(url, json=data, timeout=30)
         response.raise_for_status()
         container_id = response.json()["id"]
 
@@ -1022,7 +1407,7 @@ def post_to_threads(text: str, image_path: Optional[str] = None) -> bool:
             "access_token": META_ACCESS_TOKEN
         }
 
-        publish_response = requests.post(publish_url, json=publish_data, timeout=30)
+        publish_response = HTTP.post(publish_url, json=publish_data, timeout=30)
         publish_response.raise_for_status()
 
         print(f"  ✓ Posted to Threads")
@@ -1059,9 +1444,7 @@ Image attached (if generated).
 
         if image_path and os.path.exists(image_path):
             with open(image_path, 'rb') as f:
-                img_data = f.read()
-                image = MIMEImage(img_data, name=os.path.basename(image_path))
-                msg.attach(image)
+                msg.attach(MIMEImage(f.read(), name=os.path.basename(image_path)))
 
         with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as server:
             server.starttls()
@@ -1074,30 +1457,44 @@ Image attached (if generated).
         print(f"  ✗ Email failed: {e}")
         return False
 
-# ==================== UTILITIES ====================
+# Platform -> publisher, all called as poster(text, image_path)
+POSTERS = {
+    "twitter": post_to_twitter,
+    "threads": post_to_threads,
+    "pinterest": post_to_pinterest,
+    "instagram": email_instagram_post
+}
 
-def extract_json(text: str) -> Dict:
-    """Extract JSON from AI response"""
-    import re
+# ==================== UTILITIES ====================
 
-    if "```json" in text:
-        text = text.split("```json")[1].split("```")[0].strip()
-    elif "```" in text:
-        text = text.split("```")[1].split("```")[0].strip()
+_JSON_DECODER = json.JSONDecoder()
 
+def extract_json(text: str) -> Dict:
+    """Extract JSON from AI response (tolerates code fences/preamble); {} if there is none"""
+    # raw_decode parses from the first brace in one pass and stops at the
+    # object's end, so fences and trailing prose need no extra scans
     start = text.find("{")
-    end = text.rfind("}") + 1
-    if start != -1 and end > start:
-        text = text[start:end]
-
+    if start == -1:
+        return {}
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.loads(text[start:text.rfind("}") + 1])
+        except orjson.JSONDecodeError:
+            pass  # prose with braces after the object - let raw_decode find its end
     try:
-        return json.loads(text)
-    except:
+        obj, _ = _JSON_DECODER.raw_decode(text, start)
+    except json.JSONDecodeError:
         return {}
+    return obj
 
 # ==================== MAIN WORKFLOW ====================
 
 def main():
+    parser = argparse.ArgumentParser(description="Plot Brew batch social media workflow")
+    parser.add_argument("--prefetch", action="store_true",
+                        help="Draft first-pass variations for topics 2..N via the Message Batches API (50%% cheaper)")
+    args = parser.parse_args()
+
     print("="*80)
     print("ROMANTASY SOCIAL MEDIA AUTOMATION - BATCH WORKFLOW")
     print("Plot Brew - Multi-Topic Content Generation")
@@ -1107,6 +1504,16 @@ def main():
     saved_sessions = list_saved_sessions()
     selected_topics = []
     start_phase = "brainstorm"
+    session_log = None
+
+    def checkpoint(topic_idx: int, field: str, key: Optional[str] = None):
+        """Log one topic field (or one key of it) once the user has saved the session"""
+        if not session_log:
+            return
+        value = selected_topics[topic_idx].get(field)
+        if key is not None:
+            value = (value or {}).get(key)
+        append_session_delta(session_log, {'topic_idx': topic_idx, 'field': field, 'key': key, 'value': value})
 
     if saved_sessions:
         print(f"\n💾 Found {len(saved_sessions)} saved session(s)")
@@ -1188,7 +1595,12 @@ def main():
 
         selected_topics.append(topic_data)
 
-    print(f"\n✅ Selected {len(selected_topics)} topics for content creation")
+    N = len(selected_topics)
+    banners = [f"--- TOPIC {i}/{N}: {t['topic']} ---" for i, t in enumerate(selected_topics, 1)]
+    print(f"\n✅ Selected {N} topics for content creation")
+
+    # Searches run while the user works through the balance check and PHASE 3 prompts
+    research_futures = prefetch_research(selected_topics)
 
     # CONTENT BALANCE CHECK
     balance_analysis = analyze_content_balance(selected_topics)
@@ -1210,7 +1622,7 @@ def main():
     print("="*80)
 
     for i, topic_data in enumerate(selected_topics, 1):
-        print(f"\n--- TOPIC {i}/{len(selected_topics)}: {topic_data['topic']} ---")
+        print("\n" + banners[i - 1])
 
         research_choice = prompt_user(
             "How would you like to gather research?",
@@ -1223,13 +1635,17 @@ def main():
 
         if "AI generates" in research_choice:
             print("\n🔍 Generating search query...")
-            query = f"romantasy writing {topic_data['topic']} discussions trends tips"
+            query = research_query(topic_data['topic'])
             print(f"🔎 Search query: {query}")
 
             if confirm_action("Run this search?"):
-                print("🌐 Searching...")
+                future = research_futures.pop(i - 1, None)
+                if future is not None and not future.done():
+                    print("🌐 Waiting for search started earlier...")
+                elif future is None:
+                    print("🌐 Searching...")
                 try:
-                    research = run_web_search(query)
+                    research = future.result() if future is not None else run_web_search(query)
                     print(f"\n📊 Preview: {research[:300]}...")
                     topic_data['research'] = research
                 except Exception as e:
@@ -1241,24 +1657,45 @@ def main():
                 topic_data['research'] = research
                 print("✓ Research saved")
 
+    # Drop searches the user didn't use (queued ones never run)
+    for future in research_futures.values():
+        future.cancel()
+
     # Save session after research
     if confirm_action("\n💾 Save session before continuing?"):
-        session_file = save_session({'selected_topics': selected_topics}, 'post_drafting')
-        print(f"✓ Session saved: {session_file}")
+        session_log = save_session({'selected_topics': selected_topics}, 'post_drafting', session_log)
+        print(f"✓ Session saved: {session_log}")
 
     # PHASE 4: DRAFT POSTS (with A/B testing & feedback loop)
     print("\n" + "="*80)
     print("PHASE 4: POST DRAFTING (A/B TESTING)")
     print("="*80)
 
+    prefetch_batch_id = None
+    prefetched = None
+    if args.prefetch and len(selected_topics) > 1:
+        try:
+            prefetch_batch_id = submit_variations_batch(selected_topics)
+            if prefetch_batch_id:
+                print(f"📦 Prefetching variations for topics 2-{len(selected_topics)} (batch {prefetch_batch_id})")
+        except Exception as e:
+            print(f"⚠️  Batch prefetch unavailable, drafting live: {e}")
+
+    # Latest variation per (topic, platform, style); reused instead of regenerating
+    seen_variations = {}
+
     for i, topic_data in enumerate(selected_topics, 1):
-        print(f"\n--- TOPIC {i}/{len(selected_topics)}: {topic_data['topic']} ---")
+        topic_index = i - 1
+        print("\n" + banners[i - 1])
         topic_data['posts'] = {}
         topic_data['hashtags'] = {}
 
         # Generate posts for each platform
         for platform in topic_data['platforms']:
             satisfied = False
+            feedback = None
+            target_style = None
+            limit = PLATFORM_LIMITS[platform]
 
             while not satisfied:
                 print(f"\n{platform.upper()}:")
@@ -1289,12 +1726,12 @@ def main():
                     )
 
                     if tweets:
-                        print("\n" + "─"*60)
+                        print("\n" + DIVIDER)
                         for i, tweet in enumerate(tweets, 1):
                             print(f"\nTWEET {i}/{len(tweets)}")
                             print(tweet)
                             print(f"Characters: {len(tweet)}/280")
-                            print("─"*60)
+                            print(DIVIDER)
 
                         if confirm_action("\nAccept this thread?"):
                             # Store as thread
@@ -1320,13 +1757,13 @@ def main():
                     )
 
                     if slides:
-                        print("\n" + "─"*60)
+                        print("\n" + DIVIDER)
                         for slide in slides:
                             print(f"\nSLIDE {slide['number']} - {slide['type'].upper()}")
                             print(f"Title: {slide['title']}")
                             print(f"Body: {slide['body']}")
                             print(f"Image: {slide['image_prompt'][:80]}...")
-                            print("─"*60)
+                            print(DIVIDER)
 
                         if confirm_action("\nAccept this carousel?"):
                             # Store carousel data
@@ -1341,13 +1778,74 @@ def main():
                     continue
 
                 # STANDARD POST WITH A/B TESTING
-                print("🎨 Generating 3 variations for A/B testing...")
-                variations = draft_post_variations(
-                    topic_data['topic'],
-                    platform,
-                    topic_data.get('research'),
-                    count=3
-                )
+                styles = list(VARIATION_STYLES)
+                seen_keys = [(topic_data['topic'], platform, style) for style in styles]
+                streamed = []
+
+                if target_style:
+                    print(f"✏️  Regenerating the {target_style} variation with feedback...")
+                    regenerated = draft_post_variations(
+                        topic_data['topic'],
+                        platform,
+                        topic_data.get('research'),
+                        styles=[target_style],
+                        feedback=feedback
+                    )
+                    if regenerated:
+                        regenerated[0]['style'] = target_style
+                        seen_variations[(topic_data['topic'], platform, target_style)] = regenerated[0]
+                    else:
+                        print("✗ Regeneration failed - keeping the previous version")
+                    feedback = None
+                    target_style = None
+
+                elif feedback or not all(key in seen_variations for key in seen_keys):
+                    variations = None
+                    if prefetch_batch_id and topic_index > 0 and not feedback:
+                        if prefetched is None:
+                            print("📦 Checking prefetched variations...")
+                            try:
+                                prefetched = collect_variations_batch(prefetch_batch_id)
+                            except Exception as e:
+                                print(f"⚠️  Could not read batch results: {e}")
+                            if prefetched is None:
+                                # Don't wait on the batch again for later topics
+                                print("⚠️  Prefetch not ready - generating live")
+                                try:
+                                    anthropic_client.messages.batches.cancel(prefetch_batch_id)
+                                except Exception:
+                                    pass
+                                prefetch_batch_id = None
+                        if prefetched is not None:
+                            # First pass only - regenerations always go live
+                            variations = prefetched.pop(variations_batch_id(topic_index, platform), None)
+
+                    if not variations:
+                        if feedback:
+                            print("✏️  Regenerating all variations with feedback...")
+                        else:
+                            print("🎨 Generating 3 variations for A/B testing...")
+                        print("\n" + DIVIDER)
+
+                        def show_variation(number: int, var: Dict):
+                            print_variation(number, var, limit)
+                            streamed.append(number)
+
+                        variations = draft_post_variations(
+                            topic_data['topic'],
+                            platform,
+                            topic_data.get('research'),
+                            count=3,
+                            on_variation=show_variation,
+                            feedback=feedback
+                        )
+                    feedback = None
+
+                    for key, var in zip(seen_keys, variations):
+                        var['style'] = key[2]
+                        seen_variations[key] = var
+
+                variations = [seen_variations[key] for key in seen_keys if key in seen_variations]
 
                 if not variations:
                     print("✗ Failed to generate variations")
@@ -1355,26 +1853,14 @@ def main():
                         break
                     continue
 
-                # Show all variations
-                print("\n" + "─"*60)
+                # Show any variations that weren't already streamed
+                if not streamed:
+                    print("\n" + DIVIDER)
                 for j, var in enumerate(variations, 1):
-                    style = var.get('style', 'unknown')
-                    post_text = var.get('post', '')
-                    print(f"\nVARIATION {j} - {style.upper()}")
-                    print(post_text)
-                    print(f"Characters: {len(post_text)}/{PLATFORM_LIMITS[platform]}")
-                    print("─"*60)
-
-                action = prompt_user(
-                    f"What would you like to do?",
-                    [
-                        "Select variation 1",
-                        "Select variation 2",
-                        "Select variation 3",
-                        "Give feedback and regenerate all",
-                        "Skip this platform"
-                    ]
-                )
+                    if j not in streamed:
+                        print_variation(j, var, limit)
+
+                action = prompt_user("What would you like to do?", ACTIONS)
 
                 if "Select variation" in action:
                     var_num = int(action.split()[-1]) - 1
@@ -1389,31 +1875,17 @@ def main():
                         current_post
                     )
 
-                    # Generate hashtags
-                    print(f"\n🏷️  Generating hashtags for {platform}...")
-                    hashtags_data = generate_hashtags(topic_data['topic'], platform)
-                    recommended = hashtags_data.get('recommended', [])
-
-                    print(f"\n📌 RECOMMENDED HASHTAGS ({len(recommended)}):")
-                    print(" ".join(recommended))
-
-                    if confirm_action("\nUse these hashtags?"):
-                        topic_data['hashtags'][platform] = recommended
-                        # Append to Instagram post if applicable
-                        if platform == "instagram" and recommended:
-                            current_post += "\n\n" + " ".join(recommended)
-
                     # CTA VARIATIONS
                     if confirm_action("\n🎯 Try different CTA (call-to-action) options?"):
                         print("  Generating CTA options...")
                         cta_options = generate_cta_options(topic_data['topic'], "engagement")
 
                         if cta_options:
-                            print("\n" + "─"*60)
+                            print("\n" + DIVIDER)
                             for i, cta in enumerate(cta_options, 1):
                                 print(f"\n{i}. [{cta['type'].upper()}] {cta['text']}")
                                 print(f"   Purpose: {cta['purpose']}")
-                            print("─"*60)
+                            print(DIVIDER)
 
                             cta_choice = input("\nSelect CTA number (or Enter to keep current): ").strip()
                             if cta_choice.isdigit() and 1 <= int(cta_choice) <= len(cta_options):
@@ -1438,9 +1910,13 @@ def main():
                     satisfied = True
 
                 elif "feedback" in action:
+                    if "targeting one" in action:
+                        target_style = prompt_user(
+                            "Which variation should be regenerated?",
+                            [var['style'] for var in variations]
+                        )
                     feedback = get_multiline_input("Enter your feedback:")
-                    print("✏️  Regenerating with feedback...")
-                    # This will loop and regenerate
+                    # Loops back and regenerates with the feedback
                     continue
 
                 else:  # Skip
@@ -1448,10 +1924,39 @@ def main():
                         topic_data['platforms'].remove(platform)
                     satisfied = True
 
+            if platform in topic_data['posts']:
+                checkpoint(topic_index, 'posts', platform)
+
+        # HASHTAGS - one call covering every standard post for this topic
+        special_formats = topic_data.get('post_type', {})
+        hashtag_platforms = [p for p in topic_data['posts'] if p not in special_formats]
+        if hashtag_platforms:
+            print(f"\n🏷️  Generating hashtags for {', '.join(hashtag_platforms)}...")
+            hashtags_by_platform = generate_hashtags_multi(topic_data['topic'], hashtag_platforms)
+
+            for platform in hashtag_platforms:
+                recommended = hashtags_by_platform.get(platform, [])
+                if not recommended:
+                    continue
+
+                print(f"\n📌 RECOMMENDED HASHTAGS - {platform.upper()} ({len(recommended)}):")
+                print(" ".join(recommended))
+
+                if confirm_action("\nUse these hashtags?"):
+                    topic_data['hashtags'][platform] = recommended
+                    # Append to Instagram post if applicable
+                    if platform == "instagram":
+                        topic_data['posts'][platform] += "\n\n" + " ".join(recommended)
+                        checkpoint(topic_index, 'posts', platform)
+
+        for field in ('platforms', 'hashtags', 'post_type', 'thread_tweets', 'carousel_slides'):
+            if field in topic_data:
+                checkpoint(topic_index, field)
+
     # Save session after posts
     if confirm_action("\n💾 Save session before continuing?"):
-        session_file = save_session({'selected_topics': selected_topics}, 'repurposing')
-        print(f"✓ Session saved: {session_file}")
+        session_log = save_session({'selected_topics': selected_topics}, 'repurposing', session_log)
+        print(f"✓ Session saved: {session_log}")
 
     # REPURPOSING ENGINE
     print("\n" + "="*80)
@@ -1498,10 +2003,10 @@ def main():
                         topic_data['topic']
                     )
 
-                    print("\n" + "─"*60)
+                    print("\n" + DIVIDER)
                     print(f"REPURPOSED CONTENT ({target_format}):")
                     print(repurposed[:500] + "..." if len(repurposed) > 500 else repurposed)
-                    print("─"*60)
+                    print(DIVIDER)
 
                     if confirm_action("\nSave this repurposed content?"):
                         # Save to file
@@ -1524,7 +2029,7 @@ def main():
     else:
         for i, topic_data in enumerate(selected_topics, 1):
             topic_slug = topic_data['topic'][:30].replace(" ", "_").lower()
-            print(f"\n--- TOPIC {i}/{len(selected_topics)}: {topic_data['topic']} ---")
+            print("\n" + banners[i - 1])
 
             for platform in topic_data['platforms']:
                 if platform not in topic_data['posts']:
@@ -1556,6 +2061,7 @@ def main():
 
                         if confirm_action("  Accept this image?"):
                             topic_data['images'][platform] = image_path
+                            checkpoint(i - 1, 'images', platform)
                             satisfied = True
                         else:
                             image_feedback = get_multiline_input("  Enter feedback for next attempt:")
@@ -1627,15 +2133,7 @@ def main():
                 continue
 
             print(f"  {platform}:", end=" ")
-
-            if platform == "twitter":
-                post_to_twitter(post_text, image_path)
-            elif platform == "threads":
-                post_to_threads(post_text, image_path)
-            elif platform == "pinterest":
-                post_to_pinterest(post_text, image_path)
-            elif platform == "instagram":
-                email_instagram_post(post_text, image_path)
+            POSTERS[platform](post_text, image_path)
 
     # Save report
     timestamp = datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')
@@ -1645,8 +2143,7 @@ def main():
     }
 
     report_file = f"batch_report_{timestamp}.json"
-    with open(report_file, 'w', encoding='utf-8') as f:
-        json.dump(report, f, indent=2, ensure_ascii=False)
+    write_json_file(report_file, report)
 
     print("\n" + "="*80)
     print(f"✅ Batch complete! Report: {report_file}")
@@ -3,16 +3,24 @@
 # Interactive social media automation with human-in-the-loop review
 
 import os
+import atexit
 import sys
 import json
+import time
+import base64
+import asyncio
+import importlib.util
 import smtplib
+import threading
 from datetime import datetime, timezone
-from typing import Dict, Any, List, Optional
+from functools import lru_cache
+from typing import Callable, Dict, Any, List, Optional
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.mime.image import MIMEImage
 
 import requests
+from requests.adapters import HTTPAdapter
 import anthropic
 
 try:
@@ -21,6 +29,9 @@ try:
 except Exception:
     pass
 
+import social_prompts as SP
+from llm_cache import ExactCache, SemanticCache, cache_key
+
 try:
     from openai import OpenAI
     OPENAI_AVAILABLE = True
@@ -29,24 +40,33 @@ except ImportError:
     print("INFO: openai not installed. Web search unavailable.")
     print("Install with: pip install openai")
 
-try:
-    from google import genai
-    from google.genai import types
-    GENAI_AVAILABLE = True
-except ImportError:
-    GENAI_AVAILABLE = False
+def _module_available(name: str) -> bool:
+    """True if a module is installed, without paying for its import"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except ModuleNotFoundError:
+        return False
+
+# google-genai and tweepy are slow to import, so they are only checked here
+# and imported on first use (see _genai_client / _twitter_client)
+GENAI_AVAILABLE = _module_available("google.genai")
+if not GENAI_AVAILABLE:
     print("WARNING: google-genai not installed. Image generation unavailable.")
     print("Install with: pip install google-genai")
 
 # Optional: Twitter API (tweepy)
-try:
-    import tweepy
-    TWEEPY_AVAILABLE = True
-except ImportError:
-    TWEEPY_AVAILABLE = False
+TWEEPY_AVAILABLE = _module_available("tweepy")
+if not TWEEPY_AVAILABLE:
     print("INFO: tweepy not installed. Twitter auto-posting unavailable.")
     print("Install with: pip install tweepy")
 
+# Optional: faster JSON (falls back to stdlib json)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 # --- Configuration ---
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
@@ -82,11 +102,71 @@ if not ANTHROPIC_API_KEY:
 
 anthropic_client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
 
+# Pooled HTTP session: keeps TLS connections to the platform APIs alive between calls
+HTTP = requests.Session()
+HTTP.mount("https://", HTTPAdapter(pool_connections=8, pool_maxsize=16))
+atexit.register(HTTP.close)
+
+# Shared Plot Brew brief, sent as a cached system prefix on every Claude call
+PLOT_BREW_SYSTEM_BLOCKS = [
+    {"type": "text", "text": SP.PLOT_BREW_SYSTEM, "cache_control": {"type": "ephemeral"}}
+]
+
 # Initialize OpenAI client if available
 openai_client = None
 if OPENAI_AVAILABLE and OPENAI_API_KEY:
     openai_client = OpenAI(api_key=OPENAI_API_KEY)
 
+# API clients are built once on first use; None when the library or credentials are missing
+@lru_cache(maxsize=1)
+def _genai_client():
+    if not GENAI_AVAILABLE or not GOOGLE_API_KEY:
+        return None
+    from google import genai
+    return genai.Client(api_key=GOOGLE_API_KEY)
+
+def _twitter_configured() -> bool:
+    return TWEEPY_AVAILABLE and all([TWITTER_API_KEY, TWITTER_API_SECRET, TWITTER_ACCESS_TOKEN, TWITTER_ACCESS_SECRET])
+
+@lru_cache(maxsize=1)
+def _twitter_client():
+    """Twitter API v2 client (tweets)"""
+    if not _twitter_configured():
+        return None
+    import tweepy
+    return tweepy.Client(
+        consumer_key=TWITTER_API_KEY,
+        consumer_secret=TWITTER_API_SECRET,
+        access_token=TWITTER_ACCESS_TOKEN,
+        access_token_secret=TWITTER_ACCESS_SECRET
+    )
+
+@lru_cache(maxsize=1)
+def _twitter_api_v1():
+    """Twitter API v1.1 client (media upload)"""
+    if not _twitter_configured():
+        return None
+    import tweepy
+    auth = tweepy.OAuth1UserHandler(
+        TWITTER_API_KEY, TWITTER_API_SECRET,
+        TWITTER_ACCESS_TOKEN, TWITTER_ACCESS_SECRET
+    )
+    return tweepy.API(auth)
+
+def gemini_embed(text: str) -> List[float]:
+    """Embed text with Gemini (used for semantic cache lookups)"""
+    client = _genai_client()
+    result = client.models.embed_content(model="text-embedding-004", contents=text)
+    return result.embeddings[0].values
+
+# Semantic cache for generated posts: near-duplicate topics reuse earlier output
+post_cache = None
+if GENAI_AVAILABLE and GOOGLE_API_KEY:
+    post_cache = SemanticCache("romantasy_social", gemini_embed, threshold=0.92)
+
+# Exact-match cache for Claude responses: identical requests within a day are free
+response_cache = ExactCache("romantasy_social_exact", ttl_seconds=24 * 3600)
+
 # Platform character limits
 PLATFORM_LIMITS = {
     "twitter": 280,
@@ -95,6 +175,9 @@ PLATFORM_LIMITS = {
     "instagram": 2200
 }
 
+# Image aspect ratio per platform
+ASPECT_RATIOS = {"twitter": "16:9", "threads": "16:9", "pinterest": "2:3", "instagram": "1:1"}
+
 # ==================== INTERACTIVE HELPERS ====================
 
 def prompt_user(message: str, options: List[str]) -> str:
@@ -128,9 +211,80 @@ def get_user_input(prompt_text: str, default: str = "") -> str:
 
 # ==================== CONTENT GENERATION ====================
 
+def log_cache_usage(response) -> None:
+    """Show prompt-cache reads/writes so cache hits can be verified"""
+    usage = getattr(response, "usage", None)
+    cache_read = getattr(usage, "cache_read_input_tokens", 0) or 0
+    cache_written = getattr(usage, "cache_creation_input_tokens", 0) or 0
+    if cache_read or cache_written:
+        print(f"   (prompt cache: {cache_read} tokens read, {cache_written} written)")
+
+def claude_text(prompt: str, max_tokens: int, refresh: bool = False,
+                parse: Optional[Callable[[str], Any]] = None) -> Any:
+    """Claude response text for a prompt (run through parse, if given); repeats come
+    from the response cache unless refresh. Only replies that parse are cached, and an
+    unparseable reply is requested once more before the error is raised."""
+    model = "claude-sonnet-4-5"
+    key = cache_key(model=model, system=SP.PLOT_BREW_SYSTEM, prompt=prompt, max_tokens=max_tokens)
+    if not refresh:
+        cached = response_cache.get(key)
+        if cached is not None:
+            try:
+                result = parse(cached) if parse else cached
+                print("   ⚡ Reusing cached response")
+                return result
+            except ValueError:
+                pass  # cached before parse-checking existed - fetch a fresh reply
+
+    for attempt in range(2):
+        response = anthropic_client.messages.create(
+            model=model,
+            max_tokens=max_tokens,
+            system=PLOT_BREW_SYSTEM_BLOCKS,
+            messages=[{"role": "user", "content": prompt}]
+        )
+        log_cache_usage(response)
+
+        text = response.content[0].text
+        try:
+            result = parse(text) if parse else text
+        except ValueError:
+            if attempt:
+                raise
+            print("   ⚠️  Reply didn't parse - requesting a fresh one...")
+            continue
+        response_cache.set(key, text)
+        return result
+
+_JSON_DECODER = json.JSONDecoder()
+
+def extract_json(text: str) -> Dict:
+    """Parse the JSON object from a Claude response (tolerates code fences/preamble)"""
+    # raw_decode parses from the first brace in one pass and stops at the
+    # object's end, so fences and trailing prose need no extra scans
+    start = text.find("{")
+    if start == -1:
+        raise json.JSONDecodeError("No JSON object in response", text, 0)
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.loads(text[start:text.rfind("}") + 1])
+        except orjson.JSONDecodeError:
+            pass  # prose with braces after the object - let raw_decode find its end
+    obj, _ = _JSON_DECODER.raw_decode(text, start)
+    return obj
+
+def write_json_file(filename: str, data: Any) -> None:
+    """Write data as indented UTF-8 JSON (uses orjson when installed)"""
+    if ORJSON_AVAILABLE:
+        payload = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    else:
+        payload = json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+    with open(filename, 'wb') as f:
+        f.write(payload)
+
 def generate_web_search_query() -> str:
     """Generate a web search query to find trending romantasy discussions"""
-    prompt = """You are a content researcher for "Plot Brew," a romantasy writing advice platform.
+    prompt = """You are acting as Plot Brew's content researcher.
 
 Generate ONE web search query to find current trending discussions, questions, or debates in the romantasy writing community.
 
@@ -153,13 +307,15 @@ Return ONLY the search query (no quotation marks, no preamble).
     response = anthropic_client.messages.create(
         model="claude-sonnet-4-5",
         max_tokens=100,
+        system=PLOT_BREW_SYSTEM_BLOCKS,
         messages=[{"role": "user", "content": prompt}]
     )
+    log_cache_usage(response)
     return response.content[0].text.strip().strip('"').strip("'")
 
 def generate_interpretive_angle(search_results: str) -> Dict[str, str]:
     """Analyze search results and create an interpretive writing advice angle"""
-    prompt = f"""You are a content strategist for "Plot Brew," analyzing current discussions in the romantasy community.
+    prompt = f"""You are acting as Plot Brew's content strategist, analyzing current discussions in the romantasy community.
 
 **SEARCH RESULTS:**
 {search_results}
@@ -185,27 +341,16 @@ Return ONLY this JSON format:
     response = anthropic_client.messages.create(
         model="claude-sonnet-4-5",
         max_tokens=500,
+        system=PLOT_BREW_SYSTEM_BLOCKS,
         messages=[{"role": "user", "content": prompt}]
     )
+    log_cache_usage(response)
 
-    result_text = response.content[0].text.strip()
-
-    # Extract JSON
-    if "```json" in result_text:
-        result_text = result_text.split("```json")[1].split("```")[0].strip()
-    elif "```" in result_text:
-        result_text = result_text.split("```")[1].split("```")[0].strip()
-
-    start = result_text.find("{")
-    end = result_text.rfind("}") + 1
-    if start != -1 and end > start:
-        result_text = result_text[start:end]
-
-    return json.loads(result_text)
+    return extract_json(response.content[0].text)
 
 def generate_writing_advice_topic() -> str:
     """Generate a writing advice topic for romantasy writers (direct, no research)"""
-    prompt = """You are a content strategist for "Plot Brew," a writing advice platform for romantasy authors.
+    prompt = """You are acting as Plot Brew's content strategist.
 
 Generate ONE specific, actionable writing advice topic that would be valuable for romantasy writers.
 
@@ -214,13 +359,7 @@ Generate ONE specific, actionable writing advice topic that would be valuable fo
 - Actionable and practical
 - Addresses craft, structure, or reader expectations
 - Can be explained in a social media post
-
-**Good Topics:**
-- "How to Write Sexual Tension Without Explicit Scenes"
-- "The 3-Act Structure for Dual-Plot Romantasy"
-- "Why Your Magic System Needs Relationship Stakes"
-- "Writing Morally Grey Love Interests Readers Will Root For"
-- "How to Balance World-Building Without Info-Dumping"
+- Match the specificity of the GOOD TOPICS in your brief without repeating them
 
 Return ONLY the topic as a single sentence (no quotation marks, no preamble).
 """
@@ -228,25 +367,46 @@ Return ONLY the topic as a single sentence (no quotation marks, no preamble).
     response = anthropic_client.messages.create(
         model="claude-sonnet-4-5",
         max_tokens=200,
+        system=PLOT_BREW_SYSTEM_BLOCKS,
         messages=[{"role": "user", "content": prompt}]
     )
+    log_cache_usage(response)
     topic = response.content[0].text.strip().strip('"').strip("'")
     return topic
 
-def generate_social_posts(topic: str) -> Dict[str, str]:
-    """Generate platform-specific posts"""
-    prompt = f"""You are creating social media posts for "Plot Brew," a romantasy writing advice platform.
-
-**TOPIC:** {topic}
+# Output budget per platform for single-platform regeneration
+SINGLE_POST_MAX_TOKENS = {
+    "twitter": 300,
+    "threads": 600,
+    "pinterest": 600,
+    "instagram": 2500
+}
 
-**YOUR VOICE:**
-- Personal and vulnerable (share writing journey)
-- Celebratory of romantasy (treat it with intellectual respect)
-- Community-focused ("we" language, not "you")
-- Geeky enthusiasm about tropes and craft
-- Relatable struggles of writing life
+def generate_social_posts(topic: str, force_refresh: bool = False) -> Dict[str, str]:
+    """Generate platform-specific posts
+
+    The full generation runs once per topic per session; semantically similar
+    topics (e.g. paraphrases) are served from the post cache. force_refresh
+    bypasses both.
+    """
+    if force_refresh:
+        return _request_social_posts(topic, refresh=True)
+    # Copy so callers can edit their posts without touching the memo
+    return dict(_social_posts_for_topic(topic))
+
+@lru_cache(maxsize=16)
+def _social_posts_for_topic(topic: str) -> Dict[str, str]:
+    if post_cache:
+        cached = post_cache.get(topic, namespace="social_posts")
+        if cached:
+            print("   ⚡ Reusing cached posts for a near-identical topic")
+            return cached
+    return _request_social_posts(topic)
+
+def _request_social_posts(topic: str, refresh: bool = False) -> Dict[str, str]:
+    prompt = f"""Create Plot Brew social media posts in your usual voice.
 
----
+**TOPIC:** {topic}
 
 **GENERATE POSTS FOR 4 PLATFORMS:**
 
@@ -263,72 +423,130 @@ Return ONLY this JSON format:
   "pinterest": "Your Pinterest description here",
   "instagram": "Your Instagram caption here"
 }}
+"""
+
+    posts = claude_text(prompt, 2500, refresh=refresh, parse=extract_json)
+    if post_cache:
+        post_cache.set(topic, posts, namespace="social_posts")
+    return posts
+
+def generate_single_platform_post(topic: str, platform: str) -> str:
+    """Generate a fresh post for one platform only (used by Regenerate)"""
+    prompt = f"""Create a Plot Brew {platform.upper()} post in your usual voice.
+
+**TOPIC:** {topic}
+
+Follow the {platform.upper()} entry of the platform guide in your brief, and stay under {PLATFORM_LIMITS[platform]} characters.
+Take a different angle from anything obvious - this replaces a draft the user rejected.
+
+Return ONLY the post text (no quotation marks, no preamble).
 """
 
     response = anthropic_client.messages.create(
         model="claude-sonnet-4-5",
-        max_tokens=2500,
+        max_tokens=SINGLE_POST_MAX_TOKENS.get(platform, 600),
+        system=PLOT_BREW_SYSTEM_BLOCKS,
         messages=[{"role": "user", "content": prompt}]
     )
+    log_cache_usage(response)
 
-    result_text = response.content[0].text.strip()
+    return response.content[0].text.strip().strip('"')
 
-    # Extract JSON
-    if "```json" in result_text:
-        result_text = result_text.split("```json")[1].split("```")[0].strip()
-    elif "```" in result_text:
-        result_text = result_text.split("```")[1].split("```")[0].strip()
+def _fits(text: str, platform: str) -> bool:
+    return len(text) <= PLATFORM_LIMITS[platform]
+
+def shorten_post(text: str, platform: str) -> str:
+    """Compress an over-limit post with a small targeted call instead of a full regeneration"""
+    limit = PLATFORM_LIMITS[platform]
+    prompt = f"""Shorten this {platform.upper()} post to under {limit} characters, keeping its voice, hook and closing question.
+
+{text}
 
-    start = result_text.find("{")
-    end = result_text.rfind("}") + 1
-    if start != -1 and end > start:
-        result_text = result_text[start:end]
+Return ONLY the shortened post text (no quotation marks, no preamble).
+"""
+    return claude_text(prompt, max(limit // 3, 100)).strip().strip('"')
 
-    return json.loads(result_text)
+def enforce_limit(posts: Dict[str, str], platform: str) -> None:
+    """Shorten posts[platform] in place if it's over the platform limit"""
+    if platform not in posts or _fits(posts[platform], platform):
+        return
+    print(f"✂️  {platform} post is {len(posts[platform])}/{PLATFORM_LIMITS[platform]} chars - shortening...")
+    try:
+        posts[platform] = shorten_post(posts[platform], platform)
+    except Exception as e:
+        print(f"✗ Shortening failed: {e}")
 
-def generate_image_prompt(topic: str, platform: str) -> str:
+def generate_image_prompt(topic: str, platform: str, refresh: bool = False) -> str:
     """Generate image prompt for Gemini"""
-    aspect_ratios = {"twitter": "16:9", "threads": "16:9", "pinterest": "2:3", "instagram": "1:1"}
-    aspect_ratio = aspect_ratios.get(platform, "1:1")
+    aspect_ratio = ASPECT_RATIOS.get(platform, "1:1")
 
     prompt = f"""Create a detailed image generation prompt for a social media graphic about romantasy writing advice.
 
 **TOPIC:** {topic}
 **PLATFORM:** {platform} (aspect ratio: {aspect_ratio})
 
-**BRAND: "Plot Brew"**
-- Visual Style: Warm, magical, whimsical yet sophisticated
-- Color Palette: Warm jewel tones (burgundy, forest green, gold) OR twilight colors (purple, rose gold, midnight blue)
-- Typography: Mix of elegant serif for headlines and clean sans-serif
-- Visual Elements: Starbursts, constellations, book spines, quill pens, botanical illustrations
-- Mood: Warm, inviting, creative, slightly magical
-- Branding: Include "PLOT BREW" text
+Follow the Plot Brew visual identity from your brief.
 
 **TEXT TO INCLUDE:** "{topic}"
 
 Return ONLY the image generation prompt (start with "Create a...").
 """
 
-    response = anthropic_client.messages.create(
-        model="claude-sonnet-4-5",
-        max_tokens=800,
-        messages=[{"role": "user", "content": prompt}]
+    return claude_text(prompt, 800, refresh=refresh).strip()
+
+def generate_all_image_prompts(topic: str, platforms: Optional[List[str]] = None) -> Dict[str, str]:
+    """Generate image prompts for several platforms in one Claude call"""
+    platforms = platforms or list(PLATFORM_LIMITS)
+    platform_lines = "\n".join(
+        f"- {platform}: aspect ratio {ASPECT_RATIOS.get(platform, '1:1')}" for platform in platforms
     )
+    json_shape = ",\n".join(f'  "{platform}": "Create a..."' for platform in platforms)
+
+    prompt = f"""Create detailed image generation prompts for social media graphics about romantasy writing advice - one per platform.
+
+**TOPIC:** {topic}
+
+**PLATFORMS:**
+{platform_lines}
+
+Follow the Plot Brew visual identity from your brief. Compose each prompt for its platform's aspect ratio.
+
+**TEXT TO INCLUDE:** "{topic}"
 
-    return response.content[0].text.strip()
+Each prompt must start with "Create a...". Return ONLY this JSON format:
 
-def generate_image(image_prompt: str, platform: str) -> Optional[str]:
-    """Generate image using Gemini"""
+{{
+{json_shape}
+}}
+"""
+
+    prompts = claude_text(prompt, 2500, parse=extract_json)
+    return {platform: prompts[platform].strip() for platform in platforms if prompts.get(platform)}
+
+# Gemini image mime type -> file extension
+IMAGE_EXTENSIONS = {"image/png": ".png", "image/jpeg": ".jpg", "image/webp": ".webp"}
+
+def save_inline_image(inline_data, filename_stem: str) -> str:
+    """Write Gemini's encoded image bytes straight to disk (no PIL decode/re-encode)"""
+    data = inline_data.data
+    if isinstance(data, str):
+        data = base64.b64decode(data)
+    filename = filename_stem + IMAGE_EXTENSIONS.get(inline_data.mime_type, ".png")
+    with open(filename, 'wb') as f:
+        f.write(data)
+    return filename
+
+def generate_image(image_prompt: str, platform: str, session_ts: Optional[str] = None) -> Optional[str]:
+    """Generate image using Gemini (session_ts keeps one run's filenames together)"""
     if not GENAI_AVAILABLE or not GOOGLE_API_KEY:
         print("⚠️  Image generation not available")
         return None
 
-    aspect_ratios = {"twitter": "16:9", "threads": "16:9", "pinterest": "2:3", "instagram": "1:1"}
-    aspect_ratio = aspect_ratios.get(platform, "1:1")
+    aspect_ratio = ASPECT_RATIOS.get(platform, "1:1")
 
     try:
-        client = genai.Client(api_key=GOOGLE_API_KEY)
-        response = client.models.generate_content(
+        from google.genai import types
+        response = _genai_client().models.generate_content(
             model="gemini-2.5-flash-image",
             contents=[image_prompt],
             config=types.GenerateContentConfig(
@@ -337,14 +555,12 @@ def generate_image(image_prompt: str, platform: str) -> Optional[str]:
             )
         )
 
-        timestamp = datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')
-        image_filename = f"romantasy_{platform}_{timestamp}.png"
+        timestamp = session_ts or datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')
+        image_stem = f"romantasy_{platform}_{timestamp}"
 
         for part in response.parts:
             if part.inline_data is not None:
-                image = part.as_image()
-                image.save(image_filename)
-                return image_filename
+                return save_inline_image(part.inline_data, image_stem)
 
         return None
     except Exception as e:
@@ -368,18 +584,21 @@ def format_image_for_platform(image_path: str, platform: str) -> Optional[str]:
             files = {'body': f}
             headers = {'apikey': APILAYER_API_KEY}
 
-            response = requests.post(
+            # stream=True writes the formatted image to disk in chunks
+            # instead of holding the whole response body in memory
+            with HTTP.post(
                 f"https://api.apilayer.com/social_media_assets_generator/upload/{endpoint}",
                 headers=headers,
                 files=files,
-                timeout=30
-            )
-
-            if response.status_code == 200:
-                formatted_filename = image_path.replace('.png', f'_formatted_{platform}.png')
-                with open(formatted_filename, 'wb') as out:
-                    out.write(response.content)
-                return formatted_filename
+                timeout=30,
+                stream=True
+            ) as response:
+                if response.status_code == 200:
+                    formatted_filename = f"{os.path.splitext(image_path)[0]}_formatted_{platform}.png"
+                    with open(formatted_filename, 'wb') as out:
+                        for chunk in response.iter_content(chunk_size=65536):
+                            out.write(chunk)
+                    return formatted_filename
     except Exception as e:
         print(f"✗ Formatting error: {e}")
 
@@ -398,23 +617,12 @@ def post_to_twitter(text: str, image_path: Optional[str] = None) -> bool:
         return False
 
     try:
-        # Twitter API v2 client
-        client = tweepy.Client(
-            consumer_key=TWITTER_API_KEY,
-            consumer_secret=TWITTER_API_SECRET,
-            access_token=TWITTER_ACCESS_TOKEN,
-            access_token_secret=TWITTER_ACCESS_SECRET
-        )
+        client = _twitter_client()
 
         # Upload media if provided (requires API v1.1)
         media_id = None
         if image_path and os.path.exists(image_path):
-            auth = tweepy.OAuth1UserHandler(
-                TWITTER_API_KEY, TWITTER_API_SECRET,
-                TWITTER_ACCESS_TOKEN, TWITTER_ACCESS_SECRET
-            )
-            api_v1 = tweepy.API(auth)
-            media = api_v1.media_upload(filename=image_path)
+            media = _twitter_api_v1().media_upload(filename=image_path)
             media_id = media.media_id
 
         # Post tweet
@@ -430,6 +638,30 @@ def post_to_twitter(text: str, image_path: Optional[str] = None) -> bool:
         print(f"  ✗ Twitter post failed: {e}")
         return False
 
+# Delays between Threads container status checks (seconds)
+THREADS_STATUS_BACKOFF = (0.5, 1, 2, 4, 4, 4, 8)
+
+def wait_for_threads_container(container_id: str) -> bool:
+    """Poll a Threads media container until it is ready to publish"""
+    url = f"https://graph.threads.net/v1.0/{container_id}"
+    params = {"fields": "status,error_message", "access_token": META_ACCESS_TOKEN}
+
+    for delay in THREADS_STATUS_BACKOFF:
+        response = HTTP.get(url, params=params, timeout=30)
+        response.raise_for_status()
+        result = response.json()
+
+        status = result.get("status")
+        if status == "FINISHED":
+            return True
+        if status in ("ERROR", "EXPIRED"):
+            print(f"  ✗ Threads container {status.lower()}: {result.get('error_message', 'no details')}")
+            return False
+        time.sleep(delay)
+
+    print("  ✗ Threads container still processing - giving up")
+    return False
+
 def post_to_threads(text: str, image_path: Optional[str] = None) -> bool:
     """Post to Threads using Meta Graph API"""
     if not all([META_ACCESS_TOKEN, META_USER_ID]):
@@ -453,19 +685,23 @@ def post_to_threads(text: str, image_path: Optional[str] = None) -> bool:
             data["media_type"] = "IMAGE"
             data["image_url"] = image_path  # Should be publicly accessible URL
 
-        response = requests.post(url, json=data, timeout=30)
+        response = HTTP.post(url, json=data, timeout=30)
         response.raise_for_status()
 
         container_id = response.json()["id"]
 
-        # Step 2: Publish container
+        # Step 2: Wait for the container to finish processing (images take a few seconds)
+        if not wait_for_threads_container(container_id):
+            return False
+
+        # Step 3: Publish container
         publish_url = f"https://graph.threads.net/v1.0/{META_USER_ID}/threads_publish"
         publish_data = {
             "creation_id": container_id,
             "access_token": META_ACCESS_TOKEN
         }
 
-        publish_response = requests.post(publish_url, json=publish_data, timeout=30)
+        publish_response = HTTP.post(publish_url, json=publish_data, timeout=30)
         publish_response.raise_for_status()
 
         print(f"  ✓ Posted to Threads")
@@ -504,7 +740,7 @@ def post_to_pinterest(text: str, image_path: Optional[str] = None) -> bool:
             }
         }
 
-        response = requests.post(url, headers=headers, json=data, timeout=30)
+        response = HTTP.post(url, headers=headers, json=data, timeout=30)
         response.raise_for_status()
 
         pin_id = response.json()["id"]
@@ -515,6 +751,47 @@ def post_to_pinterest(text: str, image_path: Optional[str] = None) -> bool:
         print(f"  ✗ Pinterest post failed: {e}")
         return False
 
+class SMTPPool:
+    """One SMTP connection (connect + STARTTLS + login) shared across sends"""
+
+    def __init__(self):
+        self.server = None
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _connect(self):
+        self.server = smtplib.SMTP(SMTP_HOST, SMTP_PORT)
+        self.server.starttls()
+        self.server.login(SMTP_USER, SMTP_PASSWORD)
+
+    def send(self, msg):
+        """Send a message, connecting on first use and reconnecting once if dropped"""
+        with self._lock:
+            if self.server is None:
+                self._connect()
+            try:
+                self.server.send_message(msg)
+            except smtplib.SMTPServerDisconnected:
+                self._connect()
+                self.server.send_message(msg)
+
+    def close(self):
+        with self._lock:
+            if self.server is not None:
+                try:
+                    self.server.quit()
+                except smtplib.SMTPException:
+                    pass
+                self.server = None
+
+smtp_pool = SMTPPool()
+atexit.register(smtp_pool.close)
+
 def email_instagram_post(text: str, image_path: Optional[str] = None) -> bool:
     """Email Instagram post"""
     if not all([EMAIL_FROM, EMAIL_TO, SMTP_USER, SMTP_PASSWORD]):
@@ -537,15 +814,12 @@ Image attached (if generated).
         msg.attach(MIMEText(body, 'plain'))
 
         if image_path and os.path.exists(image_path):
+            # MIMEImage base64-encodes on construction; passing the bytes straight
+            # through lets the raw copy be freed as soon as it's encoded
             with open(image_path, 'rb') as f:
-                img_data = f.read()
-                image = MIMEImage(img_data, name=os.path.basename(image_path))
-                msg.attach(image)
+                msg.attach(MIMEImage(f.read(), name=os.path.basename(image_path)))
 
-        with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as server:
-            server.starttls()
-            server.login(SMTP_USER, SMTP_PASSWORD)
-            server.send_message(msg)
+        smtp_pool.send(msg)
 
         print(f"  ✓ Instagram post emailed")
         return True
@@ -554,6 +828,62 @@ Image attached (if generated).
         print(f"  ✗ Email failed: {e}")
         return False
 
+# Platform -> publisher, all called as poster(text, image_path)
+POSTERS = {
+    "twitter": post_to_twitter,
+    "threads": post_to_threads,
+    "pinterest": post_to_pinterest,
+    "instagram": email_instagram_post
+}
+
+# ==================== CONCURRENT PIPELINES ====================
+
+async def draft_platform_image(topic: str, platform: str, image_prompt: Optional[str] = None,
+                               session_ts: Optional[str] = None) -> Dict[str, Optional[str]]:
+    """First-draft image for one platform: prompt (unless given) -> image -> formatting"""
+    if not image_prompt:
+        image_prompt = await asyncio.to_thread(generate_image_prompt, topic, platform)
+    image_path = await asyncio.to_thread(generate_image, image_prompt, platform, session_ts)
+    if image_path and APILAYER_API_KEY:
+        image_path = await asyncio.to_thread(format_image_for_platform, image_path, platform)
+    return {"prompt": image_prompt, "path": image_path}
+
+async def draft_all_images(topic: str, platforms: List[str],
+                           session_ts: Optional[str] = None) -> Dict[str, Dict[str, Optional[str]]]:
+    """Draft every platform's image concurrently; failed platforms are left out"""
+    # One Claude call for all prompts; per-platform prompts only fill gaps
+    try:
+        image_prompts = await asyncio.to_thread(generate_all_image_prompts, topic, platforms)
+    except Exception as e:
+        print(f"✗ Combined image prompts failed ({e}) - generating per platform")
+        image_prompts = {}
+
+    results = await asyncio.gather(
+        *[draft_platform_image(topic, platform, image_prompts.pop(platform, None), session_ts)
+          for platform in platforms],
+        return_exceptions=True
+    )
+    drafts = {}
+    for platform, result in zip(platforms, results):
+        if isinstance(result, Exception):
+            print(f"✗ {platform} image draft failed: {result}")
+        else:
+            drafts[platform] = result
+    return drafts
+
+async def publish_all(posts: Dict[str, str], images: Dict[str, str], platforms: List[str]) -> Dict[str, bool]:
+    """Send the approved posts to their platforms concurrently; returns success per platform"""
+    results = await asyncio.gather(
+        *[asyncio.to_thread(POSTERS[platform], posts[platform], images.get(platform)) for platform in platforms],
+        return_exceptions=True
+    )
+    published = {}
+    for platform, result in zip(platforms, results):
+        if isinstance(result, BaseException):
+            print(f"✗ {platform} publish raised {type(result).__name__}: {result}")
+        published[platform] = result is True
+    return published
+
 # ==================== MAIN INTERACTIVE FLOW ====================
 
 def main():
@@ -562,6 +892,9 @@ def main():
     print("Plot Brew - Human-in-the-Loop Content Generation")
     print("="*80)
 
+    # One timestamp per run so this session's images and report share it
+    session_ts = datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')
+
     # STEP 1: Topic Generation
     print("\n" + "="*80)
     print("STEP 1: TOPIC GENERATION")
@@ -774,9 +1107,19 @@ Focus on actionable insights that could inspire writing advice content."""
 
     generate_all = confirm_action("Generate posts for all platforms at once?")
 
-    if generate_all:
+    force_refresh = False
+    while generate_all:
         print("\n✍️  Generating posts for all platforms...")
-        posts = generate_social_posts(topic)
+        try:
+            posts = generate_social_posts(topic, force_refresh=force_refresh)
+        except Exception as e:
+            print(f"✗ Post generation failed: {e}")
+            print("\nGenerating each platform on its own instead...")
+            posts = {}
+            generate_all = False
+            break
+        for platform in platforms:
+            enforce_limit(posts, platform)
 
         print("\n📱 GENERATED POSTS:\n")
         for platform in platforms:
@@ -784,15 +1127,24 @@ Focus on actionable insights that could inspire writing advice content."""
             print(f"{posts.get(platform, 'N/A')}")
             print(f"Characters: {len(posts.get(platform, ''))}/{PLATFORM_LIMITS[platform]}\n")
 
-        if not confirm_action("Accept all posts?"):
-            print("\nLet's regenerate individual platforms...")
-            generate_all = False
+        if confirm_action("Accept all posts?"):
+            break
+        if confirm_action("Regenerate all posts from scratch (skip cached posts)?"):
+            force_refresh = True
+            continue
+        print("\nLet's regenerate individual platforms...")
+        generate_all = False
 
     if not generate_all:
         for platform in platforms:
             if platform not in posts:
                 print(f"\n--- {platform.upper()} ---")
-                posts[platform] = generate_social_posts(topic)[platform]
+                try:
+                    posts[platform] = generate_social_posts(topic)[platform]
+                except Exception as e:
+                    print(f"✗ Combined generation failed ({e}) - generating {platform} on its own")
+                    posts[platform] = generate_single_platform_post(topic, platform)
+                enforce_limit(posts, platform)
 
             satisfied = False
             while not satisfied:
@@ -808,7 +1160,8 @@ Focus on actionable insights that could inspire writing advice content."""
                     satisfied = True
                 elif "Regenerate" in action:
                     print(f"Regenerating {platform} post...")
-                    posts[platform] = generate_social_posts(topic)[platform]
+                    posts[platform] = generate_single_platform_post(topic, platform)
+                    enforce_limit(posts, platform)
                 elif "Edit" in action:
                     posts[platform] = get_user_input(f"Enter your {platform} post", posts[platform])
                     satisfied = True
@@ -827,13 +1180,26 @@ Focus on actionable insights that could inspire writing advice content."""
 
     images = {}
     if generate_images:
+        # Draft all platforms in parallel, then review them one at a time
+        print(f"\n🎨 Drafting images for {', '.join(posts)} in parallel...")
+        drafts = asyncio.run(draft_all_images(topic, list(posts.keys()), session_ts))
+
         for platform in list(posts.keys()):
             print(f"\n--- {platform.upper()} IMAGE ---")
 
+            draft = drafts.get(platform)
+            if draft and draft["path"]:
+                print(f"\nImage Prompt:\n{draft['prompt']}")
+                print(f"✓ Image ready: {draft['path']}")
+                images[platform] = draft["path"]
+                if confirm_action("Accept this image?"):
+                    continue
+
             satisfied = False
             while not satisfied:
+                # Only reached after a rejected/failed draft or "Regenerate", so skip the cache
                 print(f"\n🎨 Generating image prompt for {platform}...")
-                image_prompt = generate_image_prompt(topic, platform)
+                image_prompt = generate_image_prompt(topic, platform, refresh=True)
 
                 print(f"\nImage Prompt:\n{image_prompt}")
 
@@ -851,7 +1217,7 @@ Focus on actionable insights that could inspire writing advice content."""
 
                 # Generate image
                 print(f"\n🖼️  Generating {platform} image...")
-                image_path = generate_image(image_prompt, platform)
+                image_path = generate_image(image_prompt, platform, session_ts)
 
                 if image_path:
                     print(f"✓ Image saved: {image_path}")
@@ -883,40 +1249,47 @@ Focus on actionable insights that could inspire writing advice content."""
         # Save to files...
         return
 
+    # Confirm each platform first, then publish the approved ones together
+    approved = []
     for platform in list(posts.keys()):
         print(f"\n--- {platform.upper()} ---")
         print(f"Post: {posts[platform][:100]}...")
         if platform in images:
             print(f"Image: {images[platform]}")
 
+        # Platforms reject oversize posts, so catch it here rather than after a failed POST
+        enforce_limit(posts, platform)
+        if not _fits(posts[platform], platform):
+            print(f"  ✗ Still over the {PLATFORM_LIMITS[platform]}-char limit - skipped {platform}")
+            continue
+
         if not confirm_action(f"Post to {platform}?"):
             print(f"  ⏭️  Skipped {platform}")
             continue
 
-        # Post to platform
-        success = False
-        if platform == "twitter":
-            success = post_to_twitter(posts[platform], images.get(platform))
-        elif platform == "threads":
-            success = post_to_threads(posts[platform], images.get(platform))
-        elif platform == "pinterest":
-            success = post_to_pinterest(posts[platform], images.get(platform))
-        elif platform == "instagram":
-            success = email_instagram_post(posts[platform], images.get(platform))
+        approved.append(platform)
+
+    published = {}
+    if approved:
+        print(f"\n📤 Posting to {', '.join(approved)}...")
+        with smtp_pool:
+            published = asyncio.run(publish_all(posts, images, approved))
+        print("\n📊 Publish results:")
+        for platform, ok in published.items():
+            print(f"  {'✅' if ok else '✗'} {platform}")
 
     # Save report
-    timestamp = datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')
-    report_file = f"social_media_report_{timestamp}.json"
+    report_file = f"social_media_report_{session_ts}.json"
 
     report = {
         "timestamp": datetime.now(timezone.utc).isoformat(),
         "topic": topic,
         "posts": posts,
-        "images": images
+        "images": images,
+        "published": published
     }
 
-    with open(report_file, 'w', encoding='utf-8') as f:
-        json.dump(report, f, indent=2, ensure_ascii=False)
+    write_json_file(report_file, report)
 
     print("\n" + "="*80)
     print(f"✅ Session complete! Report saved: {report_file}")
@@ -3,11 +3,18 @@
 # Generate Threads posts from article text
 
 import os
+import errno
 import sys
+import gzip
+import hashlib
+import time
+import asyncio
 import argparse
+import importlib.util
 from datetime import datetime, timezone
-
-import anthropic
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, List, Optional
 
 try:
     from dotenv import load_dotenv
@@ -15,18 +22,128 @@ try:
 except Exception:
     pass
 
+def _module_available(name: str) -> bool:
+    """True if a module is installed, without paying for its import"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except ModuleNotFoundError:
+        return False
+
+# anthropic and google-genai (optional, for the near-duplicate post cache) are
+# slow to import, so they're imported where first used
+GENAI_AVAILABLE = _module_available("google.genai")
+
 import social_prompts as SP
+from llm_cache import ExactCache, SemanticCache, cache_key
 
 # --- Setup ---
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
+GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")  # Optional, enables the semantic post cache
+
+# Concurrent Claude requests in --parallel mode (keep under your rate limit)
+MAX_CONCURRENCY = int(os.getenv("CLAUDE_MAX_CONCURRENCY", "8"))
+
+# Output cap for a post: a thread is at most 10 x 500 chars (~1300 tokens)
+MAX_POST_TOKENS = 1500
+
+@lru_cache(maxsize=1)
+def _anthropic_client():
+    """Shared client, so repeated calls reuse one connection pool instead of new TLS handshakes"""
+    import anthropic
+    return anthropic.Anthropic(api_key=ANTHROPIC_API_KEY, max_retries=2)
 
-def generate_threads_post(article_text: str, stream: str = "advertising") -> str:
+@lru_cache(maxsize=1)
+def _genai_client():
+    """Shared Gemini client (embeddings)"""
+    from google import genai
+    return genai.Client(api_key=GOOGLE_API_KEY)
+
+def build_threads_content(article_text: str, stream: str) -> List[dict]:
+    """
+    User message content for the stream's Threads prompt.
+
+    The static instructions and the article are separate blocks marked for
+    prompt caching, so regenerating for the same article (or any article,
+    once the instructions alone are long enough to cache) reuses the prefix.
+    """
+    prefix, suffix = SP.article_prompt_segments("threads", stream)
+
+    return [
+        {"type": "text", "text": prefix, "cache_control": {"type": "ephemeral"}},
+        {"type": "text", "text": article_text, "cache_control": {"type": "ephemeral"}},
+        {"type": "text", "text": suffix}
+    ]
+
+def log_cache_usage(response) -> None:
+    """Print prompt-cache hits/writes so cache effectiveness is visible"""
+    usage = response.usage
+    cache_read = getattr(usage, "cache_read_input_tokens", 0) or 0
+    cache_written = getattr(usage, "cache_creation_input_tokens", 0) or 0
+    if cache_read or cache_written:
+        print(f"   (prompt cache: {cache_read} tokens read, {cache_written} written)")
+
+def gemini_embed(text: str) -> List[float]:
+    """Embed article text with Gemini (the head of long articles is enough to spot duplicates)"""
+    result = _genai_client().models.embed_content(model="text-embedding-004", contents=text[:8000])
+    return result.embeddings[0].values
+
+# Local post cache: re-running the same article (per stream) skips Claude entirely,
+# and a lightly edited article is served by the semantic tier. The SQLite files
+# are opened on first use, so --help and argument errors never touch .cache/
+@lru_cache(maxsize=1)
+def _post_cache() -> ExactCache:
+    return ExactCache("threads_posts")
+
+@lru_cache(maxsize=1)
+def _semantic_post_cache() -> Optional[SemanticCache]:
+    if not (GENAI_AVAILABLE and GOOGLE_API_KEY):
+        return None
+    return SemanticCache("threads_posts_semantic", gemini_embed, threshold=0.95)
+
+# Set from the CLI: --no-cache skips lookups (fresh posts still get stored),
+# --template-version invalidates everything cached under another version
+USE_POST_CACHE = True
+TEMPLATE_VERSION = "1"
+
+def template_id(stream: str) -> str:
+    """Short id of the prompt behind a cached post; changes with the template text or version"""
+    prefix, suffix = SP.article_prompt_segments("threads", stream)
+    return cache_key(version=TEMPLATE_VERSION, prefix=prefix, suffix=suffix)[:16]
+
+def post_cache_key(article_text: str, stream: str) -> str:
+    return cache_key(stream=stream, template=template_id(stream), article_text=article_text)
+
+def lookup_cached_post(article_text: str, stream: str) -> Optional[str]:
+    """Cached post for this article (exact match first, then near-duplicate), else None"""
+    if not USE_POST_CACHE:
+        return None
+    cached = _post_cache().get(post_cache_key(article_text, stream))
+    if cached is not None:
+        print("⚡ Reusing cached post for this article")
+        return cached
+    semantic_post_cache = _semantic_post_cache()
+    if semantic_post_cache:
+        cached = semantic_post_cache.get(article_text, namespace=f"{stream}:{template_id(stream)}")
+        if cached is not None:
+            print("⚡ Reusing cached post for a near-identical article")
+            return cached
+    return None
+
+def store_post(article_text: str, stream: str, post: str) -> None:
+    _post_cache().set(post_cache_key(article_text, stream), post)
+    semantic_post_cache = _semantic_post_cache()
+    if semantic_post_cache:
+        semantic_post_cache.set(article_text, post, namespace=f"{stream}:{template_id(stream)}")
+
+def generate_threads_post(article_text: str, stream: str = "advertising",
+                          on_text: Optional[Callable[[str], None]] = None) -> str:
     """
     Generate a Threads post from article text.
 
     Args:
         article_text: The full article text to promote
         stream: Either 'advertising' or 'romantasy'
+        on_text: Called with each chunk of text as Claude streams it (not called on a cache hit)
 
     Returns:
         Generated Threads post text
@@ -34,38 +151,208 @@ def generate_threads_post(article_text: str, stream: str = "advertising") -> str
     if not ANTHROPIC_API_KEY:
         raise ValueError("ANTHROPIC_API_KEY not found in environment")
 
-    # Select appropriate prompt
-    if stream == "advertising":
-        prompt = SP.THREADS_ADVERTISING_PROMPT.format(article_text=article_text)
-    elif stream == "romantasy":
-        prompt = SP.THREADS_ROMANTASY_PROMPT.format(article_text=article_text)
-    else:
-        raise ValueError(f"Unknown stream: {stream}. Use 'advertising' or 'romantasy'")
+    cached = lookup_cached_post(article_text, stream)
+    if cached is not None:
+        return cached
+
+    content = build_threads_content(article_text, stream)
 
     # Call Claude
     print(f"🧵 Generating Threads post for {stream} stream...")
 
-    anthropic_client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
-    response = anthropic_client.messages.create(
+    anthropic_client = _anthropic_client()
+    with anthropic_client.messages.stream(
         model="claude-sonnet-4-5",
-        max_tokens=2000,
+        max_tokens=MAX_POST_TOKENS,
         messages=[{
             "role": "user",
-            "content": prompt
+            "content": content
         }]
-    )
+    ) as message_stream:
+        for text in message_stream.text_stream:
+            if on_text:
+                on_text(text)
+        response = message_stream.get_final_message()
+    log_cache_usage(response)
 
     post_text = response.content[0].text.strip()
+    store_post(article_text, stream, post_text)
 
     return post_text
 
+def generate_threads_posts_batch(articles: List[str], stream: str = "advertising") -> List[Optional[str]]:
+    """
+    Generate Threads posts for several articles as one Message Batch.
+
+    Batches are billed at half the normal rate and need a single polling loop
+    instead of one round-trip per article.
+
+    Returns:
+        Post text per article, in input order (None where a request failed)
+    """
+    if not ANTHROPIC_API_KEY:
+        raise ValueError("ANTHROPIC_API_KEY not found in environment")
+
+    # Articles already in the post cache don't need to be sent
+    posts: List[Optional[str]] = [lookup_cached_post(article_text, stream) for article_text in articles]
+    batch_requests = [{
+        "custom_id": f"article{i}",
+        "params": {
+            "model": "claude-sonnet-4-5",
+            "max_tokens": MAX_POST_TOKENS,
+            "messages": [{"role": "user", "content": build_threads_content(article_text, stream)}]
+        }
+    } for i, article_text in enumerate(articles) if posts[i] is None]
+
+    if not batch_requests:
+        return posts
+
+    print(f"📦 Submitting {len(batch_requests)} Threads posts for {stream} stream as a batch...")
+
+    anthropic_client = _anthropic_client()
+    batch = anthropic_client.messages.batches.create(requests=batch_requests)
+
+    # Poll with backoff until the batch ends
+    delay = 5.0
+    while batch.processing_status != "ended":
+        time.sleep(delay)
+        delay = min(delay * 2, 60.0)
+        batch = anthropic_client.messages.batches.retrieve(batch.id)
+        print(f"   ⏳ {batch.request_counts.succeeded} done, {batch.request_counts.processing} processing...")
+
+    for entry in anthropic_client.messages.batches.results(batch.id):
+        if entry.result.type == "succeeded":
+            i = int(entry.custom_id[len("article"):])
+            posts[i] = entry.result.message.content[0].text.strip()
+            store_post(articles[i], stream, posts[i])
+        else:
+            print(f"   ⚠️  {entry.custom_id} {entry.result.type}")
+
+    return posts
+
+async def agenerate_threads_post(anthropic_client, semaphore: asyncio.Semaphore,
+                                article_text: str, stream: str) -> str:
+    """Async Threads post generation for one article (cache-aware, bounded by semaphore)"""
+    # Cache lookups may call the embedding API, so keep them off the event loop
+    cached = await asyncio.to_thread(lookup_cached_post, article_text, stream)
+    if cached is not None:
+        return cached
+
+    async with semaphore:
+        response = await anthropic_client.messages.create(
+            model="claude-sonnet-4-5",
+            max_tokens=MAX_POST_TOKENS,
+            messages=[{"role": "user", "content": build_threads_content(article_text, stream)}]
+        )
+    log_cache_usage(response)
+
+    post = response.content[0].text.strip()
+    await asyncio.to_thread(store_post, article_text, stream, post)
+    return post
+
+async def generate_threads_posts_parallel(articles: List[str], stream: str = "advertising") -> List[Optional[str]]:
+    """
+    Generate Threads posts for several articles with concurrent live requests.
+
+    Faster than the batch path (seconds instead of minutes) but at full price.
+
+    Returns:
+        Post per article, in input order (None where a request failed)
+    """
+    if not ANTHROPIC_API_KEY:
+        raise ValueError("ANTHROPIC_API_KEY not found in environment")
+
+    print(f"⚡ Generating {len(articles)} Threads posts for {stream} stream ({MAX_CONCURRENCY} at a time)...")
+
+    import anthropic
+    anthropic_client = anthropic.AsyncAnthropic(api_key=ANTHROPIC_API_KEY)
+    semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+    results = await asyncio.gather(
+        *[agenerate_threads_post(anthropic_client, semaphore, article_text, stream) for article_text in articles],
+        return_exceptions=True
+    )
+
+    posts: List[Optional[str]] = []
+    for i, result in enumerate(results):
+        if isinstance(result, Exception):
+            print(f"   ⚠️  article{i} failed: {result}")
+            posts.append(None)
+        else:
+            posts.append(result)
+    return posts
+
+# Set from the CLI: --dedupe stores each distinct auto-saved post once, gzipped,
+# under artifacts/<stream>/ and makes the timestamped file a symlink to it
+DEDUPE_ARTIFACTS = False
+ARTIFACTS_DIR = Path("artifacts")
+# symlink_to() errors that mean "links aren't available here" (winerror 1314: privilege not held)
+_NO_SYMLINK_ERRNOS = {errno.EPERM, errno.EOPNOTSUPP, errno.ENOSYS}
+
+def save_artifact(filename: str, blob: bytes, stream: str) -> str:
+    """Auto-save a post; returns where the content actually lives"""
+    path = Path(filename)
+    # Replace, never write through, an existing file: it may be a link into artifacts/
+    path.unlink(missing_ok=True)
+    if not DEDUPE_ARTIFACTS:
+        path.write_bytes(blob)
+        return filename
+
+    digest = hashlib.sha256(blob).hexdigest()[:16]
+    target = ARTIFACTS_DIR / stream / f"{digest}{path.suffix}.gz"
+    if not target.exists():
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(gzip.compress(blob))
+    try:
+        path.symlink_to(target.resolve())
+    except (NotImplementedError, OSError) as e:
+        if isinstance(e, OSError) and e.errno not in _NO_SYMLINK_ERRNOS and getattr(e, "winerror", None) != 1314:
+            raise
+        # No symlink support (e.g. Windows without developer mode)
+        path.write_bytes(blob)
+        return filename
+    return str(target)
+
 def read_article_from_stdin() -> str:
-    """Read article text from stdin (for piping)"""
-    print("📝 Reading article text from stdin...")
-    print("(Paste your article text, then press Ctrl+D on a new line to finish)\n")
-    return sys.stdin.read().strip()
+    """Read article text from stdin (for piping); prompts go to stderr so stdout stays clean"""
+    print("📝 Reading article text from stdin...", file=sys.stderr)
+    print("(Paste your article text, then press Ctrl+D on a new line to finish)\n", file=sys.stderr)
+    # One binary read and a single decode, instead of the line-by-line text layer
+    return sys.stdin.buffer.read().decode('utf-8', errors='replace').strip()
+
+def output_stem(path: str, index: int) -> str:
+    """Per-input name part for multi-file runs: the file stem plus its 1-based position,
+    so inputs like intro.txt/intro.md or a/x.txt/b/x.txt never share an output file"""
+    return f"{Path(path).stem}_{index + 1}"
+
+def generate_many(files: List[str], stream: str, timestamp: str, parallel: bool = False) -> None:
+    """Generate one Threads post per article file (batch or parallel) and auto-save each"""
+    articles = [Path(path).read_text(encoding='utf-8').strip() for path in files]
+
+    try:
+        if parallel:
+            posts = asyncio.run(generate_threads_posts_parallel(articles, stream))
+        else:
+            posts = generate_threads_posts_batch(articles, stream)
+    except Exception as e:
+        print(f"\n❌ ERROR: {e}")
+        sys.exit(1)
+
+    for index, (path, post_text) in enumerate(zip(files, posts)):
+        print("\n" + "="*60)
+        print(f"🧵 THREADS POST ({stream.upper()}) - {path}")
+        print("="*60 + "\n")
+        if post_text is None:
+            print("❌ Generation failed for this article")
+            continue
+        print(post_text)
+
+        filename = f"threads_post_{stream}_{output_stem(path, index)}_{timestamp}.txt"
+        stored = save_artifact(filename, post_text.encode('utf-8'), stream)
+        print(f"\n💾 Auto-saved to: {filename}" + (f" -> {stored}" if stored != filename else ""))
 
 def main():
+    global USE_POST_CACHE, TEMPLATE_VERSION, DEDUPE_ARTIFACTS
+
     parser = argparse.ArgumentParser(
         description="Generate Threads posts from article text",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -79,6 +366,12 @@ Examples:
 
   # Pass article as argument:
   python generate_threads_post.py --stream advertising --text "Your article text here..."
+
+  # Several articles at once (sent as one discounted batch):
+  python generate_threads_post.py --stream romantasy --files articles/*.txt
+
+  # Every .txt/.md article in a folder, with concurrent live requests:
+  python generate_threads_post.py --stream advertising --articles-dir articles/ --parallel
         """
     )
 
@@ -95,6 +388,43 @@ Examples:
         help="Article text (if not provided, will read from stdin)"
     )
 
+    parser.add_argument(
+        "--files",
+        nargs="+",
+        help="Article text files; more than one is processed as a single Message Batch"
+    )
+
+    parser.add_argument(
+        "--articles-dir",
+        type=str,
+        help="Process every .txt/.md file in this folder (like --files)"
+    )
+
+    parser.add_argument(
+        "--parallel",
+        action="store_true",
+        help="With several articles, use concurrent live requests instead of a batch (faster, full price)"
+    )
+
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always call Claude, even for an article that was already processed"
+    )
+
+    parser.add_argument(
+        "--dedupe",
+        action="store_true",
+        help="Store auto-saved posts once (gzipped, content-addressed under artifacts/) and symlink the timestamped file to them"
+    )
+
+    parser.add_argument(
+        "--template-version",
+        type=str,
+        default=TEMPLATE_VERSION,
+        help="Cache namespace for the prompt templates; bump it to invalidate cached posts"
+    )
+
     parser.add_argument(
         "--output",
         type=str,
@@ -103,9 +433,28 @@ Examples:
 
     args = parser.parse_args()
 
+    USE_POST_CACHE = not args.no_cache
+    TEMPLATE_VERSION = args.template_version
+    DEDUPE_ARTIFACTS = args.dedupe
+
+    # One timestamp for every file this run writes
+    timestamp = datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')
+
+    if args.articles_dir:
+        folder = Path(args.articles_dir)
+        args.files = (args.files or []) + sorted(
+            str(path) for path in folder.iterdir() if path.suffix in (".txt", ".md")
+        )
+
+    if args.files and len(args.files) > 1:
+        generate_many(args.files, args.stream, timestamp, args.parallel)
+        return
+
     # Get article text
     if args.text:
         article_text = args.text
+    elif args.files:
+        article_text = Path(args.files[0]).read_text(encoding='utf-8').strip()
     else:
         article_text = read_article_from_stdin()
 
@@ -115,27 +464,38 @@ Examples:
 
     # Generate post
     try:
-        post_text = generate_threads_post(article_text, args.stream)
+        # Display the post as it streams in (a cached post is printed whole)
+        streamed = []
 
-        # Display results
-        print("\n" + "="*60)
-        print(f"🧵 THREADS POST ({args.stream.upper()})")
-        print("="*60 + "\n")
-        print(post_text)
+        def show_text(text: str) -> None:
+            if not streamed:
+                print("\n" + "="*60)
+                print(f"🧵 THREADS POST ({args.stream.upper()})")
+                print("="*60 + "\n")
+            streamed.append(text)
+            sys.stdout.write(text)
+            sys.stdout.flush()
+
+        post_text = generate_threads_post(article_text, args.stream, on_text=show_text)
+
+        if not streamed:
+            print("\n" + "="*60)
+            print(f"🧵 THREADS POST ({args.stream.upper()})")
+            print("="*60 + "\n")
+            print(post_text)
+        else:
+            print()
         print("\n" + "="*60)
 
         # Save if requested
         if args.output:
-            with open(args.output, 'w', encoding='utf-8') as f:
-                f.write(post_text)
+            Path(args.output).write_text(post_text, encoding='utf-8')
             print(f"\n✅ Saved to: {args.output}")
         else:
             # Also save with timestamp
-            timestamp = datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')
             filename = f"threads_post_{args.stream}_{timestamp}.txt"
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write(post_text)
-            print(f"\n💾 Auto-saved to: {filename}")
+            stored = save_artifact(filename, post_text.encode('utf-8'), args.stream)
+            print(f"\n💾 Auto-saved to: {filename}" + (f" -> {stored}" if stored != filename else ""))
 
     except Exception as e:
         print(f"\n❌ ERROR: {e}")
@@ -3,13 +3,25 @@
 # Generate Twitter posts with Canva template integration
 
 import os
+import errno
+import re
 import sys
+import gzip
+import hashlib
 import json
+import shutil
+import time
+import random
+import base64
+import asyncio
 import argparse
+import importlib.util
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
-
-import anthropic
-import requests
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, List, Optional
 
 try:
     from dotenv import load_dotenv
@@ -17,28 +29,236 @@ try:
 except Exception:
     pass
 
-try:
-    from google import genai
-    from google.genai import types
-    GENAI_AVAILABLE = True
-except ImportError:
-    GENAI_AVAILABLE = False
+def _module_available(name: str) -> bool:
+    """True if a module is installed, without paying for its import"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except ModuleNotFoundError:
+        return False
+
+# anthropic and google-genai are slow to import, so they're imported where
+# first used; a --help or cached run never loads them
+GENAI_AVAILABLE = _module_available("google.genai")
+if not GENAI_AVAILABLE:
     print("WARNING: google-genai not installed. Image generation unavailable.")
     print("Install with: pip install google-genai")
 
+# Optional: faster JSON (falls back to stdlib json)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 import social_prompts as SP
+from llm_cache import CACHE_DIR, ExactCache, SemanticCache, cache_key
 
 # --- Setup ---
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")  # For Gemini image generation
 
-def generate_twitter_post(article_text: str, stream: str = "advertising") -> dict:
+# Concurrent Claude requests in --parallel mode (keep under your rate limit)
+MAX_CONCURRENCY = int(os.getenv("CLAUDE_MAX_CONCURRENCY", "8"))
+# Request starts per minute in --parallel mode (0 = no limit)
+MAX_RPM = int(os.getenv("CLAUDE_RPM", "0"))
+
+# Attempts for a call that fails transiently (429 rate limit, 5xx/529 overload).
+# The Anthropic SDK retries these itself with jittered exponential backoff;
+# Gemini calls go through with_retries() below
+API_MAX_RETRIES = 5
+TRANSIENT_STATUS_CODES = {408, 429, 500, 502, 503, 504, 529}
+
+# Output cap for the post JSON: a tweet plus two short template fields
+MAX_POST_TOKENS = 600
+
+# Stamp for every file this run writes (JSON, PNG, batch output), so they match
+RUN_TIMESTAMP = datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')
+
+@lru_cache(maxsize=1)
+def _anthropic_client():
+    """Shared client, so repeated calls reuse one connection pool instead of new TLS handshakes"""
+    import anthropic
+    return anthropic.Anthropic(api_key=ANTHROPIC_API_KEY, max_retries=API_MAX_RETRIES)
+
+@lru_cache(maxsize=1)
+def _genai_client():
+    """Shared Gemini client (embeddings and image generation)"""
+    from google import genai
+    return genai.Client(api_key=GOOGLE_API_KEY)
+
+def with_retries(fn: Callable, *args, **kwargs):
+    """Call fn, retrying transient API errors with full-jitter exponential backoff (capped at 60s)"""
+    for attempt in range(API_MAX_RETRIES):
+        try:
+            return fn(*args, **kwargs)
+        except Exception as e:
+            status = getattr(e, "code", None) or getattr(e, "status_code", None)
+            if status not in TRANSIENT_STATUS_CODES or attempt == API_MAX_RETRIES - 1:
+                raise
+            delay = random.uniform(0, min(60.0, 2.0 ** (attempt + 1)))
+            print(f"   ⏳ API error {status}, retrying in {delay:.1f}s...")
+            time.sleep(delay)
+
+def build_twitter_content(article_text: str, stream: str) -> List[dict]:
+    """User message content for the stream's Twitter prompt, with the instructions
+    and the article as separate prompt-cache segments"""
+    prefix, suffix = SP.article_prompt_segments("twitter", stream)
+
+    return [
+        {"type": "text", "text": prefix, "cache_control": {"type": "ephemeral"}},
+        {"type": "text", "text": article_text, "cache_control": {"type": "ephemeral"}},
+        {"type": "text", "text": suffix}
+    ]
+
+def log_cache_usage(response) -> None:
+    """Print prompt-cache hits/writes so cache effectiveness is visible"""
+    usage = response.usage
+    cache_read = getattr(usage, "cache_read_input_tokens", 0) or 0
+    cache_written = getattr(usage, "cache_creation_input_tokens", 0) or 0
+    if cache_read or cache_written:
+        print(f"   (prompt cache: {cache_read} tokens read, {cache_written} written)")
+
+_JSON_DECODER = json.JSONDecoder()
+
+def parse_twitter_post(response_text: str) -> dict:
+    """Parse the post JSON from Claude's response text (code fences/preamble are skipped)"""
+    # One pass from the first brace; raw_decode stops at the end of the object
+    start = response_text.find("{")
+    if start == -1:
+        raise json.JSONDecodeError("No JSON object in response", response_text, 0)
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.loads(response_text[start:response_text.rfind("}") + 1])
+        except orjson.JSONDecodeError:
+            pass  # trailing text with braces, or an unfinished stream - fall through
+    post_data, _ = _JSON_DECODER.raw_decode(response_text, start)
+    return post_data
+
+def twitter_post_tool(stream: str) -> dict:
+    """Tool whose input schema is the post JSON; forcing it makes Claude return the
+    fields as a typed tool_use block instead of fenced text"""
+    # Image fields come first: once tweet_text starts streaming they're complete,
+    # so the image prompt can be requested while the tweet is still being written
+    properties = {
+        "canva_headline": {"type": "string", "description": "Main headline for the image (5-8 words)"}
+    }
+    if stream == "advertising":
+        properties["canva_stat"] = {"type": ["string", "null"], "description": "Key stat for the image, or null"}
+    else:
+        properties["canva_subtext"] = {"type": "string", "description": "Supporting text for the image"}
+    properties["tweet_text"] = {"type": "string", "maxLength": 280, "description": "The tweet (240-260 chars, no URL)"}
+
+    return {
+        "name": "emit_twitter_post",
+        "description": "Return the Twitter post copy and the text for its image template.",
+        "input_schema": {"type": "object", "properties": properties, "required": list(properties)}
+    }
+
+def twitter_request_params(article_text: str, stream: str) -> dict:
+    """messages.create arguments for one article (shared by the live, batch and async paths)"""
+    return {
+        "model": "claude-sonnet-4-5",
+        "max_tokens": MAX_POST_TOKENS,
+        "tools": [twitter_post_tool(stream)],
+        "tool_choice": {"type": "tool", "name": "emit_twitter_post"},
+        "messages": [{"role": "user", "content": build_twitter_content(article_text, stream)}]
+    }
+
+def post_data_from_message(message) -> dict:
+    """The forced tool call's input (falls back to parsing text if there isn't one)"""
+    for block in message.content:
+        if block.type == "tool_use":
+            return dict(block.input)
+    return parse_twitter_post("".join(block.text for block in message.content if block.type == "text"))
+
+def json_bytes(data) -> bytes:
+    """Serialize data as indented UTF-8 JSON (uses orjson when installed)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+
+def jsonl_line(data) -> bytes:
+    """One compact JSON Lines record, newline included (uses orjson when installed)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(data, ensure_ascii=False) + "\n").encode('utf-8')
+
+def write_json_file(filename: str, data) -> None:
+    """Write data as indented UTF-8 JSON"""
+    Path(filename).write_bytes(json_bytes(data))
+
+def gemini_embed(text: str) -> List[float]:
+    """Embed article text with Gemini (the head of long articles is enough to spot duplicates)"""
+    result = _genai_client().models.embed_content(model="text-embedding-004", contents=text[:8000])
+    return result.embeddings[0].values
+
+# Local post cache: re-running the same article (per stream) skips Claude entirely,
+# and a lightly edited article is served by the semantic tier. The SQLite files
+# are opened on first use, so --help and argument errors never touch .cache/
+@lru_cache(maxsize=1)
+def _post_cache() -> ExactCache:
+    return ExactCache("twitter_posts")
+
+@lru_cache(maxsize=1)
+def _semantic_post_cache() -> Optional[SemanticCache]:
+    if not (GENAI_AVAILABLE and GOOGLE_API_KEY):
+        return None
+    return SemanticCache("twitter_posts_semantic", gemini_embed, threshold=0.95)
+
+# Set from the CLI: --no-cache skips lookups (fresh posts still get stored),
+# --template-version invalidates everything cached under another version
+USE_POST_CACHE = True
+TEMPLATE_VERSION = "1"
+
+# Image steps are cached on their exact inputs too, so re-running an article
+# (e.g. while iterating on the post) doesn't pay for a new prompt and render
+@lru_cache(maxsize=1)
+def _image_prompt_cache() -> ExactCache:
+    return ExactCache("twitter_image_prompts")
+
+IMAGE_CACHE_DIR = Path(CACHE_DIR) / "twitter_images"
+
+def template_id(stream: str) -> str:
+    """Short id of the prompt behind a cached post; changes with the template text or version"""
+    prefix, suffix = SP.article_prompt_segments("twitter", stream)
+    return cache_key(version=TEMPLATE_VERSION, prefix=prefix, suffix=suffix)[:16]
+
+def post_cache_key(article_text: str, stream: str) -> str:
+    return cache_key(stream=stream, template=template_id(stream), article_text=article_text)
+
+def lookup_cached_post(article_text: str, stream: str) -> Optional[dict]:
+    """Cached post for this article (exact match first, then near-duplicate), else None"""
+    if not USE_POST_CACHE:
+        return None
+    cached = _post_cache().get(post_cache_key(article_text, stream))
+    if cached is not None:
+        print("⚡ Reusing cached post for this article")
+        return cached
+    semantic_post_cache = _semantic_post_cache()
+    if semantic_post_cache:
+        cached = semantic_post_cache.get(article_text, namespace=f"{stream}:{template_id(stream)}")
+        if cached is not None:
+            print("⚡ Reusing cached post for a near-identical article")
+            return cached
+    return None
+
+def store_post(article_text: str, stream: str, post: dict) -> None:
+    _post_cache().set(post_cache_key(article_text, stream), post)
+    semantic_post_cache = _semantic_post_cache()
+    if semantic_post_cache:
+        semantic_post_cache.set(article_text, post, namespace=f"{stream}:{template_id(stream)}")
+
+def generate_twitter_post(article_text: str, stream: str = "advertising",
+                          on_text: Optional[Callable[[str], None]] = None,
+                          on_image_text: Optional[Callable[[str, str], None]] = None) -> dict:
     """
     Generate a Twitter post from article text.
 
     Args:
         article_text: The full article text to promote
         stream: Either 'advertising' or 'romantasy'
+        on_text: Called with each chunk of the post JSON as Claude streams it (not called on a cache hit)
+        on_image_text: Called once with (headline, stat_or_subtext) as soon as both have streamed in
 
     Returns:
         Dict with tweet_text, canva_headline, and canva_stat/canva_subtext
@@ -46,58 +266,196 @@ def generate_twitter_post(article_text: str, stream: str = "advertising") -> dic
     if not ANTHROPIC_API_KEY:
         raise ValueError("ANTHROPIC_API_KEY not found in environment")
 
-    # Select appropriate prompt
-    if stream == "advertising":
-        prompt = SP.TWITTER_ADVERTISING_PROMPT.format(article_text=article_text)
-    elif stream == "romantasy":
-        prompt = SP.TWITTER_ROMANTASY_PROMPT.format(article_text=article_text)
-    else:
-        raise ValueError(f"Unknown stream: {stream}. Use 'advertising' or 'romantasy'")
+    cached = lookup_cached_post(article_text, stream)
+    if cached is not None:
+        return cached
 
-    # Call Claude with JSON mode
+    # Call Claude with the post tool forced, so the reply is the JSON itself
     print(f"🐦 Generating Twitter post for {stream} stream...")
 
-    anthropic_client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
-    response = anthropic_client.messages.create(
-        model="claude-sonnet-4-5",
-        max_tokens=2000,
-        messages=[{
-            "role": "user",
-            "content": prompt
-        }]
-    )
-
-    # Parse JSON response
-    response_text = response.content[0].text.strip()
+    anthropic_client = _anthropic_client()
+    image_text_sent = on_image_text is None
+    with anthropic_client.messages.stream(**twitter_request_params(article_text, stream)) as message_stream:
+        for event in message_stream:
+            if event.type != "input_json":
+                continue
+            if on_text:
+                on_text(event.partial_json)
+            # tweet_text is the last field, so its arrival means the image fields are final
+            if not image_text_sent and "tweet_text" in (event.snapshot or {}):
+                image_text_sent = True
+                headline, stat_or_subtext = post_image_text(event.snapshot, stream)
+                if headline and stat_or_subtext:
+                    on_image_text(headline, stat_or_subtext)
+        response = message_stream.get_final_message()
+    log_cache_usage(response)
 
-    # Extract JSON from markdown code blocks if present
-    if "```json" in response_text:
-        response_text = response_text.split("```json")[1].split("```")[0].strip()
-    elif "```" in response_text:
-        response_text = response_text.split("```")[1].split("```")[0].strip()
+    post_data = post_data_from_message(response)
 
-    post_data = json.loads(response_text)
+    store_post(article_text, stream, post_data)
 
     return post_data
 
-def generate_image_prompt(article_text: str, headline: str, stat_or_subtext: str, stream: str = "advertising") -> str:
+def run_message_batch(batch_requests: List[dict]) -> dict:
+    """Submit requests as one Message Batch, poll until it ends, and return
+    {custom_id: message} for the requests that succeeded"""
+    anthropic_client = _anthropic_client()
+    batch = anthropic_client.messages.batches.create(requests=batch_requests)
+
+    # Poll with backoff until the batch ends
+    delay = 5.0
+    while batch.processing_status != "ended":
+        time.sleep(delay)
+        delay = min(delay * 2, 60.0)
+        batch = anthropic_client.messages.batches.retrieve(batch.id)
+        print(f"   ⏳ {batch.request_counts.succeeded} done, {batch.request_counts.processing} processing...")
+
+    messages = {}
+    for entry in anthropic_client.messages.batches.results(batch.id):
+        if entry.result.type != "succeeded":
+            print(f"   ⚠️  {entry.custom_id} {entry.result.type}")
+            continue
+        messages[entry.custom_id] = entry.result.message
+    return messages
+
+def generate_twitter_posts_batch(articles: List[str], stream: str = "advertising") -> List[Optional[dict]]:
     """
-    Use Claude to generate a custom, contextually relevant image prompt based on the article content.
+    Generate Twitter posts for several articles as one Message Batch.
 
-    Args:
-        article_text: The original article text
-        headline: The main headline text
-        stat_or_subtext: The stat (advertising) or subtext (romantasy)
-        stream: Either 'advertising' or 'romantasy'
+    Batches are billed at half the normal rate and need a single polling loop
+    instead of one round-trip per article.
 
     Returns:
-        A custom image generation prompt tailored to the article content
+        Post data per article, in input order (None where a request failed)
     """
     if not ANTHROPIC_API_KEY:
         raise ValueError("ANTHROPIC_API_KEY not found in environment")
 
-    print(f"🤖 Generating custom image prompt with Claude...")
+    # Articles already in the post cache don't need to be sent
+    posts: List[Optional[dict]] = [lookup_cached_post(article_text, stream) for article_text in articles]
+    batch_requests = [{
+        "custom_id": f"article{i}",
+        "params": twitter_request_params(article_text, stream)
+    } for i, article_text in enumerate(articles) if posts[i] is None]
+
+    if not batch_requests:
+        return posts
+
+    print(f"📦 Submitting {len(batch_requests)} Twitter posts for {stream} stream as a batch...")
+
+    for custom_id, message in run_message_batch(batch_requests).items():
+        i = int(custom_id[len("article"):])
+        try:
+            posts[i] = post_data_from_message(message)
+        except json.JSONDecodeError as e:
+            print(f"   ⚠️  {custom_id} returned invalid JSON: {e}")
+            continue
+        store_post(articles[i], stream, posts[i])
+
+    return posts
+
+class RateLimiter:
+    """Spaces request starts evenly so at most rpm begin per minute (avoids 429s)"""
+
+    def __init__(self, rpm: int):
+        self.interval = 60.0 / rpm if rpm > 0 else 0.0
+        self._next_start = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self) -> None:
+        if not self.interval:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_start - now
+            self._next_start = max(now, self._next_start) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+async def agenerate_twitter_post(anthropic_client, semaphore: asyncio.Semaphore, limiter: RateLimiter,
+                                article_text: str, stream: str) -> dict:
+    """Async Twitter post generation for one article (cache-aware, bounded by semaphore and RPM)"""
+    # Cache lookups may call the embedding API, so keep them off the event loop
+    cached = await asyncio.to_thread(lookup_cached_post, article_text, stream)
+    if cached is not None:
+        return cached
+
+    async with semaphore:
+        await limiter.wait()
+        response = await anthropic_client.messages.create(**twitter_request_params(article_text, stream))
+    log_cache_usage(response)
+
+    post = post_data_from_message(response)
+    await asyncio.to_thread(store_post, article_text, stream, post)
+    return post
+
+async def generate_twitter_posts_parallel(articles: List[str], stream: str = "advertising") -> List[Optional[dict]]:
+    """
+    Generate Twitter posts for several articles with concurrent live requests.
+
+    Faster than the batch path (seconds instead of minutes) but at full price.
+
+    Returns:
+        Post per article, in input order (None where a request failed)
+    """
+    if not ANTHROPIC_API_KEY:
+        raise ValueError("ANTHROPIC_API_KEY not found in environment")
+
+    rate = f", {MAX_RPM}/min" if MAX_RPM > 0 else ""
+    print(f"⚡ Generating {len(articles)} Twitter posts for {stream} stream ({MAX_CONCURRENCY} at a time{rate})...")
+
+    import anthropic
+    anthropic_client = anthropic.AsyncAnthropic(api_key=ANTHROPIC_API_KEY, max_retries=API_MAX_RETRIES)
+    semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+    limiter = RateLimiter(MAX_RPM)
+    results = await asyncio.gather(
+        *[agenerate_twitter_post(anthropic_client, semaphore, limiter, article_text, stream)
+          for article_text in articles],
+        return_exceptions=True
+    )
 
+    posts: List[Optional[dict]] = []
+    for i, result in enumerate(results):
+        if isinstance(result, Exception):
+            print(f"   ⚠️  article{i} failed: {result}")
+            posts.append(None)
+        else:
+            posts.append(result)
+    return posts
+
+# The image steps only look at the head of the article; it's cut once per post
+# and passed down, rather than handing the full text to every image function
+ARTICLE_EXCERPT_CHARS = 1500
+
+def article_excerpt(article_text: str) -> str:
+    return article_text[:ARTICLE_EXCERPT_CHARS]
+
+# Set from the CLI: --rich-prompt has Claude write each image prompt instead of
+# filling in the stream's template (one more round-trip per image)
+RICH_IMAGE_PROMPT = False
+
+_STOPWORDS = frozenset("""
+a about after all also an and any are as at be because been before being but by can could did do does
+during each even every for from get had has have how if in into is it its just like made make many may
+more most much must my new no not now of on one only or other our out over own same see should so some
+such than that the their them then there these they this those through to too under up us use used very
+was way we were what when where which while who why will with would you your
+""".split())
+
+def topic_phrase(article_text: str, count: int = 3) -> str:
+    """The article's most frequent content words (a local stand-in for a summary)"""
+    words = re.findall(r"[a-z][a-z'-]{2,}", article_excerpt(article_text).lower())
+    top = Counter(word for word in words if word not in _STOPWORDS).most_common(count)
+    return ", ".join(word for word, _ in top)
+
+def template_image_prompt(article_text: str, headline: str, stat_or_subtext: str, stream: str) -> str:
+    """Gemini prompt from the stream's fixed template - no Claude call"""
+    return SP.build_twitter_image_prompt(
+        stream, headline=headline, subtext=stat_or_subtext, topic_phrase=topic_phrase(article_text)
+    )
+
+def image_prompt_request(article_text: str, headline: str, stat_or_subtext: str, stream: str) -> dict:
+    """messages.create arguments asking Claude for an image prompt (shared by the live and batch paths)"""
     # Create stream-specific brand guidelines
     if stream == "advertising":
         brand_guidelines = """**BRAND: "The Viral Edit"**
@@ -120,23 +478,18 @@ def generate_image_prompt(article_text: str, headline: str, stat_or_subtext: str
 - Mood: Warm, inviting, creative, slightly magical - like a cozy book club meets fantasy world
 - Branding: Include "PLOT BREW" branding with a small book or quill icon"""
 
-    prompt = f"""{brand_guidelines}
-
-**ARTICLE CONTEXT:**
-{article_text[:1500]}
-
-**TEXT FOR IMAGE:**
-- Headline: "{headline}"
-- Supporting text: "{stat_or_subtext}"
+    # The brand guidelines and task are identical for every post in a stream, so
+    # they go first as a cached system prefix; only the article and image text vary
+    instructions = f"""{brand_guidelines}
 
 **YOUR TASK:**
-Create a detailed image generation prompt for Gemini AI that will produce a 16:9 Twitter social media graphic. The prompt should:
+You will be given an article and the text for its image. Create a detailed image generation prompt for Gemini AI that will produce a 16:9 Twitter social media graphic. The prompt should:
 
 1. Stay true to the brand guidelines above
 2. Incorporate visual elements that reflect the SPECIFIC content and themes of this article
 3. Suggest contextually relevant imagery, metaphors, or visual elements that connect to the article's topic
 4. Maintain professional quality and brand consistency
-5. Ensure the text ({headline} and {stat_or_subtext}) is clearly legible
+5. Ensure the headline and supporting text are clearly legible
 
 Be creative and specific about:
 - What background elements or imagery should appear (that relates to the article topic)
@@ -146,22 +499,97 @@ Be creative and specific about:
 Return ONLY the image generation prompt (no preamble, no explanation). The prompt should start with "Create a..." and be ready to send directly to Gemini.
 """
 
-    anthropic_client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
-    response = anthropic_client.messages.create(
-        model="claude-sonnet-4-5",
-        max_tokens=1500,
-        messages=[{
+    prompt = f"""**ARTICLE CONTEXT:**
+{article_excerpt(article_text)}
+
+**TEXT FOR IMAGE:**
+- Headline: "{headline}"
+- Supporting text: "{stat_or_subtext}"
+"""
+
+    return {
+        "model": "claude-sonnet-4-5",
+        "max_tokens": 1500,
+        "system": [{"type": "text", "text": instructions, "cache_control": {"type": "ephemeral"}}],
+        "messages": [{
             "role": "user",
             "content": prompt
         }]
-    )
+    }
+
+def generate_image_prompt(article_text: str, headline: str, stat_or_subtext: str, stream: str = "advertising") -> str:
+    """
+    Use Claude to generate a custom, contextually relevant image prompt based on the article content.
+
+    Args:
+        article_text: The original article text
+        headline: The main headline text
+        stat_or_subtext: The stat (advertising) or subtext (romantasy)
+        stream: Either 'advertising' or 'romantasy'
+
+    Returns:
+        A custom image generation prompt tailored to the article content
+    """
+    if not ANTHROPIC_API_KEY:
+        raise ValueError("ANTHROPIC_API_KEY not found in environment")
+
+    print(f"🤖 Generating custom image prompt with Claude...")
+
+    request = image_prompt_request(article_text, headline, stat_or_subtext, stream)
+    key = cache_key(**request)
+    if USE_POST_CACHE:
+        cached = _image_prompt_cache().get(key)
+        if cached is not None:
+            print("⚡ Reusing cached image prompt")
+            return cached
+
+    anthropic_client = _anthropic_client()
+    response = anthropic_client.messages.create(**request)
+    log_cache_usage(response)
 
     custom_prompt = response.content[0].text.strip()
     print(f"✅ Custom prompt generated ({len(custom_prompt)} chars)")
 
+    _image_prompt_cache().set(key, custom_prompt)
     return custom_prompt
 
-def generate_social_image(article_text: str, headline: str, stat_or_subtext: str, stream: str = "advertising") -> str:
+def generate_image_prompts_batch(jobs: List[tuple]) -> List[Optional[str]]:
+    """
+    Image prompts for several posts as one Message Batch.
+
+    Args:
+        jobs: (article_text, headline, stat_or_subtext, stream) per post
+
+    Returns:
+        Prompt per job, in input order (None where a request failed)
+    """
+    requests_by_job = [image_prompt_request(*job) for job in jobs]
+    keys = [cache_key(**request) for request in requests_by_job]
+    prompts: List[Optional[str]] = [_image_prompt_cache().get(key) if USE_POST_CACHE else None for key in keys]
+
+    batch_requests = [{"custom_id": f"image{i}", "params": request}
+                      for i, request in enumerate(requests_by_job) if prompts[i] is None]
+    if not batch_requests:
+        return prompts
+
+    print(f"📦 Submitting {len(batch_requests)} image prompts as a batch...")
+    for custom_id, message in run_message_batch(batch_requests).items():
+        i = int(custom_id[len("image"):])
+        prompts[i] = message.content[0].text.strip()
+        _image_prompt_cache().set(keys[i], prompts[i])
+
+    return prompts
+
+def write_image_part(inline_data, filename: str) -> str:
+    """Write an image part's bytes as-is (already encoded; no PIL decode/re-encode)"""
+    data = inline_data.data
+    if isinstance(data, str):
+        data = base64.b64decode(data)
+    Path(filename).write_bytes(data)
+    return filename
+
+def generate_social_image(article_text: str, headline: str, stat_or_subtext: str, stream: str = "advertising",
+                          image_filename: Optional[str] = None, design_prompt: Optional[str] = None) -> str:
     """
     Generate a social media image with text using Gemini, with a custom AI-generated prompt.
 
@@ -170,6 +598,8 @@ def generate_social_image(article_text: str, headline: str, stat_or_subtext: str
         headline: The main headline text
         stat_or_subtext: The stat (advertising) or subtext (romantasy)
         stream: Either 'advertising' or 'romantasy'
+        image_filename: Where to save the PNG (default: timestamped name)
+        design_prompt: Image prompt already made (e.g. by a batch); built if omitted
 
     Returns:
         Path to the saved image file
@@ -182,15 +612,30 @@ def generate_social_image(article_text: str, headline: str, stat_or_subtext: str
 
     print(f"🎨 Generating social media image for {stream} stream...")
 
-    # Generate custom prompt using Claude
-    design_prompt = generate_image_prompt(article_text, headline, stat_or_subtext, stream)
+    # Template prompt by default; --rich-prompt has Claude write a custom one
+    if not design_prompt:
+        if RICH_IMAGE_PROMPT:
+            design_prompt = generate_image_prompt(article_text, headline, stat_or_subtext, stream)
+        else:
+            design_prompt = template_image_prompt(article_text, headline, stat_or_subtext, stream)
+
+    if not image_filename:
+        image_filename = f"twitter_image_{stream}_{RUN_TIMESTAMP}.png"
+
+    # Same design prompt and aspect ratio -> reuse the PNG rendered last time
+    cached_image = IMAGE_CACHE_DIR / f"{cache_key(model='gemini-2.5-flash-image', prompt=design_prompt, aspect_ratio='16:9')}.png"
+    if USE_POST_CACHE and cached_image.exists():
+        shutil.copyfile(cached_image, image_filename)
+        print(f"⚡ Reusing cached image: {image_filename}")
+        return image_filename
 
-    # Create Gemini client
-    client = genai.Client(api_key=GOOGLE_API_KEY)
+    from google.genai import types
+    client = _genai_client()
 
     try:
         # Generate image with Gemini
-        response = client.models.generate_content(
+        response = with_retries(
+            client.models.generate_content,
             model="gemini-2.5-flash-image",
             contents=[design_prompt],
             config=types.GenerateContentConfig(
@@ -201,29 +646,245 @@ def generate_social_image(article_text: str, headline: str, stat_or_subtext: str
             )
         )
 
-        # Save the generated image
-        timestamp = datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')
-        image_filename = f"twitter_image_{stream}_{timestamp}.png"
-
-        for part in response.parts:
-            if part.inline_data is not None:
-                image = part.as_image()
-                image.save(image_filename)
-                print(f"✅ Image saved: {image_filename}")
-                return image_filename
+        # Save the generated image(s): the first under image_filename, any extra
+        # variants as <name>_2.png, <name>_3.png, ... (written concurrently)
+        image_parts = [part.inline_data for part in response.parts if part.inline_data is not None]
+        if not image_parts:
+            raise RuntimeError("No image generated in response")
+
+        path = Path(image_filename)
+        filenames = [image_filename] + [str(path.with_name(f"{path.stem}_{i}{path.suffix}"))
+                                        for i in range(2, len(image_parts) + 1)]
+        if len(image_parts) == 1:
+            write_image_part(image_parts[0], image_filename)
+        else:
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                list(executor.map(write_image_part, image_parts, filenames))
+        for filename in filenames:
+            print(f"✅ Image saved: {filename}")
 
-        raise RuntimeError("No image generated in response")
+        IMAGE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(image_filename, cached_image)
+        return image_filename
 
     except Exception as e:
         raise RuntimeError(f"Gemini image generation failed: {e}")
 
+# Set from the CLI: --dedupe stores each distinct auto-saved post once, gzipped,
+# under artifacts/<stream>/ and makes the timestamped file a symlink to it
+DEDUPE_ARTIFACTS = False
+ARTIFACTS_DIR = Path("artifacts")
+# symlink_to() errors that mean "links aren't available here" (winerror 1314: privilege not held)
+_NO_SYMLINK_ERRNOS = {errno.EPERM, errno.EOPNOTSUPP, errno.ENOSYS}
+
+def save_artifact(filename: str, blob: bytes, stream: str) -> str:
+    """Auto-save a post; returns where the content actually lives"""
+    path = Path(filename)
+    # Replace, never write through, an existing file: it may be a link into artifacts/
+    path.unlink(missing_ok=True)
+    if not DEDUPE_ARTIFACTS:
+        path.write_bytes(blob)
+        return filename
+
+    digest = hashlib.sha256(blob).hexdigest()[:16]
+    target = ARTIFACTS_DIR / stream / f"{digest}{path.suffix}.gz"
+    if not target.exists():
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(gzip.compress(blob))
+    try:
+        path.symlink_to(target.resolve())
+    except (NotImplementedError, OSError) as e:
+        if isinstance(e, OSError) and e.errno not in _NO_SYMLINK_ERRNOS and getattr(e, "winerror", None) != 1314:
+            raise
+        # No symlink support (e.g. Windows without developer mode)
+        path.write_bytes(blob)
+        return filename
+    return str(target)
+
 def read_article_from_stdin() -> str:
-    """Read article text from stdin (for piping)"""
-    print("📝 Reading article text from stdin...")
-    print("(Paste your article text, then press Ctrl+D on a new line to finish)\n")
-    return sys.stdin.read().strip()
+    """Read article text from stdin (for piping); prompts go to stderr so stdout stays clean"""
+    print("📝 Reading article text from stdin...", file=sys.stderr)
+    print("(Paste your article text, then press Ctrl+D on a new line to finish)\n", file=sys.stderr)
+    # One binary read and a single decode, instead of the line-by-line text layer
+    return sys.stdin.buffer.read().decode('utf-8', errors='replace').strip()
+
+def print_twitter_post(post_data: dict, stream: str, title_suffix: str = "") -> None:
+    """Display the tweet text and design template text"""
+    print("\n" + "="*60)
+    print(f"🐦 TWITTER POST ({stream.upper()}){title_suffix}")
+    print("="*60 + "\n")
+
+    print("📱 TWEET TEXT:")
+    print("-" * 60)
+    print(post_data.get("tweet_text", ""))
+    print("-" * 60)
+    print(f"Character count: {len(post_data.get('tweet_text', ''))}")
+
+    print("\n🎨 DESIGN TEMPLATE TEXT:")
+    print("-" * 60)
+    print(f"Headline: {post_data.get('canva_headline', '')}")
+
+    if stream == "advertising":
+        stat = post_data.get('canva_stat')
+        if stat:
+            print(f"Stat: {stat}")
+        else:
+            print("Stat: (not applicable)")
+    else:  # romantasy
+        subtext = post_data.get('canva_subtext', '')
+        print(f"Subtext: {subtext}")
+
+    print("-" * 60)
+
+def post_image_text(post_data: dict, stream: str) -> tuple:
+    """(headline, stat or subtext) for the post's image"""
+    headline = post_data.get('canva_headline', '')
+    stat_or_subtext = post_data.get('canva_stat') if stream == "advertising" else post_data.get('canva_subtext', '')
+    return headline, stat_or_subtext
+
+def create_post_image(article_text: str, post_data: dict, stream: str,
+                      image_filename: Optional[str] = None, design_prompt: Optional[str] = None) -> Optional[str]:
+    """Generate the post's image; None (with a warning) if it can't be made"""
+    try:
+        headline, stat_or_subtext = post_image_text(post_data, stream)
+
+        if headline and stat_or_subtext:
+            print("\n🎨 GENERATING AI IMAGE...")
+            print("-" * 60)
+            image_filename = generate_social_image(article_excerpt(article_text), headline, stat_or_subtext, stream,
+                                                   image_filename, design_prompt)
+            print(f"🖼️  Image ready: {image_filename}")
+            print("-" * 60)
+            return image_filename
+
+        print("\n⚠️  Cannot generate image: missing headline or stat/subtext")
+    except Exception as img_error:
+        print(f"\n⚠️  Image generation failed: {img_error}")
+        print("   Continuing without image...")
+    return None
+
+def output_stem(path: str, index: int) -> str:
+    """Per-input name part for multi-file runs: the file stem plus its 1-based position,
+    so inputs like intro.txt/intro.md or a/x.txt/b/x.txt never share an output file"""
+    return f"{Path(path).stem}_{index + 1}"
+
+def generate_many(files: List[str], stream: str, timestamp: str, generate_image: bool = False,
+                  parallel: bool = False) -> None:
+    """Generate one Twitter post per article file (batch or parallel) and auto-save each as JSON"""
+    articles = [Path(path).read_text(encoding='utf-8').strip() for path in files]
+
+    try:
+        if parallel:
+            posts = asyncio.run(generate_twitter_posts_parallel(articles, stream))
+        else:
+            posts = generate_twitter_posts_batch(articles, stream)
+    except Exception as e:
+        print(f"\n❌ ERROR: {e}")
+        sys.exit(1)
+
+    # With --rich-prompt on the batch path, every Claude image prompt is fetched
+    # up front in one more batch, so the render pool below only waits on Gemini
+    design_prompts = [None] * len(articles)
+    if generate_image and RICH_IMAGE_PROMPT and not parallel:
+        indexes = [i for i, post_data in enumerate(posts) if post_data and all(post_image_text(post_data, stream))]
+        if indexes:
+            batch_prompts = generate_image_prompts_batch(
+                [(article_excerpt(articles[i]), *post_image_text(posts[i], stream), stream) for i in indexes])
+            for i, design_prompt in zip(indexes, batch_prompts):
+                design_prompts[i] = design_prompt
+
+    # Images (prompt + Gemini render, several seconds each) are made
+    # concurrently; each article's JSON is saved once its image is done
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        pending = []
+        for index, (path, article_text, post_data, design_prompt) in enumerate(zip(files, articles, posts, design_prompts)):
+            if post_data is None:
+                print(f"\n❌ Generation failed for {path}")
+                continue
+            print_twitter_post(post_data, stream, f" - {path}")
+
+            stem = output_stem(path, index)
+            image_future = None
+            if generate_image:
+                image_future = executor.submit(create_post_image, article_text, post_data, stream,
+                                               f"twitter_image_{stream}_{stem}_{timestamp}.png", design_prompt)
+            pending.append((stem, post_data, image_future))
+
+        for stem, post_data, image_future in pending:
+            image_filename = image_future.result() if image_future else None
+            if image_filename:
+                post_data['generated_image'] = image_filename
+
+            output_file = f"twitter_post_{stream}_{stem}_{timestamp}.json"
+            stored = save_artifact(output_file, json_bytes(post_data), stream)
+            print(f"💾 Text saved to: {output_file}" + (f" -> {stored}" if stored != output_file else ""))
+
+def generate_from_jsonl(batch_file: str, timestamp: str, generate_image: bool = False) -> None:
+    """
+    Bulk mode: every {"article_text", "stream"} line of a JSONL file, with posts
+    and image prompts each sent as Message Batches. Results go to one JSONL file.
+    """
+    jobs = []
+    for line_no, line in enumerate(Path(batch_file).read_text(encoding='utf-8').splitlines(), 1):
+        if not line.strip():
+            continue
+        job = json.loads(line)
+        if job.get("stream") not in ("advertising", "romantasy") or not job.get("article_text"):
+            print(f"⚠️  Skipping line {line_no}: needs article_text and stream (advertising/romantasy)")
+            continue
+        jobs.append((line_no, job["article_text"].strip(), job["stream"]))
+
+    # One post batch per stream (the prompt prefix differs by stream)
+    posts: List[Optional[dict]] = [None] * len(jobs)
+    try:
+        for stream in ("advertising", "romantasy"):
+            indexes = [i for i, job in enumerate(jobs) if job[2] == stream]
+            if indexes:
+                stream_posts = generate_twitter_posts_batch([jobs[i][1] for i in indexes], stream)
+                for i, post_data in zip(indexes, stream_posts):
+                    posts[i] = post_data
+    except Exception as e:
+        print(f"\n❌ ERROR: {e}")
+        sys.exit(1)
+
+    images: List[Optional[str]] = [None] * len(jobs)
+    if generate_image:
+        # With --rich-prompt, Claude's image prompts go as a second batch; then
+        # the Gemini renders run concurrently
+        image_jobs = []
+        for i, ((line_no, article_text, stream), post_data) in enumerate(zip(jobs, posts)):
+            if post_data and all(post_image_text(post_data, stream)):
+                image_jobs.append((i, (article_excerpt(article_text), *post_image_text(post_data, stream), stream)))
+
+        if RICH_IMAGE_PROMPT and image_jobs:
+            design_prompts = generate_image_prompts_batch([job for _, job in image_jobs])
+        else:
+            design_prompts = [None] * len(image_jobs)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = {}
+            for (i, job), design_prompt in zip(image_jobs, design_prompts):
+                if design_prompt or not RICH_IMAGE_PROMPT:
+                    line_no, article_text, stream = jobs[i]
+                    futures[i] = executor.submit(create_post_image, article_text, posts[i], stream,
+                                                 f"twitter_image_{stream}_line{line_no}_{timestamp}.png", design_prompt)
+            for i, future in futures.items():
+                images[i] = future.result()
+
+    # Serialize every record, then write the file in one call
+    records = []
+    for (line_no, _, stream), post_data, image_filename in zip(jobs, posts, images):
+        if post_data and image_filename:
+            post_data['generated_image'] = image_filename
+        records.append(jsonl_line({"line": line_no, "stream": stream, "post": post_data}))
+    output_file = f"twitter_batch_{timestamp}.jsonl"
+    Path(output_file).write_bytes(b"".join(records))
+
+    done = sum(post_data is not None for post_data in posts)
+    print(f"\n💾 {done}/{len(jobs)} posts saved to: {output_file}")
 
 def main():
+    global USE_POST_CACHE, TEMPLATE_VERSION, DEDUPE_ARTIFACTS, MAX_CONCURRENCY, MAX_RPM, RICH_IMAGE_PROMPT
+
     parser = argparse.ArgumentParser(
         description="Generate Twitter posts from article text with optional AI-generated images",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -233,7 +894,8 @@ Examples:
   python generate_twitter_post.py --stream advertising
 
   # Generate with AI image (requires ANTHROPIC_API_KEY + GOOGLE_API_KEY):
-  # Claude generates a custom image prompt, then Gemini generates the image
+  # The stream's image template is filled in from the post, then Gemini renders it
+  # (add --rich-prompt to have Claude write a custom image prompt first)
   python generate_twitter_post.py --stream advertising --generate-image
 
   # Pipe from file with AI-generated contextual image:
@@ -245,6 +907,18 @@ Examples:
   # Save to specific file:
   python generate_twitter_post.py --stream advertising --output my_tweet.json
 
+  # Several articles at once (sent as one discounted batch):
+  python generate_twitter_post.py --stream romantasy --files articles/*.txt
+
+  # Every .txt/.md article in a folder, with concurrent live requests:
+  python generate_twitter_post.py --stream advertising --articles-dir articles/ --parallel
+
+  # Half-price Claude calls for a run you don't need back immediately:
+  python generate_twitter_post.py --stream advertising --economy --generate-image
+
+  # Bulk JSONL ({"article_text": ..., "stream": ...} per line), posts and images batched:
+  python generate_twitter_post.py --batch articles.jsonl --generate-image
+
 Environment Variables:
   ANTHROPIC_API_KEY - Required for post generation
   GOOGLE_API_KEY - Required for image generation (--generate-image)
@@ -270,23 +944,119 @@ Output:
         help="Article text (if not provided, will read from stdin)"
     )
 
+    parser.add_argument(
+        "--files",
+        nargs="+",
+        help="Article text files; more than one is processed as a single Message Batch"
+    )
+
+    parser.add_argument(
+        "--batch",
+        metavar="FILE",
+        help="JSONL of {\"article_text\", \"stream\"} objects; posts and image prompts are sent as Message Batches"
+    )
+
+    parser.add_argument(
+        "--articles-dir",
+        type=str,
+        help="Process every .txt/.md file in this folder (like --files)"
+    )
+
+    parser.add_argument(
+        "--parallel",
+        action="store_true",
+        help="With several articles, use concurrent live requests instead of a batch (faster, full price)"
+    )
+
+    parser.add_argument(
+        "--max-concurrency",
+        type=int,
+        default=MAX_CONCURRENCY,
+        help="Requests in flight at once with --parallel (default: $CLAUDE_MAX_CONCURRENCY or 8)"
+    )
+
+    parser.add_argument(
+        "--rpm",
+        type=int,
+        default=MAX_RPM,
+        help="Max requests started per minute with --parallel; 0 for no limit (default: $CLAUDE_RPM or 0)"
+    )
+
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always call Claude (and Gemini), even for an article that was already processed"
+    )
+
+    parser.add_argument(
+        "--dedupe",
+        action="store_true",
+        help="Store auto-saved posts once (gzipped, content-addressed under artifacts/) and symlink the timestamped file to them"
+    )
+
+    parser.add_argument(
+        "--template-version",
+        type=str,
+        default=TEMPLATE_VERSION,
+        help="Cache namespace for the prompt templates; bump it to invalidate cached posts"
+    )
+
     parser.add_argument(
         "--output",
         type=str,
         help="Save to JSON file instead of just printing"
     )
 
+    parser.add_argument(
+        "--economy",
+        action="store_true",
+        help="Send the Claude calls (post and image prompt) as Message Batches: half price, "
+             "but a result can take several minutes instead of seconds. Gemini renders are unaffected"
+    )
+
+    parser.add_argument(
+        "--rich-prompt",
+        action="store_true",
+        help="Have Claude write a custom image prompt per post instead of filling in the stream's template "
+             "(one more Claude call per image)"
+    )
+
     parser.add_argument(
         "--generate-image",
         action="store_true",
-        help="Generate contextual social media image using Claude + Gemini AI (requires ANTHROPIC_API_KEY + GOOGLE_API_KEY)"
+        help="Generate a social media image with Gemini AI (requires GOOGLE_API_KEY)"
     )
 
     args = parser.parse_args()
 
+    USE_POST_CACHE = not args.no_cache
+    TEMPLATE_VERSION = args.template_version
+    DEDUPE_ARTIFACTS = args.dedupe
+    MAX_CONCURRENCY = max(1, args.max_concurrency)
+    MAX_RPM = args.rpm
+    RICH_IMAGE_PROMPT = args.rich_prompt
+
+    timestamp = RUN_TIMESTAMP
+
+    if args.batch:
+        generate_from_jsonl(args.batch, timestamp, args.generate_image)
+        return
+
+    if args.articles_dir:
+        folder = Path(args.articles_dir)
+        args.files = (args.files or []) + sorted(
+            str(path) for path in folder.iterdir() if path.suffix in (".txt", ".md")
+        )
+
+    if args.files and len(args.files) > 1:
+        generate_many(args.files, args.stream, timestamp, args.generate_image, args.parallel)
+        return
+
     # Get article text
     if args.text:
         article_text = args.text
+    elif args.files:
+        article_text = Path(args.files[0]).read_text(encoding='utf-8').strip()
     else:
         article_text = read_article_from_stdin()
 
@@ -294,55 +1064,54 @@ Output:
         print("ERROR: No article text provided")
         sys.exit(1)
 
+    # With --generate-image, work that doesn't need the finished post overlaps the
+    # post stream: the google-genai import/client, and the Claude image prompt,
+    # which starts as soon as the headline and stat/subtext have streamed in
+    image_executor = None
+    prompt_futures = {}
+    if args.generate_image:
+        image_executor = ThreadPoolExecutor(max_workers=2)
+        if GENAI_AVAILABLE and GOOGLE_API_KEY:
+            image_executor.submit(_genai_client)
+
+    def start_image_prompt(headline: str, stat_or_subtext: str) -> None:
+        prompt_futures[(headline, stat_or_subtext)] = image_executor.submit(
+            generate_image_prompt, article_excerpt(article_text), headline, stat_or_subtext, args.stream)
+
     # Generate post
     try:
-        post_data = generate_twitter_post(article_text, args.stream)
+        # A progress dot per streamed chunk (the raw JSON isn't worth showing)
+        def show_progress(text: str) -> None:
+            sys.stdout.write(".")
+            sys.stdout.flush()
+
+        if args.economy:
+            # Half-price Message Batch instead of a live request (minutes, not seconds)
+            post_data = generate_twitter_posts_batch([article_text], args.stream)[0]
+            if post_data is None:
+                raise RuntimeError("Batch request for the post failed")
+        else:
+            post_data = generate_twitter_post(article_text, args.stream, on_text=show_progress,
+                                              on_image_text=start_image_prompt if image_executor and RICH_IMAGE_PROMPT else None)
 
-        # Display results
-        print("\n" + "="*60)
-        print(f"🐦 TWITTER POST ({args.stream.upper()})")
-        print("="*60 + "\n")
-
-        print("📱 TWEET TEXT:")
-        print("-" * 60)
-        print(post_data.get("tweet_text", ""))
-        print("-" * 60)
-        print(f"Character count: {len(post_data.get('tweet_text', ''))}")
-
-        print("\n🎨 DESIGN TEMPLATE TEXT:")
-        print("-" * 60)
-        print(f"Headline: {post_data.get('canva_headline', '')}")
-
-        if args.stream == "advertising":
-            stat = post_data.get('canva_stat')
-            if stat:
-                print(f"Stat: {stat}")
-            else:
-                print("Stat: (not applicable)")
-        else:  # romantasy
-            subtext = post_data.get('canva_subtext', '')
-            print(f"Subtext: {subtext}")
-
-        print("-" * 60)
+        print_twitter_post(post_data, args.stream)
 
         # Generate image if requested
         image_filename = None
         if args.generate_image:
-            try:
-                headline = post_data.get('canva_headline', '')
-                stat_or_subtext = post_data.get('canva_stat') if args.stream == "advertising" else post_data.get('canva_subtext', '')
-
-                if headline and stat_or_subtext:
-                    print("\n🎨 GENERATING AI IMAGE...")
-                    print("-" * 60)
-                    image_filename = generate_social_image(article_text, headline, stat_or_subtext, args.stream)
-                    print(f"🖼️  Image ready: {image_filename}")
-                    print("-" * 60)
-                else:
-                    print("\n⚠️  Cannot generate image: missing headline or stat/subtext")
-            except Exception as img_error:
-                print(f"\n⚠️  Image generation failed: {img_error}")
-                print("   Continuing without image...")
+            design_prompt = None
+            prompt_future = prompt_futures.get(post_image_text(post_data, args.stream))
+            if prompt_future:
+                try:
+                    design_prompt = prompt_future.result()
+                except Exception as e:
+                    print(f"\n⚠️  Early image prompt failed ({e}), retrying...")
+            elif args.economy and RICH_IMAGE_PROMPT and all(post_image_text(post_data, args.stream)):
+                design_prompt = generate_image_prompts_batch(
+                    [(article_excerpt(article_text), *post_image_text(post_data, args.stream), args.stream)])[0]
+            image_executor.shutdown(wait=False)
+            image_filename = create_post_image(article_text, post_data, args.stream,
+                                               f"twitter_image_{args.stream}_{timestamp}.png", design_prompt)
 
         if not args.generate_image:
             print("\n💡 Copy these values into your design tool (Canva, Figma, Bannerbear, etc.)")
@@ -354,18 +1123,20 @@ Output:
         if args.output:
             output_file = args.output
         else:
-            # Auto-save with timestamp
-            timestamp = datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')
+            # Auto-save with the run's timestamp
             output_file = f"twitter_post_{args.stream}_{timestamp}.json"
 
         # Add image filename to JSON if generated
         if image_filename:
             post_data['generated_image'] = image_filename
 
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(post_data, f, indent=2, ensure_ascii=False)
+        if args.output:
+            write_json_file(output_file, post_data)
+            stored = output_file
+        else:
+            stored = save_artifact(output_file, json_bytes(post_data), args.stream)
 
-        print(f"💾 Text saved to: {output_file}")
+        print(f"💾 Text saved to: {output_file}" + (f" -> {stored}" if stored != output_file else ""))
         if image_filename:
             print(f"🖼️  Image saved to: {image_filename}")
             print(f"\n✅ Ready to post! Upload {image_filename} to Twitter with the tweet text above.")
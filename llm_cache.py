@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# llm_cache.py
+# Local on-disk caches for LLM responses, shared by the social scripts
+
+import os
+import json
+import math
+import hashlib
+import time
+import sqlite3
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+CACHE_DIR = ".cache"
+DEFAULT_TTL_SECONDS = 7 * 24 * 3600
+
+def _unit_vector(v: List[float]) -> Optional[List[float]]:
+    """v scaled to length 1 (so cosine similarity is a plain dot product), or None for a zero vector"""
+    norm = math.sqrt(sum(x * x for x in v))
+    if not norm:
+        return None
+    return [x / norm for x in v]
+
+def _open_db(path: str, schema: str, label: str) -> Optional[sqlite3.Connection]:
+    """Connection to path with its table created, or None if the disk is unusable (the cache then always misses)"""
+    conn = None
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        conn = sqlite3.connect(path, check_same_thread=False)
+        conn.execute(schema)
+        conn.commit()
+        return conn
+    except (OSError, sqlite3.Error) as e:
+        if conn is not None:
+            conn.close()
+        print(f"   ({label} unavailable: {e})")
+        return None
+
+def cache_key(**parts: Any) -> str:
+    """SHA-256 of the canonical JSON form of the request parts (model, prompt, ...)"""
+    canonical = json.dumps(parts, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+class ExactCache:
+    """
+    Returns a stored response when the exact same request was made before.
+
+    Keys come from cache_key(). Entries live in .cache/<name>.sqlite and
+    expire after ttl_seconds. Like SemanticCache, disk errors (including
+    an unwritable cache directory) are treated as misses.
+    """
+
+    def __init__(self, name: str, ttl_seconds: int = DEFAULT_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+
+        self.path = os.path.join(CACHE_DIR, f"{name}.sqlite")
+        self._conn = _open_db(self.path, """
+            CREATE TABLE IF NOT EXISTS exact_entries (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """, "response cache")
+
+    def get(self, key: str) -> Optional[Any]:
+        """Unexpired response stored under key, else None"""
+        if self._conn is None:
+            return None
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT response FROM exact_entries WHERE key = ? AND created_at >= ?",
+                    (key, time.time() - self.ttl_seconds)
+                ).fetchone()
+        except sqlite3.Error as e:
+            print(f"   (response cache unavailable: {e})")
+            return None
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: str, response: Any) -> None:
+        """Store (or replace) the response for key"""
+        if self._conn is None:
+            return
+        try:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO exact_entries VALUES (?, ?, ?)",
+                    (key, json.dumps(response, ensure_ascii=False), time.time())
+                )
+                self._conn.execute(
+                    "DELETE FROM exact_entries WHERE created_at < ?",
+                    (time.time() - self.ttl_seconds,)
+                )
+                self._conn.commit()
+        except sqlite3.Error as e:
+            print(f"   (response cache unavailable: {e})")
+
+class SemanticCache:
+    """
+    Returns a stored response when a new query is semantically close to a cached one.
+
+    embed_fn maps text to an embedding vector (e.g. Gemini text embeddings).
+    Entries live in .cache/<name>.sqlite and expire after ttl_seconds; each
+    namespace's vectors are loaded (pre-normalized) once and kept in memory,
+    so a lookup is one pass of dot products. Cache failures (embedding errors,
+    disk errors, an unusable cache file) never propagate - they are treated as misses so generation
+    always falls through to the LLM.
+    """
+
+    def __init__(self, name: str, embed_fn: Callable[[str], List[float]],
+                 threshold: float = 0.92, ttl_seconds: int = DEFAULT_TTL_SECONDS):
+        self.embed_fn = embed_fn
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self._embeddings: Dict[str, List[float]] = {}
+        # namespace -> [(unit embedding, response JSON, created_at)]
+        self._entries: Dict[str, List[Tuple[List[float], str, float]]] = {}
+        self._lock = threading.Lock()
+
+        self.path = os.path.join(CACHE_DIR, f"{name}.sqlite")
+        self._conn = _open_db(self.path, """
+            CREATE TABLE IF NOT EXISTS semantic_entries (
+                namespace TEXT NOT NULL,
+                query TEXT NOT NULL,
+                embedding TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """, "semantic cache")
+
+    def _embed(self, query: str) -> Optional[List[float]]:
+        if query not in self._embeddings:
+            try:
+                self._embeddings[query] = list(self.embed_fn(query))
+            except Exception as e:
+                print(f"   (semantic cache unavailable: {e})")
+                return None
+        return self._embeddings[query]
+
+    def _namespace_entries(self, namespace: str) -> List[Tuple[List[float], str, float]]:
+        """In-memory entries for a namespace (read from disk on first use; call with the lock held)"""
+        if self._conn is None:
+            return []
+        if namespace not in self._entries:
+            rows = self._conn.execute(
+                "SELECT embedding, response, created_at FROM semantic_entries WHERE namespace = ? AND created_at >= ?",
+                (namespace, time.time() - self.ttl_seconds)
+            ).fetchall()
+            entries = []
+            for stored_embedding, response, created_at in rows:
+                unit = _unit_vector(json.loads(stored_embedding))
+                if unit is not None:
+                    entries.append((unit, response, created_at))
+            self._entries[namespace] = entries
+        return self._entries[namespace]
+
+    def get(self, query: str, namespace: str = "default") -> Optional[Any]:
+        """Most similar unexpired response at or above the threshold, else None"""
+        if self._conn is None:
+            return None
+        embedding = self._embed(query)
+        if embedding is None:
+            return None
+        unit = _unit_vector(embedding)
+        if unit is None:
+            return None
+
+        cutoff = time.time() - self.ttl_seconds
+        best_score, best_response = 0.0, None
+        try:
+            with self._lock:
+                entries = self._namespace_entries(namespace)
+        except sqlite3.Error as e:
+            print(f"   (semantic cache unavailable: {e})")
+            return None
+
+        for stored_unit, response, created_at in entries:
+            if created_at < cutoff:
+                continue
+            score = sum(x * y for x, y in zip(unit, stored_unit))
+            if score > best_score:
+                best_score, best_response = score, response
+
+        if best_response is None or best_score < self.threshold:
+            return None
+        return json.loads(best_response)
+
+    def set(self, query: str, response: Any, namespace: str = "default") -> None:
+        """Store a response for this query"""
+        if self._conn is None:
+            return
+        embedding = self._embed(query)
+        if embedding is None:
+            return
+
+        response_json = json.dumps(response, ensure_ascii=False)
+        created_at = time.time()
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "INSERT INTO semantic_entries VALUES (?, ?, ?, ?, ?)",
+                    (namespace, query, json.dumps(embedding), response_json, created_at)
+                )
+                self._conn.execute(
+                    "DELETE FROM semantic_entries WHERE created_at < ?",
+                    (time.time() - self.ttl_seconds,)
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                self._conn.rollback()
+                print(f"   (semantic cache unavailable: {e})")
+                return
+
+            unit = _unit_vector(embedding)
+            if namespace in self._entries:
+                cutoff = created_at - self.ttl_seconds
+                entries = [entry for entry in self._entries[namespace] if entry[2] >= cutoff]
+                if unit is not None:
+                    entries.append((unit, response_json, created_at))
+                self._entries[namespace] = entries
@@ -2,18 +2,25 @@
 # VERSION 8.0: "Melissa" E-E-A-T Idea Factory (Advertising Investment & Accountability Focus)
 # Integrated RSS feeds + Reddit auto-discovery with shared relevance filtering
 
-import os, re, json, argparse, logging, time, hashlib
+import os, re, json, argparse, logging, time, hashlib, asyncio, atexit, threading, random, sqlite3, calendar, string
+import importlib.util
 from typing import Any, Dict, List, Optional
 from urllib.parse import urlparse
-from datetime import datetime, timezone, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import lru_cache
+from html import escape
+from operator import itemgetter
 
 import requests
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
-from bs4 import BeautifulSoup
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, SoupStrainer
 import anthropic
 
 try:
-    from openai import OpenAI
+    from openai import OpenAI, AsyncOpenAI
 except ImportError:
     print("FATAL: Missing 'openai' library. Install with 'pip install openai'.")
     raise SystemExit(1)
@@ -30,7 +37,15 @@ except ImportError:
     feedparser = None
     print("WARNING: Missing 'feedparser' library. RSS feeds unavailable. Install with 'pip install feedparser'.")
 
+# Optional: faster JSON (falls back to stdlib json)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 import prompts as P
+from llm_cache import ExactCache, cache_key
 
 # ---------- Logging ----------
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
@@ -57,6 +72,29 @@ if not ANTHROPIC_API_KEY:
 
 client = OpenAI(api_key=OPENAI_API_KEY, timeout=180.0)
 anthropic_client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY, timeout=180.0)
+# Async clients for fanning out many small calls (the relevance filter) at once.
+# Their connection pools belong to the loop they first run on, so every async
+# batch runs on this one loop rather than a fresh asyncio.run() each time
+async_client = AsyncOpenAI(api_key=OPENAI_API_KEY, timeout=180.0)
+async_anthropic_client = anthropic.AsyncAnthropic(api_key=ANTHROPIC_API_KEY, timeout=180.0)
+event_loop = asyncio.new_event_loop()
+
+# Pooled HTTP session for WordPress and page scraping: one TCP+TLS handshake per
+# host for the whole run. Retries cover idempotent requests only (not POST)
+HTTP = requests.Session()
+HTTP.mount("https://", HTTPAdapter(
+    pool_connections=16, pool_maxsize=32,
+    # Own short backoff only: a server's Retry-After could otherwise stall the run for minutes
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504],
+                      respect_retry_after_header=False),
+))
+atexit.register(HTTP.close)
+SCRAPE_HEADERS = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
+# Title scraping only needs the <head>: stop downloading once </title> shows up,
+# and only build the <title> subtree (lxml's C parser when it's installed)
+TITLE_PARSER = "lxml" if importlib.util.find_spec("lxml") else "html.parser"
+_ONLY_TITLE = SoupStrainer('title')
+TITLE_MAX_BYTES = 512 * 1024
 
 # Reddit API
 REDDIT_CLIENT_ID = os.getenv("REDDIT_CLIENT_ID")
@@ -82,6 +120,10 @@ MODEL_MAP = {
     # Keyphrase model removed
 }
 API_MAX_RETRIES = 3
+TRANSIENT_STATUS_CODES = {408, 409, 425, 429, 500, 502, 503, 504, 529}
+RELEVANCE_FILTER_CONCURRENCY = 8  # Relevance-filter calls in flight at once
+RELEVANCE_FILTER_BATCH_SIZE = 20  # Titles scored per relevance-filter call
+RELEVANCE_CACHE_TTL = 30 * 24 * 3600  # Seconds a title's relevance verdict is reused
 
 # --- Discovery Time Window (Shared by Reddit & RSS) ---
 DISCOVERY_HOURS_WINDOW = 168  # 7 days - run weekly or a few times per week
@@ -102,8 +144,15 @@ SUBREDDIT_CONFIG = {
     "Automation": 100,        "fintech": 25,            "privacy": 100,
 }
 
+# Cheap pre-filter ahead of the AI relevance filter. Posts in these core subreddits
+# scoring at least this much (5x their bar) are accepted without an LLM call
+REDDIT_AUTOACCEPT_SCORES = {"adops": 50, "adtech": 25, "advertising": 250, "PPC": 250}
+REDDIT_AUTOACCEPT_RELEVANCE = 0.85
+
+REDDIT_SCAN_WORKERS = 8  # Subreddits fetched concurrently (PRAW still paces requests to Reddit's limit)
 MIN_PROCESSING_SCORE = 0.65  # Lowered from 0.70 to catch more good Reddit posts
-PROCESSED_IDS_FILE = "processed_posts.txt"
+PROCESSED_IDS_DB = "processed_posts.db"
+PROCESSED_IDS_FILE = "processed_posts.txt"  # Legacy flat file, imported into the DB once
 
 # --- RSS Feed Sources Configuration ---
 RSS_FEEDS = [
@@ -137,9 +186,48 @@ RSS_FEEDS = [
 RSS_CONFIG = {
     "max_entries_per_feed": 20,
     "use_high_priority_only": True,
+    "fetch_workers": 16,  # Feeds downloaded concurrently
 }
 
 # -------- RSS Fetching Functions --------
+def _parse_one_feed(feed_info: Dict[str, str], cutoff_ts: float) -> List[Dict[str, Any]]:
+    """Recent entries from one feed (runs on a worker thread; no shared state)."""
+    entries = []
+    try:
+        feed = feedparser.parse(feed_info["url"])
+        if feed.bozo:
+            log.warning(f"Feed parsing warning for {feed_info['name']}: {feed.bozo_exception}")
+
+        for entry in feed.entries[:RSS_CONFIG["max_entries_per_feed"]]:
+            # Parse published date (feedparser's struct_time is UTC)
+            published_ts = None
+            if hasattr(entry, "published_parsed") and entry.published_parsed:
+                try:
+                    published_ts = calendar.timegm(entry.published_parsed)
+                except Exception:
+                    pass
+
+            # Filter by age
+            if published_ts is not None and published_ts < cutoff_ts:
+                continue
+
+            title = entry.get("title", "").strip()
+            link = entry.get("link", "").strip()
+
+            if not title or not link:
+                continue
+
+            entries.append({
+                "id": hashlib.md5(link.encode()).hexdigest()[:16],
+                "title": title,
+                "url": link,
+                "source": feed_info["name"],
+                "published": datetime.fromtimestamp(published_ts, timezone.utc).isoformat() if published_ts is not None else None,
+            })
+    except Exception as e:
+        log.error(f"Failed to fetch {feed_info['name']}: {e}")
+    return entries
+
 def fetch_rss_candidates() -> List[Dict[str, Any]]:
     """Fetch and parse RSS feeds, returning candidate articles"""
     if not feedparser:
@@ -149,61 +237,32 @@ def fetch_rss_candidates() -> List[Dict[str, Any]]:
     log.info("--- Fetching RSS Feed Candidates ---")
     feeds = [f for f in RSS_FEEDS if f["priority"] == "high"] if RSS_CONFIG["use_high_priority_only"] else RSS_FEEDS
     log.info(f"Using {len(feeds)} RSS feeds (high priority only: {RSS_CONFIG['use_high_priority_only']})")
+    if not feeds:
+        return []
 
-    cutoff_time = datetime.now(timezone.utc) - timedelta(hours=DISCOVERY_HOURS_WINDOW)
+    cutoff_ts = time.time() - DISCOVERY_HOURS_WINDOW * 3600
     all_entries = []
     seen_urls = set()
     seen_titles = set()
 
-    for feed_info in feeds:
-        try:
-            feed = feedparser.parse(feed_info["url"])
-            if feed.bozo:
-                log.warning(f"Feed parsing warning for {feed_info['name']}: {feed.bozo_exception}")
-
-            for entry in feed.entries[:RSS_CONFIG["max_entries_per_feed"]]:
-                # Parse published date
-                published = None
-                if hasattr(entry, "published_parsed") and entry.published_parsed:
-                    try:
-                        published = datetime(*entry.published_parsed[:6], tzinfo=timezone.utc)
-                    except Exception:
-                        pass
-
-                # Filter by age
-                if published and published < cutoff_time:
-                    continue
-
-                title = entry.get("title", "").strip()
-                link = entry.get("link", "").strip()
-
-                if not title or not link:
-                    continue
-
+    # Feeds download concurrently; de-duplication runs here, in feed order, on one thread
+    with ThreadPoolExecutor(max_workers=min(RSS_CONFIG["fetch_workers"], len(feeds))) as ex:
+        for feed_info, entries in zip(feeds, ex.map(lambda f: _parse_one_feed(f, cutoff_ts), feeds)):
+            kept = 0
+            for entry in entries:
                 # Deduplicate by URL and title
-                if link in seen_urls:
+                if entry["url"] in seen_urls:
                     continue
-                normalized_title = title.lower().strip()
+                normalized_title = entry["title"].lower()
                 if normalized_title in seen_titles:
                     continue
 
-                seen_urls.add(link)
+                seen_urls.add(entry["url"])
                 seen_titles.add(normalized_title)
+                all_entries.append(entry)
+                kept += 1
 
-                # Generate unique ID
-                entry_id = hashlib.md5(link.encode()).hexdigest()[:16]
-
-                all_entries.append({
-                    "id": entry_id,
-                    "title": title,
-                    "url": link,
-                    "source": feed_info["name"],
-                    "published": published.isoformat() if published else None,
-                })
-
-            log.info(f"✓ Fetched {len([e for e in all_entries if e['source'] == feed_info['name']])} from {feed_info['name']}")
-        except Exception as e:
-            log.error(f"Failed to fetch {feed_info['name']}: {e}")
+            log.info(f"✓ Fetched {kept} from {feed_info['name']}")
 
     # Sort by recency
     all_entries.sort(
@@ -231,6 +290,7 @@ def fetch_manual_queue_candidates() -> List[Dict[str, Any]]:
     log.info("--- Fetching Manual Queue Candidates ---")
     candidates = []
     lines_to_keep = []
+    now_iso = datetime.now(timezone.utc).isoformat()
 
     with open(MANUAL_QUEUE_FILE, 'r') as f:
         lines = f.readlines()
@@ -260,7 +320,7 @@ def fetch_manual_queue_candidates() -> List[Dict[str, Any]]:
             "title": title,
             "url": url,
             "source": "Manual Queue",
-            "published": datetime.now(timezone.utc).isoformat(),
+            "published": now_iso,
         })
 
         # Comment out this line (mark as processed)
@@ -268,27 +328,74 @@ def fetch_manual_queue_candidates() -> List[Dict[str, Any]]:
 
     # Write back the file with processed entries commented out
     if candidates:
-        with open(MANUAL_QUEUE_FILE, 'w') as f:
-            f.writelines(lines_to_keep)
+        write_atomic(MANUAL_QUEUE_FILE, "".join(lines_to_keep))
         log.info(f"✓ Fetched {len(candidates)} from Manual Queue (entries marked as processed)")
     else:
         log.info("No entries in manual queue")
 
     return candidates
 
+# -------- Compiled patterns --------
+_RE_JSON_TAG = re.compile(r'<json>(.*?)</json>', re.DOTALL | re.IGNORECASE)
+_RE_REDDIT_ID = re.compile(r'/comments/([a-z0-9]+)/')
+_RE_TITLE_SUBREDDIT = re.compile(r'\s*:\s*r/\w+\s*$')
+_RE_TITLE_X = re.compile(r'\s*/\s*(Twitter|X)\s*$', re.IGNORECASE)
+_RE_WS = re.compile(r'\s+')
+_RE_QUOTES = re.compile(r'["\']')
+# Reddit titles that are never blog material (job posts, recurring threads)
+_RE_TITLE_REJECT = re.compile(
+    r'\[(?:hiring|for hire)\]|\b(?:we\'?re hiring|now hiring|for hire|job (?:post|opening)|megathread|weekly (?:thread|discussion)|daily (?:thread|discussion))\b',
+    re.IGNORECASE)
+
+class _SlugTable(dict):
+    """str.translate table for slugs: lowercases A-Z, turns spaces into hyphens,
+    keeps [a-z0-9-] and drops every other character (remembered after first sight)."""
+    def __missing__(self, key):
+        self[key] = None
+        return None
+
+_SLUG_TABLE = _SlugTable({ord(c): ord(c) for c in string.ascii_lowercase + string.digits + '-'})
+_SLUG_TABLE.update({ord(c): ord(c.lower()) for c in string.ascii_uppercase})
+_SLUG_TABLE[ord(' ')] = ord('-')
+
 # -------- JSON helpers --------
+def json_loads(s: str) -> Any:
+    """json.loads, via orjson when installed (its JSONDecodeError subclasses the stdlib one)"""
+    return orjson.loads(s) if ORJSON_AVAILABLE else json.loads(s)
+
+def json_bytes(data) -> bytes:
+    """Serialize data as indented UTF-8 JSON (uses orjson when installed)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+
+def write_atomic(path: str, data) -> None:
+    """Writes data (str or bytes) to a temp file beside path, then renames it over
+    path, so a crash mid-write never leaves a truncated file behind."""
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb" if isinstance(data, bytes) else "w") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
 def extract_json(s: str) -> Any:
+    # Narrow to a <json> tag and/or ```json fence with str.find, then one parse
+    s = s.strip()
+    low = s.lower()
+    i = low.find('<json>')
+    if i != -1 and (j := low.find('</json>', i + 6)) != -1:
+        s, low = s[i + 6:j], low[i + 6:j]
+    i = low.find('```json')
+    if i != -1 and (j := s.find('```', i + 7)) != -1:
+        s = s[i + 7:j]
     s = s.strip()
-    m = re.search(r'<json>(.*?)</json>', s, re.DOTALL | re.IGNORECASE)
-    if m: s = m.group(1)
-    m = re.search(r'```json\s*(\{.*?\}|\[.*?\])\s*```', s, re.DOTALL | re.IGNORECASE)
-    if m: s = m.group(1)
     if s.startswith("{") or s.startswith("["):
-        try: return json.loads(s)
+        try: return json_loads(s)
         except Exception: pass
     start = s.find("{"); end = s.rfind("}")
     if start != -1 and end != -1 and end > start:
-        try: return json.loads(s[start:end+1])
+        try: return json_loads(s[start:end+1])
         except Exception: return s
     return s
 
@@ -299,32 +406,42 @@ def _expect_dict(d: Any, step: str) -> Dict[str, Any]:
     return d
 
 # -------- API calling --------
-def _call_openai(model: str, prompt: str, json_mode: bool = False, use_web_search: bool = False) -> Any:
+def _openai_kwargs(model: str, prompt: str, json_mode: bool) -> Dict[str, Any]:
     kwargs = {"model": model, "messages": [{"role":"user","content":prompt}]}
     if json_mode: kwargs["response_format"] = {"type":"json_object"}
-    resp = client.chat.completions.create(**kwargs)
+    return kwargs
+
+def _openai_result(resp, json_mode: bool) -> Any:
     content = (resp.choices[0].message.content or "").strip()
     return extract_json(content) if json_mode else content
 
-def _call_anthropic(model: str, prompt: str, json_mode: bool = False) -> Any:
+def _call_openai(model: str, prompt: str, json_mode: bool = False, use_web_search: bool = False) -> Any:
+    resp = client.chat.completions.create(**_openai_kwargs(model, prompt, json_mode))
+    return _openai_result(resp, json_mode)
+
+async def _call_openai_async(model: str, prompt: str, json_mode: bool = False) -> Any:
+    resp = await async_client.chat.completions.create(**_openai_kwargs(model, prompt, json_mode))
+    return _openai_result(resp, json_mode)
+
+def _anthropic_kwargs(model: str, prompt: str, json_mode: bool) -> Dict[str, Any]:
     system = "You are a helpful assistant. Follow instructions precisely."
     if json_mode:
         system += " You MUST wrap your entire JSON response in <json></json> tags. Ensure all JSON is valid with proper escaping."
     
     max_tokens = 4096 
     
-    resp = anthropic_client.messages.create(
-        model=model, system=system, max_tokens=max_tokens,
-        messages=[{"role": "user", "content": prompt}]
-    )
+    return {"model": model, "system": system, "max_tokens": max_tokens,
+            "messages": [{"role": "user", "content": prompt}]}
+
+def _anthropic_result(resp, json_mode: bool) -> Any:
     content = resp.content[0].text if resp.content else ""
     
     if json_mode:
-        m = re.search(r"<json>(.*?)</json>", content, re.DOTALL | re.IGNORECASE)
+        m = _RE_JSON_TAG.search(content)
         if m:
             json_str = m.group(1).strip()
             try:
-                return json.loads(json_str)
+                return json_loads(json_str)
             except json.JSONDecodeError:
                 log.warning(f"JSON parsing failed, trying with strict=False")
                 try:
@@ -337,6 +454,27 @@ def _call_anthropic(model: str, prompt: str, json_mode: bool = False) -> Any:
     
     return content
 
+def _call_anthropic(model: str, prompt: str, json_mode: bool = False) -> Any:
+    resp = anthropic_client.messages.create(**_anthropic_kwargs(model, prompt, json_mode))
+    return _anthropic_result(resp, json_mode)
+
+async def _call_anthropic_async(model: str, prompt: str, json_mode: bool = False) -> Any:
+    resp = await async_anthropic_client.messages.create(**_anthropic_kwargs(model, prompt, json_mode))
+    return _anthropic_result(resp, json_mode)
+
+def _retry_delay(e: Exception, attempt: int) -> Optional[float]:
+    """Seconds to wait before retrying after e, or None if e isn't worth retrying.
+    Uses the server's Retry-After when given, else jittered exponential backoff."""
+    status = getattr(e, "status_code", None)
+    if status is not None and status not in TRANSIENT_STATUS_CODES:
+        return None
+    response = getattr(e, "response", None)
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    try:
+        if retry_after: return min(60.0, float(retry_after))
+    except ValueError: pass  # HTTP-date form: fall back to backoff
+    return 2 ** attempt + random.uniform(0, 0.5)
+
 def call(model_key: str, prompt: str, json_mode: bool = True, use_web_search: bool = False) -> Any:
     model = MODEL_MAP.get(model_key, "gpt-5-mini")
     log.info(f"→ {model_key} [{model}]")
@@ -349,21 +487,44 @@ def call(model_key: str, prompt: str, json_mode: bool = True, use_web_search: bo
             log.info(f"✓ {model_key}")
             return result
         except Exception as e:
-            log.warning(f"API error ({type(e).__name__}). Retry in {2**attempt}s...")
-            time.sleep(2 ** attempt)
+            delay = _retry_delay(e, attempt)
+            if delay is None:
+                raise RuntimeError(f"Failed {model_key}: {type(e).__name__}: {e}") from e
+            if attempt == API_MAX_RETRIES - 1: break
+            log.warning(f"API error ({type(e).__name__}). Retry in {delay:.1f}s...")
+            time.sleep(delay)
+    raise RuntimeError(f"Failed {model_key} after {API_MAX_RETRIES} retries")
+
+async def acall(model_key: str, prompt: str, json_mode: bool = True) -> Any:
+    """Async twin of call(), with the same model routing and retries."""
+    model = MODEL_MAP.get(model_key, "gpt-5-mini")
+    log.debug(f"→ {model_key} [{model}]")
+    for attempt in range(API_MAX_RETRIES):
+        try:
+            if model.startswith("claude-"):
+                result = await _call_anthropic_async(model, prompt, json_mode)
+            else:
+                result = await _call_openai_async(model, prompt, json_mode)
+            log.debug(f"✓ {model_key}")
+            return result
+        except Exception as e:
+            delay = _retry_delay(e, attempt)
+            if delay is None:
+                raise RuntimeError(f"Failed {model_key}: {type(e).__name__}: {e}") from e
+            if attempt == API_MAX_RETRIES - 1: break
+            log.warning(f"API error ({type(e).__name__}). Retry in {delay:.1f}s...")
+            await asyncio.sleep(delay)
     raise RuntimeError(f"Failed {model_key} after {API_MAX_RETRIES} retries")
 
 # -------- URL helpers --------
 def looks_like_url(s: str) -> bool:
-    try:
-        u = urlparse(s)
-        return bool(u.scheme and u.netloc)
-    except Exception: return False
+    return s[:8].lower().startswith(('http://', 'https://'))
 
 def url_to_topic(url: str) -> tuple[str, Optional[str]]:
-    if 'reddit.com' in url and reddit_client:
+    parsed = urlparse(url)
+    if parsed.netloc.endswith('reddit.com') and reddit_client:
         try:
-            match = re.search(r'/comments/([a-z0-9]+)/', url)
+            match = _RE_REDDIT_ID.search(url)
             if match:
                 post_id = match.group(1)
                 submission = reddit_client.submission(id=post_id)
@@ -374,25 +535,28 @@ def url_to_topic(url: str) -> tuple[str, Optional[str]]:
             log.warning(f"Reddit API fetch failed: {e}, falling back to scraping")
     
     try:
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
         log.info(f"Fetching page title from: {url}")
-        response = requests.get(url, headers=headers, timeout=15)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
+        with HTTP.get(url, headers=SCRAPE_HEADERS, timeout=15, stream=True) as response:
+            response.raise_for_status()
+            head = bytearray()
+            for chunk in response.iter_content(chunk_size=16384):
+                head += chunk
+                if b'</title>' in head.lower() or len(head) >= TITLE_MAX_BYTES: break
+        soup = BeautifulSoup(bytes(head), TITLE_PARSER, parse_only=_ONLY_TITLE)
         
         if title_tag := soup.find('title'):
             title = title_tag.get_text().strip()
             if title.lower() not in ['reddit - the heart of the internet', 'reddit', 'twitter', 'x']:
-                title = re.sub(r'\s*:\s*r/\w+\s*$', '', title)
-                title = re.sub(r'\s*/\s*(Twitter|X)\s*$', '', title, flags=re.IGNORECASE)
-                title = re.sub(r'\s+', ' ', title).strip()
+                title = _RE_TITLE_SUBREDDIT.sub('', title)
+                title = _RE_TITLE_X.sub('', title)
+                title = _RE_WS.sub(' ', title).strip()
                 if title: return title, None
     except Exception as e:
         log.warning(f"Could not fetch page title ({type(e).__name__}): {e}")
     
-    path = urlparse(url).path.strip('/')
+    path = parsed.path.strip('/')
     slug = path.split('/')[-1] if path else url
-    slug = re.sub(r'["\']', '', slug).split("?")[0].replace('_', ' ').replace('-', ' ')
+    slug = _RE_QUOTES.sub('', slug).split("?")[0].replace('_', ' ').replace('-', ' ')
     topic = slug.strip()
     log.info(f"Parsed from URL: {topic}")
     return topic, None
@@ -406,40 +570,83 @@ WP_AUTHOR_ID = int(os.getenv("WP_AUTHOR_ID", "1"))
 ALLOW_CREATE_CATEGORIES = os.getenv("ALLOW_CREATE_CATEGORIES", "false").lower() == "true"
 META_DESC_MAX_LENGTH = 150
 WP_CATEGORIES_CACHE: Dict[str, int] = {}
+WP_CATEGORIES_FILE = "wp_categories.json"
+WP_CATEGORIES_TTL = 24 * 3600  # Seconds before the on-disk category list is refetched
+_WP_CATEGORIES_LOCK = threading.Lock()
+_wp_categories_fresh = False  # True once this run has fetched the list from WP itself
 
 def wp_auth() -> HTTPBasicAuth:
     if not (WP_URL and WP_USERNAME and WP_APP_PASSWORD):
         raise RuntimeError("WP credentials missing")
     return HTTPBasicAuth(WP_USERNAME, WP_APP_PASSWORD)
 
-def ensure_category_ids(categories: List[str]) -> List[int]:
-    global WP_CATEGORIES_CACHE
-    if not WP_CATEGORIES_CACHE:
+def _save_wp_categories():
+    try:
+        write_atomic(WP_CATEGORIES_FILE, json_bytes(WP_CATEGORIES_CACHE))
+    except IOError as e:
+        log.warning(f"Could not write {WP_CATEGORIES_FILE}: {e}")
+
+def _load_wp_categories(refresh: bool = False):
+    """Fills WP_CATEGORIES_CACHE from the disk copy (if under a day old) or from WP,
+    following every page. The lock keeps parallel publishes from double-fetching."""
+    global _wp_categories_fresh
+    with _WP_CATEGORIES_LOCK:
+        if refresh and _wp_categories_fresh: return
+        if not refresh:
+            if WP_CATEGORIES_CACHE: return
+            try:
+                if time.time() - os.path.getmtime(WP_CATEGORIES_FILE) < WP_CATEGORIES_TTL:
+                    with open(WP_CATEGORIES_FILE, "r", encoding="utf-8") as f:
+                        WP_CATEGORIES_CACHE.update(json.load(f))
+                    log.info(f"Loaded {len(WP_CATEGORIES_CACHE)} WP categories from {WP_CATEGORIES_FILE}")
+                    return
+            except (OSError, ValueError): pass
         try:
-            r = requests.get(f"{WP_URL}/wp-json/wp/v2/categories", params={"per_page": 100}, auth=wp_auth(), timeout=30)
-            r.raise_for_status()
-            for cat in r.json(): WP_CATEGORIES_CACHE[cat['name'].lower()] = cat['id']
-            log.info(f"Cached {len(WP_CATEGORIES_CACHE)} WP categories")
+            fetched, page, total_pages = {}, 1, 1
+            while page <= total_pages:
+                r = HTTP.get(f"{WP_URL}/wp-json/wp/v2/categories", params={"per_page": 100, "page": page}, auth=wp_auth(), timeout=30)
+                r.raise_for_status()
+                for cat in r.json(): fetched[cat['name'].lower()] = cat['id']
+                total_pages = int(r.headers.get("X-WP-TotalPages", 1))
+                page += 1
+            WP_CATEGORIES_CACHE.update(fetched)
+            _wp_categories_fresh = True
+            _save_wp_categories()
+            log.info(f"Cached {len(WP_CATEGORIES_CACHE)} WP categories ({total_pages} page(s))")
         except Exception as e: log.error(f"Category fetch failed: {e}")
+
+@lru_cache(maxsize=512)
+def _resolve_category(name: str) -> Optional[int]:
+    """Maps a category name to its WP id, creating it on a miss. Memoized so each
+    name costs at most one POST per run; a failed create raises and is not cached."""
+    if name.lower() not in WP_CATEGORIES_CACHE:
+        _load_wp_categories(refresh=True)  # Disk copy may be stale: re-check WP before creating
+    if name.lower() in WP_CATEGORIES_CACHE:
+        return WP_CATEGORIES_CACHE[name.lower()]
+    if not ALLOW_CREATE_CATEGORIES:
+        log.warning(f"Category '{name}' not found, creation disabled")
+        return None
+    rc = HTTP.post(f"{WP_URL}/wp-json/wp/v2/categories", json={"name": name}, auth=wp_auth(), timeout=30)
+    rc.raise_for_status()
+    new_cat = rc.json()
+    WP_CATEGORIES_CACHE[new_cat['name'].lower()] = new_cat['id']
+    _save_wp_categories()
+    return new_cat["id"]
+
+def ensure_category_ids(categories: List[str]) -> List[int]:
+    if not WP_CATEGORIES_CACHE:
+        _load_wp_categories()
     
     ids = []
     for name in categories:
         name = name.strip()
         if not name: continue
-        if name.lower() in WP_CATEGORIES_CACHE:
-            ids.append(WP_CATEGORIES_CACHE[name.lower()])
+        try:
+            cid = _resolve_category(name)
+        except requests.RequestException as e:
+            log.error(f"Category create failed '{name}': {e}")
             continue
-        if ALLOW_CREATE_CATEGORIES:
-            try:
-                rc = requests.post(f"{WP_URL}/wp-json/wp/v2/categories", json={"name": name}, auth=wp_auth(), timeout=30)
-                rc.raise_for_status()
-                new_cat = rc.json()
-                WP_CATEGORIES_CACHE[new_cat['name'].lower()] = new_cat['id']
-                ids.append(new_cat["id"])
-            except requests.RequestException as e:
-                log.error(f"Category create failed '{name}': {e}")
-        else:
-            log.warning(f"Category '{name}' not found, creation disabled")
+        if cid is not None: ids.append(cid)
     return ids
 
 def build_yoast_meta(seo_pack: dict) -> dict:
@@ -461,7 +668,7 @@ def publish_to_wordpress(title: str, content_html: str, slug: str,
     
     log.info("Publishing IDEA STUB to WordPress...")
     try:
-        r = requests.post(f"{WP_URL}/wp-json/wp/v2/posts", 
+        r = HTTP.post(f"{WP_URL}/wp-json/wp/v2/posts", 
                          json=payload, auth=wp_auth(), timeout=60)
         r.raise_for_status()
         post = r.json()
@@ -472,43 +679,178 @@ def publish_to_wordpress(title: str, content_html: str, slug: str,
         raise
 
 # -------- Reddit Auto-Discovery Functions --------
+@lru_cache(maxsize=1)
+def _processed_db() -> sqlite3.Connection:
+    """The processed-IDs DB (WAL, autocommit), opened on first use; imports the old text file once."""
+    conn = sqlite3.connect(PROCESSED_IDS_DB, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("CREATE TABLE IF NOT EXISTS seen (id TEXT PRIMARY KEY, ts INTEGER NOT NULL)")
+    if os.path.exists(PROCESSED_IDS_FILE) and not conn.execute("SELECT 1 FROM seen LIMIT 1").fetchone():
+        try:
+            with open(PROCESSED_IDS_FILE, "r") as f:
+                legacy = [(line.strip(), int(time.time())) for line in f if line.strip()]
+            conn.execute("BEGIN")
+            conn.executemany("INSERT OR IGNORE INTO seen VALUES (?, ?)", legacy)
+            conn.execute("COMMIT")
+            log.info(f"Imported {len(legacy)} processed IDs from {PROCESSED_IDS_FILE}")
+        except (IOError, sqlite3.Error) as e:
+            if conn.in_transaction: conn.execute("ROLLBACK")
+            log.error(f"Could not import {PROCESSED_IDS_FILE}: {e}")
+    atexit.register(conn.close)
+    return conn
+
 def load_processed_ids() -> set[str]:
-    """Loads previously processed Reddit post IDs from a file."""
-    if not os.path.exists(PROCESSED_IDS_FILE):
-        return set()
+    """Loads previously processed Reddit post IDs."""
     try:
-        with open(PROCESSED_IDS_FILE, "r") as f:
-            return {line.strip() for line in f if line.strip()}
-    except IOError as e:
-        log.error(f"Could not read processed IDs file: {e}")
+        return {row[0] for row in _processed_db().execute("SELECT id FROM seen")}
+    except sqlite3.Error as e:
+        log.error(f"Could not read processed IDs: {e}")
         return set()
 
+@lru_cache(maxsize=1)
+def _processed() -> set[str]:
+    """Processed IDs, read once on first use; saves update this set and insert one indexed row."""
+    return load_processed_ids()
+
 def save_processed_id(reddit_id: str):
-    """Appends a new Reddit post ID to the processed file."""
+    """Records a Reddit post ID as processed."""
+    processed = _processed()
+    if reddit_id in processed: return
+    processed.add(reddit_id)
     try:
-        with open(PROCESSED_IDS_FILE, "a") as f:
-            f.write(f"{reddit_id}\n")
-    except IOError as e:
-        log.error(f"Could not write to processed IDs file: {e}")
+        _processed_db().execute("INSERT OR IGNORE INTO seen VALUES (?, ?)", (reddit_id, int(time.time())))
+    except sqlite3.Error as e:
+        log.error(f"Could not record processed ID: {e}")
 
-def agent_relevance_filter(title: str) -> Optional[Dict[str, Any]]:
+async def agent_relevance_filter_async(title: str) -> Optional[Dict[str, Any]]:
     """Uses an AI agent to score a post title for relevance and SEO potential."""
     try:
-        # **FIXED: Now passes all required format variables**
         prompt = P.MELISSA_RELEVANCE_FILTER_PROMPT.format(
             title=title,
             NEW_PILLARS=P.NEW_PILLARS
         )
-        result = call("relevance_filter", prompt)
+        result = await acall("relevance_filter", prompt)
         if result and result.get("is_good_candidate"):
             return result
     except Exception as e:
         log.warning(f"Relevance filter agent failed for title '{title[:50]}...': {e}")
     return None
 
-def fetch_and_filter_reddit_candidates() -> List[Dict[str, Any]]:
+async def agent_relevance_filter_batch_async(titles: List[str]) -> List[Optional[Dict[str, Any]]]:
+    """Scores a chunk of titles in one call. Returns each title's verdict (accepted or
+    rejected), or None where there is no verdict; falls back to one call per title
+    if the batch response is unusable."""
+    try:
+        prompt = P.MELISSA_RELEVANCE_FILTER_BATCH_PROMPT.format(
+            titles_json=json.dumps(titles, ensure_ascii=False),
+            NEW_PILLARS=P.NEW_PILLARS
+        )
+        result = await acall("relevance_filter", prompt)
+        scored = result.get("results") if isinstance(result, dict) else None
+        if not isinstance(scored, list):
+            raise ValueError(f"no results array in response: {str(result)[:200]}")
+        out: List[Optional[Dict[str, Any]]] = [None] * len(titles)
+        for r in scored:
+            i = r.get("index") if isinstance(r, dict) else None
+            if isinstance(i, int) and 0 <= i < len(titles):
+                out[i] = {k: v for k, v in r.items() if k != "index"}
+        return out
+    except Exception as e:
+        log.warning(f"Batch relevance filter failed for {len(titles)} titles ({e}); scoring one by one")
+        return list(await asyncio.gather(*(agent_relevance_filter_async(t) for t in titles)))
+
+@lru_cache(maxsize=1)
+def _relevance_cache() -> ExactCache:
+    return ExactCache("relevance_filter", ttl_seconds=RELEVANCE_CACHE_TTL)
+
+@lru_cache(maxsize=1)
+def _relevance_prompt_id() -> str:
+    return cache_key(prompt=P.MELISSA_RELEVANCE_FILTER_BATCH_PROMPT, pillars=P.NEW_PILLARS)[:16]
+
+def relevance_cache_key(title: str) -> str:
+    """Key for a title's verdict: case/whitespace-insensitive, and tied to the model
+    and prompt so editing either invalidates old verdicts."""
+    normalized = _RE_WS.sub(' ', title.lower()).strip()
+    return cache_key(model=MODEL_MAP["relevance_filter"], prompt=_relevance_prompt_id(), title=normalized)
+
+async def _filter_all(titles: List[str]) -> List[Optional[Dict[str, Any]]]:
+    # Cached verdicts (and repeats of a title within this run, e.g. crossposts) skip the API
+    cache = _relevance_cache()
+    keys = [relevance_cache_key(title) for title in titles]
+    verdicts: Dict[str, Dict[str, Any]] = {}
+    pending: Dict[str, str] = {}
+    for key, title in zip(keys, titles):
+        if key in verdicts or key in pending: continue
+        hit = cache.get(key)
+        if hit is not None: verdicts[key] = hit
+        else: pending[key] = title
+
+    step = RELEVANCE_FILTER_BATCH_SIZE
+    batches = [list(pending.items())[i:i + step] for i in range(0, len(pending), step)]
+    log.info(f"→ relevance_filter [{MODEL_MAP['relevance_filter']}] {len(titles)} titles: {len(verdicts)} cached, "
+             f"{len(pending)} in {len(batches)} call(s) ({RELEVANCE_FILTER_CONCURRENCY} at a time)")
+    sem = asyncio.Semaphore(RELEVANCE_FILTER_CONCURRENCY)
+
+    async def chunk(batch: List[tuple[str, str]]) -> None:
+        async with sem:
+            results = await agent_relevance_filter_batch_async([title for _, title in batch])
+        for (key, _), verdict in zip(batch, results):
+            if verdict is None: continue
+            verdicts[key] = verdict
+            cache.set(key, verdict)
+
+    await asyncio.gather(*(chunk(batch) for batch in batches))
+    return [v if v and v.get("is_good_candidate") else None for v in (verdicts.get(key) for key in keys)]
+
+def filter_titles(titles: List[str]) -> List[Optional[Dict[str, Any]]]:
+    """Relevance-filter results for each title (in order; None = rejected), scored in concurrent batches."""
+    if not titles:
+        return []
+    return event_loop.run_until_complete(_filter_all(titles))
+
+_reddit_local = threading.local()
+
+def _worker_reddit():
+    """A praw.Reddit for the calling thread; PRAW instances aren't thread-safe, so scan workers don't share reddit_client."""
+    client = getattr(_reddit_local, "client", None)
+    if client is None:
+        client = _reddit_local.client = praw.Reddit(
+            client_id=REDDIT_CLIENT_ID,
+            client_secret=REDDIT_CLIENT_SECRET,
+            user_agent=REDDIT_USER_AGENT,
+        )
+    return client
+
+def _scan_sub(sub_name: str, min_score: int, cutoff_ts: float, processed_ids: frozenset) -> List[Dict[str, Any]]:
+    """Hot posts from one subreddit that are recent, above its score bar, and not yet processed."""
+    found = []
+    try:
+        # Raw listing JSON (one OAuth request) rather than hydrated Submission objects
+        listing = _worker_reddit().request(method="GET", path=f"/r/{sub_name}/hot",
+                                          params={"limit": 30, "raw_json": 1})
+        for child in listing["data"]["children"]:
+            post = child["data"]
+            if post["created_utc"] < cutoff_ts:
+                break
+
+            if post["stickied"] or post["score"] < min_score or post["id"] in processed_ids:
+                continue
+
+            found.append({
+                "id": post["id"],
+                "title": post["title"],
+                "url": f"https://www.reddit.com{post['permalink']}",
+                "score": post["score"],
+                "subreddit": sub_name
+            })
+    except Exception as e:
+        log.warning(f"Failed to fetch from r/{sub_name}: {e}")
+    return found
+
+def fetch_reddit_candidates() -> List[Dict[str, Any]]:
     """
-    Fetches hot posts, then uses an AI filter to select the best candidates.
+    Fetches recent hot posts above each subreddit's score bar that haven't been processed.
     """
     if not reddit_client:
         log.error("Reddit client not initialized. Cannot fetch candidates.")
@@ -516,37 +858,52 @@ def fetch_and_filter_reddit_candidates() -> List[Dict[str, Any]]:
 
     log.info("--- Starting Reddit Auto-Discovery (Advertising Investment & Accountability v8.0) ---")
     raw_candidates = []
-    processed_ids = load_processed_ids()
-    cutoff_ts = (datetime.now(timezone.utc) - timedelta(hours=DISCOVERY_HOURS_WINDOW)).timestamp()
+    processed_ids = set(_processed())
+    cutoff_ts = time.time() - DISCOVERY_HOURS_WINDOW * 3600
 
     log.info(f"Scanning {len(SUBREDDIT_CONFIG)} subreddits with dynamic thresholds...")
-    for sub_name, min_score in SUBREDDIT_CONFIG.items():
-        try:
-            subreddit = reddit_client.subreddit(sub_name)
-            for post in subreddit.hot(limit=30):
-                if post.created_utc < cutoff_ts:
-                    break
-                
-                if post.stickied or post.score < min_score or post.id in processed_ids:
+    # Subreddits are fetched concurrently (wall time ~ the slowest one, not the sum);
+    # results are merged in config order and de-duplicated here, on one thread
+    known_ids = frozenset(processed_ids)
+    with ThreadPoolExecutor(max_workers=REDDIT_SCAN_WORKERS) as ex:
+        scans = ex.map(lambda item: _scan_sub(item[0], item[1], cutoff_ts, known_ids), SUBREDDIT_CONFIG.items())
+        for found in scans:
+            for post in found:
+                if post["id"] in processed_ids:
                     continue
-                
-                raw_candidates.append({
-                    "id": post.id,
-                    "title": post.title,
-                    "url": f"https://www.reddit.com{post.permalink}",
-                    "score": post.score,
-                    "subreddit": sub_name
-                })
-                processed_ids.add(post.id)
-        except Exception as e:
-            log.warning(f"Failed to fetch from r/{sub_name}: {e}")
-        time.sleep(1) 
+                raw_candidates.append(post)
+                processed_ids.add(post["id"])
 
-    log.info(f"Found {len(raw_candidates)} raw candidates. Now running AI relevance filter (Advertising Pillars)...")
-    
+    log.info(f"Found {len(raw_candidates)} raw Reddit candidates.")
+    return raw_candidates
+
+def prefilter_reddit_candidates(raw_candidates: List[Dict[str, Any]]) -> tuple[List[Optional[Dict[str, Any]]], List[int]]:
+    """
+    Cheap first stage ahead of the AI filter: returns per-candidate filter results with
+    the obvious cases decided, plus the indices of the gray-zone posts the model must score.
+    """
+    # High-scoring posts in core subreddits are accepted and boilerplate titles rejected here
+    filter_results: List[Optional[Dict[str, Any]]] = [None] * len(raw_candidates)
+    gray_zone = []
+    for i, post in enumerate(raw_candidates):
+        if _RE_TITLE_REJECT.search(post["title"]):
+            continue
+        if post["score"] >= REDDIT_AUTOACCEPT_SCORES.get(post["subreddit"], float("inf")):
+            filter_results[i] = {"is_good_candidate": True, "relevance_score": REDDIT_AUTOACCEPT_RELEVANCE,
+                                 "reason": f"Auto-accepted: score {post['score']} in r/{post['subreddit']}"}
+        else:
+            gray_zone.append(i)
+
+    log.info(f"Reddit pre-filter decided {len(raw_candidates) - len(gray_zone)}; {len(gray_zone)} go to the AI relevance filter.")
+    return filter_results, gray_zone
+
+def select_reddit_candidates(raw_candidates: List[Dict[str, Any]],
+                             filter_results: List[Optional[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Keeps the candidates the filter accepted, ranked by AI relevance plus a popularity bonus.
+    """
     viable_candidates = []
-    for post in raw_candidates:
-        filter_result = agent_relevance_filter(post["title"])
+    for post, filter_result in zip(raw_candidates, filter_results):
         if filter_result:
             post.update(filter_result)
             ai_relevance = post.get("relevance_score", 0.0)
@@ -564,8 +921,13 @@ def fetch_and_filter_reddit_candidates() -> List[Dict[str, Any]]:
     return viable_candidates
 
 # ======== NEW SIMPLIFIED PIPELINE (MELISSA E-E-A-T) ========
+# Inline styles for the dev-notes HTML published with each idea stub
+_TEXTAREA_STYLE = "width:100%; min-height:400px; font-family:monospace; font-size:12px; padding:10px; border:1px solid #ccc; border-radius:4px;"
+_PRE_STYLE = "background-color:#f5f5f5; border:1px solid #ccc; padding:10px; border-radius:4px; white-space: pre-wrap; word-wrap: break-word;"
+
 def run_idea_factory_stub(topic_or_url: str) -> Dict[str, Any]:
-    out: Dict[str, Any] = {"input": topic_or_url, "ts": datetime.now(timezone.utc).isoformat()}
+    now = datetime.now(timezone.utc)  # One timestamp for the packet and its filename
+    out: Dict[str, Any] = {"input": topic_or_url, "ts": now.isoformat()}
     
     log.info("="*69)
     log.info("Melissa E-E-A-T Idea Factory Stub Generator (v7.3)")
@@ -613,14 +975,11 @@ def run_idea_factory_stub(topic_or_url: str) -> Dict[str, Any]:
     
     # 3) Save & Publish STUB
     
-    slug_base = winning_angle.get('helpful_angle', 'new-idea')
-    slug_base = slug_base.lower().replace(" ", "-")
-    slug_base = re.sub(r'[^a-z0-9-]', '', slug_base)[:60] # Clean slug
+    slug_base = winning_angle.get('helpful_angle', 'new-idea').translate(_SLUG_TABLE)[:60] # Clean slug
     
-    fname = f"IDEA_{slug_base}_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}.json"
+    fname = f"IDEA_{slug_base}_{now.strftime('%Y%m%d_%H%M%S')}.json"
     try:
-        with open(fname, "w", encoding="utf-8") as f:
-            json.dump(out, f, indent=2)
+        write_atomic(fname, json_bytes(out))
         out["idea_file"] = fname
         log.info(f"→ Idea packet saved: {fname}")
     except Exception as e:
@@ -629,43 +988,28 @@ def run_idea_factory_stub(topic_or_url: str) -> Dict[str, Any]:
     if WP_URL and WP_USERNAME and WP_APP_PASSWORD:
         log.info("--- Publishing IDEA STUB to WordPress ---")
         
-        try:
-            import html
-            escape = html.escape
-        except ImportError:
-            log.warning("html module not found. Will not escape <pre> content.")
-            escape = lambda s: s 
-
-        angles_json = escape(json.dumps(out.get('all_angles', []), indent=2))
-        winning_angle_html = f"""
-    <p><strong>Pillar:</strong> {escape(winning_angle.get('pillar', 'N/A'))}</p>
-    <p><strong>Format:</strong> {escape(winning_angle.get('format', 'N/A'))}</p>
-    <p><strong>Angle:</strong> {escape(winning_angle.get('helpful_angle', 'N/A'))}</p>
-    <p><strong>Persona:</strong> {escape(winning_angle.get('expert_persona', 'N/A'))}</p>
-"""
-        research_prompt_escaped = escape(out.get('deep_research_prompt', 'Error: Prompt not generated.'))
-        
-        dev_notes_html = f"""
-<details open>
-    <summary><strong>Generation &amp; Angle Analysis (Advertising E-E-A-T)</strong></summary>
-    
-    <p><strong>Original Source:</strong> <a href="{out['input']}" target="_blank" rel="noopener noreferrer">{escape(out['topic'])}</a></p>
-    
-    <h3>Winning Angle:</h3>
-    {winning_angle_html}
-
-    <hr />
-
-    <h3>Deep Research Prompt (Copy This)</h3>
-    <textarea readonly style="width:100%; min-height:400px; font-family:monospace; font-size:12px; padding:10px; border:1px solid #ccc; border-radius:4px;">{research_prompt_escaped}</textarea>
-    
-    <hr />
-    
-    <h3>All Angles Considered:</h3>
-    <pre style="background-color:#f5f5f5; border:1px solid #ccc; padding:10px; border-radius:4px; white-space: pre-wrap; word-wrap: break-word;">{angles_json}</pre>
-
-</details>
-"""
+        angle = {k: escape(str(winning_angle.get(k, 'N/A'))) for k in ('pillar', 'format', 'helpful_angle', 'expert_persona')}
+        dev_notes_html = "".join([
+            '\n<details open>\n',
+            '    <summary><strong>Generation &amp; Angle Analysis (Advertising E-E-A-T)</strong></summary>\n\n',
+            f'    <p><strong>Original Source:</strong> <a href="{escape(out["input"])}" target="_blank" rel="noopener noreferrer">{escape(out["topic"])}</a></p>\n\n',
+            '    <h3>Winning Angle:</h3>\n',
+            f'    <p><strong>Pillar:</strong> {angle["pillar"]}</p>\n',
+            f'    <p><strong>Format:</strong> {angle["format"]}</p>\n',
+            f'    <p><strong>Angle:</strong> {angle["helpful_angle"]}</p>\n',
+            f'    <p><strong>Persona:</strong> {angle["expert_persona"]}</p>\n\n',
+            '    <hr />\n\n',
+            '    <h3>Deep Research Prompt (Copy This)</h3>\n',
+            f'    <textarea readonly style="{_TEXTAREA_STYLE}">',
+            escape(out.get('deep_research_prompt', 'Error: Prompt not generated.')),
+            '</textarea>\n\n',
+            '    <hr />\n\n',
+            '    <h3>All Angles Considered:</h3>\n',
+            f'    <pre style="{_PRE_STYLE}">',
+            escape(json.dumps(out.get('all_angles', []), indent=2)),
+            '</pre>\n\n',
+            '</details>\n',
+        ])
         
         post_title = f"[IDEA] {winning_angle.get('helpful_angle', out.get('topic', 'New Post Idea'))}"
         excerpt = f"Pillar: {winning_angle.get('pillar', 'N/A')} | Format: {winning_angle.get('format', 'N/A')}"
@@ -783,8 +1127,7 @@ def generate_newsletter(all_candidates: List[Dict[str, Any]]) -> Dict[str, Any]:
     # Save newsletter to file
     fname = f"NEWSLETTER_{datetime.now(timezone.utc).strftime('%Y%m%d_%H%M%S')}.json"
     try:
-        with open(fname, "w", encoding="utf-8") as f:
-            json.dump(newsletter, f, indent=2)
+        write_atomic(fname, json_bytes(newsletter))
         log.info(f"✓ Newsletter saved: {fname}")
     except Exception as e:
         log.error(f"Failed to save newsletter: {e}")
@@ -803,17 +1146,29 @@ def main():
     else:
         log.info("--- Running in AUTO-DISCOVERY mode (Reddit + RSS) ---")
 
-        # 1. Fetch Reddit candidates
-        reddit_candidates = fetch_and_filter_reddit_candidates()
-        log.info(f"Reddit candidates after filter: {len(reddit_candidates)}")
-
-        # 2. Fetch RSS candidates
+        # 1. Fetch candidates from every source
+        raw_reddit = fetch_reddit_candidates()
+        reddit_results, gray_zone = prefilter_reddit_candidates(raw_reddit)
         rss_entries = fetch_rss_candidates()
+        manual_entries = fetch_manual_queue_candidates()
 
-        # 3. Run RSS entries through the same relevance filter
+        # 2. One relevance-filter pass over all sources, so batches fill across them
+        titles = ([raw_reddit[i]["title"] for i in gray_zone]
+                  + [e["title"] for e in rss_entries] + [e["title"] for e in manual_entries])
+        log.info(f"Running AI relevance filter (Advertising Pillars) on {len(titles)} titles "
+                 f"(Reddit: {len(gray_zone)}, RSS: {len(rss_entries)}, Manual: {len(manual_entries)})...")
+        results = filter_titles(titles)
+        for i, result in zip(gray_zone, results):
+            reddit_results[i] = result
+        rss_results = results[len(gray_zone):len(gray_zone) + len(rss_entries)]
+        manual_results = results[len(gray_zone) + len(rss_entries):]
+
+        reddit_candidates = select_reddit_candidates(raw_reddit, reddit_results)
+        log.info(f"Reddit candidates after filter: {len(reddit_candidates)}")
+
+        # 3. RSS entries that passed the filter
         rss_candidates = []
-        for entry in rss_entries:
-            filter_result = agent_relevance_filter(entry["title"])
+        for entry, filter_result in zip(rss_entries, rss_results):
             if filter_result and filter_result.get("is_good_candidate"):
                 # Add to candidates with ranking (pure AI score for RSS)
                 ai_relevance = filter_result.get("relevance_score", 0.0)
@@ -834,13 +1189,9 @@ def main():
 
         log.info(f"RSS candidates after filter: {len(rss_candidates)}")
 
-        # 3b. Fetch Manual Queue candidates
-        manual_entries = fetch_manual_queue_candidates()
-
-        # 3c. Run Manual Queue entries through the same relevance filter
+        # 3b. Manual Queue entries that passed the filter
         manual_candidates = []
-        for entry in manual_entries:
-            filter_result = agent_relevance_filter(entry["title"])
+        for entry, filter_result in zip(manual_entries, manual_results):
             if filter_result and filter_result.get("is_good_candidate"):
                 # Add to candidates with ranking (pure AI score for manual)
                 ai_relevance = filter_result.get("relevance_score", 0.0)
@@ -875,12 +1226,10 @@ def main():
         generate_newsletter(all_candidates)
 
         # 5. Filter by minimum quality score
-        final_selection = [
-            post for post in all_candidates
-            if post.get("ranking_score", 0) >= MIN_PROCESSING_SCORE
-        ]
-
-        final_selection.sort(key=lambda x: x['ranking_score'], reverse=True)
+        final_selection = sorted(
+            (post for post in all_candidates if post.get("ranking_score", 0) >= MIN_PROCESSING_SCORE),
+            key=itemgetter("ranking_score"), reverse=True,
+        )
 
         if not final_selection:
             log.info(f"No posts met the minimum quality score of {MIN_PROCESSING_SCORE}. Exiting.")
@@ -2,9 +2,11 @@
 # VERSION 1.0: Romantasy Writing Advice Blog - Idea Generator
 # Integrated RSS feeds + Reddit auto-discovery with shared relevance filtering
 
-import os, re, json, argparse, logging, time, hashlib
+import os, re, json, argparse, logging, time, hashlib, threading
 from typing import Any, Dict, List, Optional
 from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from datetime import datetime, timezone, timedelta
 
 import requests
@@ -31,6 +33,7 @@ except ImportError:
     print("WARNING: Missing 'feedparser' library. RSS feeds unavailable. Install with 'pip install feedparser'.")
 
 import prompts_romantasy as P
+from llm_cache import ExactCache, cache_key
 
 # ---------- Logging ----------
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
@@ -82,6 +85,8 @@ MODEL_MAP = {
     # Keyphrase model removed
 }
 API_MAX_RETRIES = 3
+RELEVANCE_FILTER_WORKERS = 16  # Relevance-filter calls in flight at once
+RELEVANCE_CACHE_TTL = 30 * 24 * 3600  # Seconds a title's relevance verdict is reused
 
 # --- Discovery Time Window (Shared by Reddit & RSS) ---
 DISCOVERY_HOURS_WINDOW = 168  # 7 days - run weekly or a few times per week
@@ -113,6 +118,7 @@ SUBREDDIT_CONFIG = {
     "writers": 100,               # Writer discussions
 }
 
+REDDIT_SCAN_WORKERS = 8  # Subreddits fetched concurrently (PRAW still paces requests to Reddit's limit)
 MIN_PROCESSING_SCORE = 0.65  # Lowered from 0.70 to catch more good Reddit posts
 PROCESSED_IDS_FILE = "processed_posts_romantasy.txt"
 
@@ -496,20 +502,85 @@ def save_processed_id(reddit_id: str):
     except IOError as e:
         log.error(f"Could not write to processed IDs file: {e}")
 
+@lru_cache(maxsize=1)
+def _relevance_cache() -> ExactCache:
+    return ExactCache("relevance_filter_romantasy", ttl_seconds=RELEVANCE_CACHE_TTL)
+
+@lru_cache(maxsize=1)
+def _relevance_prompt_id() -> str:
+    return cache_key(prompt=P.MELISSA_RELEVANCE_FILTER_PROMPT, pillars=P.NEW_PILLARS)[:16]
+
+def relevance_cache_key(title: str) -> str:
+    """Key for a title's verdict: case/whitespace-insensitive, and tied to the model
+    and prompt so editing either invalidates old verdicts."""
+    normalized = " ".join(title.lower().split())
+    return cache_key(model=MODEL_MAP["relevance_filter"], prompt=_relevance_prompt_id(), title=normalized)
+
 def agent_relevance_filter(title: str) -> Optional[Dict[str, Any]]:
-    """Uses an AI agent to score a post title for relevance and SEO potential."""
-    try:
-        # **FIXED: Now passes all required format variables**
-        prompt = P.MELISSA_RELEVANCE_FILTER_PROMPT.format(
-            title=title,
-            NEW_PILLARS=P.NEW_PILLARS
+    """Uses an AI agent to score a post title for relevance and SEO potential.
+    Verdicts (accepts and rejects) are cached on disk, so titles seen on earlier runs are free."""
+    key = relevance_cache_key(title)
+    result = _relevance_cache().get(key)
+    if result is None:
+        try:
+            # **FIXED: Now passes all required format variables**
+            prompt = P.MELISSA_RELEVANCE_FILTER_PROMPT.format(
+                title=title,
+                NEW_PILLARS=P.NEW_PILLARS
+            )
+            result = call("relevance_filter", prompt)
+        except Exception as e:
+            log.warning(f"Relevance filter agent failed for title '{title[:50]}...': {e}")
+            return None
+        if isinstance(result, dict) and "is_good_candidate" in result:
+            _relevance_cache().set(key, result)
+    # call() can hand back a str or list when the reply isn't a JSON object
+    if isinstance(result, dict) and result.get("is_good_candidate"):
+        return result
+    return None
+
+def filter_titles(titles: List[str]) -> List[Optional[Dict[str, Any]]]:
+    """agent_relevance_filter for each title (in order), with the calls overlapped on threads."""
+    if not titles:
+        return []
+    with ThreadPoolExecutor(max_workers=min(RELEVANCE_FILTER_WORKERS, len(titles))) as ex:
+        return list(ex.map(agent_relevance_filter, titles))
+
+_reddit_local = threading.local()
+
+def _worker_reddit():
+    """A praw.Reddit for the calling thread; PRAW instances aren't thread-safe, so scan workers don't share reddit_client."""
+    client = getattr(_reddit_local, "client", None)
+    if client is None:
+        client = _reddit_local.client = praw.Reddit(
+            client_id=REDDIT_CLIENT_ID,
+            client_secret=REDDIT_CLIENT_SECRET,
+            user_agent=REDDIT_USER_AGENT,
         )
-        result = call("relevance_filter", prompt)
-        if result and result.get("is_good_candidate"):
-            return result
+    return client
+
+def _scan_sub(sub_name: str, min_score: int, cutoff_ts: float, processed_ids: frozenset) -> List[Dict[str, Any]]:
+    """Hot posts from one subreddit that are recent, above its score bar, and not yet processed."""
+    found = []
+    try:
+        subreddit = _worker_reddit().subreddit(sub_name)
+        for post in subreddit.hot(limit=30):
+            if post.created_utc < cutoff_ts:
+                break
+
+            if post.stickied or post.score < min_score or post.id in processed_ids:
+                continue
+
+            found.append({
+                "id": post.id,
+                "title": post.title,
+                "url": f"https://www.reddit.com{post.permalink}",
+                "score": post.score,
+                "subreddit": sub_name
+            })
     except Exception as e:
-        log.warning(f"Relevance filter agent failed for title '{title[:50]}...': {e}")
-    return None
+        log.warning(f"Failed to fetch from r/{sub_name}: {e}")
+    return found
 
 def fetch_and_filter_reddit_candidates() -> List[Dict[str, Any]]:
     """
@@ -525,33 +596,23 @@ def fetch_and_filter_reddit_candidates() -> List[Dict[str, Any]]:
     cutoff_ts = (datetime.now(timezone.utc) - timedelta(hours=DISCOVERY_HOURS_WINDOW)).timestamp()
 
     log.info(f"Scanning {len(SUBREDDIT_CONFIG)} subreddits with dynamic thresholds...")
-    for sub_name, min_score in SUBREDDIT_CONFIG.items():
-        try:
-            subreddit = reddit_client.subreddit(sub_name)
-            for post in subreddit.hot(limit=30):
-                if post.created_utc < cutoff_ts:
-                    break
-                
-                if post.stickied or post.score < min_score or post.id in processed_ids:
+    # Subreddits are fetched concurrently (wall time ~ the slowest one, not the sum);
+    # results are merged in config order and de-duplicated here, on one thread
+    known_ids = frozenset(processed_ids)
+    with ThreadPoolExecutor(max_workers=REDDIT_SCAN_WORKERS) as ex:
+        scans = ex.map(lambda item: _scan_sub(item[0], item[1], cutoff_ts, known_ids), SUBREDDIT_CONFIG.items())
+        for found in scans:
+            for post in found:
+                if post["id"] in processed_ids:
                     continue
-                
-                raw_candidates.append({
-                    "id": post.id,
-                    "title": post.title,
-                    "url": f"https://www.reddit.com{post.permalink}",
-                    "score": post.score,
-                    "subreddit": sub_name
-                })
-                processed_ids.add(post.id)
-        except Exception as e:
-            log.warning(f"Failed to fetch from r/{sub_name}: {e}")
-        time.sleep(1) 
+                raw_candidates.append(post)
+                processed_ids.add(post["id"])
 
     log.info(f"Found {len(raw_candidates)} raw candidates. Now running AI relevance filter (Advertising Pillars)...")
     
     viable_candidates = []
-    for post in raw_candidates:
-        filter_result = agent_relevance_filter(post["title"])
+    filter_results = filter_titles([post["title"] for post in raw_candidates])
+    for post, filter_result in zip(raw_candidates, filter_results):
         if filter_result:
             post.update(filter_result)
             ai_relevance = post.get("relevance_score", 0.0)
@@ -797,8 +858,7 @@ def main():
 
         # 3. Run RSS entries through the same relevance filter
         rss_candidates = []
-        for entry in rss_entries:
-            filter_result = agent_relevance_filter(entry["title"])
+        for entry, filter_result in zip(rss_entries, filter_titles([e["title"] for e in rss_entries])):
             if filter_result and filter_result.get("is_good_candidate"):
                 # Add to candidates with ranking (pure AI score for RSS)
                 ai_relevance = filter_result.get("relevance_score", 0.0)
@@ -824,8 +884,7 @@ def main():
 
         # 3c. Run Manual Queue entries through the same relevance filter
         manual_candidates = []
-        for entry in manual_entries:
-            filter_result = agent_relevance_filter(entry["title"])
+        for entry, filter_result in zip(manual_entries, filter_titles([e["title"] for e in manual_entries])):
             if filter_result and filter_result.get("is_good_candidate"):
                 # Add to candidates with ranking (pure AI score for manual)
                 ai_relevance = filter_result.get("relevance_score", 0.0)
@@ -162,6 +162,26 @@ Evaluate "{title}" and return ONLY this JSON:
 }}
 """ # <-- .format() call removed
 
+# Same criteria, scoring a JSON array of titles in one call (one result per title, by index)
+MELISSA_RELEVANCE_FILTER_BATCH_PROMPT = MELISSA_RELEVANCE_FILTER_PROMPT.replace(
+    '**Post Title to Evaluate:** "{title}"',
+    '**Post Titles to Evaluate** (JSON array; "index" is a title\'s position in it):\n{titles_json}'
+).partition("---\n**YOUR TASK:**")[0] + """---
+**YOUR TASK:**
+Evaluate EVERY title independently against the framework above and return ONLY this JSON, with exactly one result per title:
+
+{{
+  "results": [
+    {{
+      "index": 0,
+      "relevance_score": 0.0,
+      "reason": "Explain which pillar(s) this fits, what insider angle Melissa can take, and why it has/lacks depth potential.",
+      "is_good_candidate": false
+    }}
+  ]
+}}
+"""
+
 # ---------------------------------
 # 3. Newsletter Generator (Weekly Advertising Roundup)
 # ---------------------------------
@@ -1,6 +1,8 @@
 # social_prompts.py
 # Social media post generation prompts for Threads and Twitter
 
+import string
+
 # ============================================================================
 # THREADS - THE VIRAL EDIT (ADVERTISING)
 # ============================================================================
@@ -217,3 +219,175 @@ Generate Twitter post copy. Return in this EXACT JSON format:
   "canva_subtext": "Supporting text for image (craft insight or trope)"
 }}
 """
+
+# ============================================================================
+# PROMPT SEGMENTS (PROMPT CACHING)
+# ============================================================================
+# Each article prompt above is static instructions + {article_text} + a short
+# static tail. generate_threads_post.py / generate_twitter_post.py send the
+# parts as separate content blocks so the instructions (and the article, when
+# it is reused) can be marked for Claude's prompt cache.
+
+def _split_at_article(template):
+    """(prefix, suffix) around {article_text}, with format escapes resolved"""
+    prefix, _, suffix = template.partition("{article_text}")
+    return tuple(part.replace("{{", "{").replace("}}", "}") for part in (prefix, suffix))
+
+THREADS_ADVERTISING_PREFIX, THREADS_ADVERTISING_SUFFIX = _split_at_article(THREADS_ADVERTISING_PROMPT)
+THREADS_ROMANTASY_PREFIX, THREADS_ROMANTASY_SUFFIX = _split_at_article(THREADS_ROMANTASY_PROMPT)
+TWITTER_ADVERTISING_PREFIX, TWITTER_ADVERTISING_SUFFIX = _split_at_article(TWITTER_ADVERTISING_PROMPT)
+TWITTER_ROMANTASY_PREFIX, TWITTER_ROMANTASY_SUFFIX = _split_at_article(TWITTER_ROMANTASY_PROMPT)
+
+ARTICLE_PROMPT_SEGMENTS = {
+    ("threads", "advertising"): (THREADS_ADVERTISING_PREFIX, THREADS_ADVERTISING_SUFFIX),
+    ("threads", "romantasy"): (THREADS_ROMANTASY_PREFIX, THREADS_ROMANTASY_SUFFIX),
+    ("twitter", "advertising"): (TWITTER_ADVERTISING_PREFIX, TWITTER_ADVERTISING_SUFFIX),
+    ("twitter", "romantasy"): (TWITTER_ROMANTASY_PREFIX, TWITTER_ROMANTASY_SUFFIX),
+}
+
+def article_prompt_segments(platform, stream):
+    """(prefix, suffix) for a platform's article prompt in the given stream"""
+    try:
+        return ARTICLE_PROMPT_SEGMENTS[(platform, stream)]
+    except KeyError:
+        raise ValueError(f"Unknown stream: {stream}. Use 'advertising' or 'romantasy'") from None
+
+def build_article_prompt(platform, stream, article_text):
+    """Full prompt as one string - a join of the precomputed segments, no str.format pass"""
+    prefix, suffix = article_prompt_segments(platform, stream)
+    return "".join((prefix, article_text, suffix))
+
+# ============================================================================
+# TWITTER IMAGE PROMPTS (TEMPLATED)
+# ============================================================================
+# Gemini prompts for generate_twitter_post.py's 16:9 post image, filled in
+# locally with {headline}, {subtext} and {topic_phrase} (keywords from the
+# article). --rich-prompt has Claude write a bespoke prompt instead.
+
+TWITTER_IMAGE_PROMPT_ADVERTISING = """Create a professional 16:9 Twitter social media graphic for "The Viral Edit," a newsletter for advertising professionals.
+
+Text to render (clearly legible, bold modern sans-serif):
+- Headline: "{headline}"
+- Supporting stat: "{subtext}"
+
+Layout: two-thirds rule - the text sits on the left two-thirds; the right third holds abstract design elements. Include small "THE VIRAL EDIT" branding in the bottom corner.
+
+Style: professional, data-driven, bold and modern. Dark background (deep navy or charcoal) with bright accents in electric blue, neon green or vibrant orange. Use abstract geometric shapes, subtle gradients and data-visualization elements (charts, graphs) that evoke the article's topic: {topic_phrase}.
+
+Mood: authoritative and trustworthy but energetic. Keep it clean - no clutter, generous margins, headline readable at thumbnail size.
+"""
+
+TWITTER_IMAGE_PROMPT_ROMANTASY = """Create a warm, magical 16:9 Twitter social media graphic for "Plot Brew," a newsletter for romantasy readers and writers.
+
+Text to render (clearly legible; elegant serif or script for the headline, clean sans-serif for the supporting text):
+- Headline: "{headline}"
+- Supporting text: "{subtext}"
+
+Layout: text centered or slightly left, framed by fantasy elements. Include "PLOT BREW" branding with a small book or quill icon.
+
+Style: whimsical yet sophisticated. Warm jewel tones (deep burgundy, forest green, gold) or soft twilight colors (purple, rose gold, midnight blue). Use starbursts, constellation patterns, book spines, quill pens or elegant botanical illustrations, with imagery that hints at the article's themes: {topic_phrase}. Not too busy.
+
+Mood: like a cozy book club meets a fantasy world - warm, inviting and slightly magical. Headline readable at thumbnail size.
+"""
+
+def _parse_template(template):
+    """[(literal_text, field_name or None), ...] - the template parsed once, up front"""
+    return [(literal, field) for literal, field, _, _ in string.Formatter().parse(template)]
+
+TWITTER_IMAGE_PROMPTS = {
+    "advertising": _parse_template(TWITTER_IMAGE_PROMPT_ADVERTISING),
+    "romantasy": _parse_template(TWITTER_IMAGE_PROMPT_ROMANTASY),
+}
+
+def build_twitter_image_prompt(stream, **fields):
+    """Fill in a stream's image template by joining its pre-parsed pieces (no str.format pass)"""
+    try:
+        pieces = TWITTER_IMAGE_PROMPTS[stream]
+    except KeyError:
+        raise ValueError(f"Unknown stream: {stream}. Use 'advertising' or 'romantasy'") from None
+    return "".join(literal + (fields[field] if field else "") for literal, field in pieces)
+
+# ============================================================================
+# PLOT BREW - SHARED SYSTEM PROMPT (ROMANTASY AUTOMATION SCRIPTS)
+# ============================================================================
+# Sent as a cached system block (cache_control: ephemeral) by the
+# automate_romantasy_social*.py generators. Keep it identical between calls -
+# any edit invalidates the prompt cache. It must stay above Claude's
+# 1024-token minimum for caching to apply.
+
+PLOT_BREW_BRAND = """
+**BRAND: "Plot Brew" (visual identity)**
+- Visual Style: Warm, magical, whimsical yet sophisticated
+- Color Palette: Warm jewel tones (burgundy, forest green, gold) OR twilight colors (purple, rose gold, midnight blue)
+- Typography: Mix of elegant serif for headlines and clean sans-serif for body text
+- Visual Elements: Subtle fantasy elements (starbursts, constellations, book spines, quill pens, botanical illustrations)
+- Mood: Warm, inviting, creative, slightly magical
+- Branding: Include "PLOT BREW" text in elegant font
+- Layout: Headline readable at thumbnail size, generous margins, no clutter
+- Aspect Ratios: Twitter/Threads 16:9 landscape, Pinterest 2:3 vertical, Instagram 1:1 square
+"""
+
+PLOT_BREW_SYSTEM = """
+You are the content team behind "Plot Brew," a writing advice platform for romantasy authors. You research, plan, and write social media content and brief the designers who create our graphics.
+
+**WHO WE ARE:**
+Plot Brew is run by a romantasy writer who is still learning in public. We share craft advice the way a generous critique partner would: honest about what is hard, specific about what works, and always excited about the genre. We are not a faceless marketing account and we never talk down to writers.
+
+**OUR AUDIENCE:**
+- Aspiring and early-career romantasy writers (drafting, revising, querying, or self-publishing)
+- Romantasy readers who are curious about how their favorite books work
+- BookTok / Bookstagram / writing community members who love tropes and craft talk
+- Writers who have been told romance or fantasy is "less serious" and are tired of it
+
+**YOUR VOICE:**
+- Personal and vulnerable (share writing journey)
+- Celebratory of romantasy (treat it with intellectual respect)
+- Community-focused ("we" language, not "you")
+- Geeky enthusiasm about tropes and craft
+- Relatable struggles of writing life
+
+**VOICE DO'S AND DON'TS:**
+- DO lead with a specific feeling, struggle, or observation a writer will recognize
+- DO name concrete craft tools (scene goals, stakes, POV choices, pacing beats, foreshadowing)
+- DO reference the genre's shared language (slow burn, enemies to lovers, fated mates, morally grey, found family, forced proximity) when it genuinely fits
+- DO end with an invitation to the community (a question, a prompt, a "tell us yours")
+- DON'T use generic advice that would apply to any genre without a romantasy angle
+- DON'T shame readers or writers for liking particular tropes or spice levels
+- DON'T overpromise ("this one trick will fix your book")
+- DON'T invent quotes, statistics, or claims about real authors or books
+- DON'T use more than a few emojis; favorites are ✨💫📚🗡️❤️
+
+**CONTENT PILLARS:**
+1. Craft - romantic tension, character arcs, magic systems, world-building, plot structure
+2. Tropes - how to execute beloved tropes freshly and why they work
+3. Reader expectations - what romantasy readers want and why (HEA/HFN, stakes, chemistry)
+4. Writing life - motivation, drafting struggles, revision, community wins
+
+**GOOD TOPICS (for reference):**
+- "How to Write Sexual Tension Without Explicit Scenes"
+- "The 3-Act Structure for Dual-Plot Romantasy"
+- "Why Your Magic System Needs Relationship Stakes"
+- "Writing Morally Grey Love Interests Readers Will Root For"
+- "How to Balance World-Building Without Info-Dumping"
+- "Making Enemies-to-Lovers Believable: Earning the Turn"
+- "Slow Burn Pacing: Where to Put the First Almost-Kiss"
+- "Fated Mates Without Losing Character Agency"
+- "Why Your Villain Should Threaten the Relationship, Not Just the Kingdom"
+
+**PLATFORM GUIDE:**
+1. TWITTER (280 chars max) - Hook with vulnerability or craft insight, 2-3 short lines, question or CTA at end, 1-2 emojis
+2. THREADS (500 chars max) - Longer and conversational, personal story or struggle, 3-4 craft insights, community question at end, casual tone
+3. PINTEREST (500 chars) - Educational and keyword-rich, list or "How to" structure, specific romantasy examples, optimized for search, professional but approachable
+4. INSTAGRAM (2200 chars max) - Longest and most personal, story-driven opening, 5-7 actionable tips, examples from popular romantasy books, strong community call-to-action, line breaks for readability, 3-5 relevant hashtags at the end
+
+Character limits are hard limits - count carefully and stay under them.
+""" + PLOT_BREW_BRAND + """
+**QUALITY BAR (check before answering):**
+- Is it specific to romantasy rather than generic writing advice?
+- Would a working writer learn something they can apply today?
+- Does it sound like a person in the community, not a brand?
+- Is every factual claim something we can stand behind?
+
+**OUTPUT RULES:**
+Each request describes one task and the exact output format it needs. Follow that format precisely: when JSON is requested, return only valid JSON with no commentary; when plain text is requested, return only the text with no preamble or surrounding quotation marks.
+"""